@@ -1,23 +1,40 @@
+from itertools import chain, islice
+
+from model.board_template import BoardTemplate
+from model.events import GameOver
+from model.history import MoveHistory
+
+# Cells revealed per step of a cascade run by a view that schedules steps
+CASCADE_SLICE = 200
+
+
 class GameController:
     """
     Controls game logic and mediates between model and view components.
+    Views learn about changes from the model's event bus (model.events), so
+    the controller only drives the model.
     
     Invariants:
         - model must be a valid GameModel instance
         - view must be a valid View instance
         - test_board must be valid when test_mode is True
     """
-    def __init__(self, model, view, test_board, test_mode=False):
+    def __init__(self, model, view, test_board, test_mode=False, results=None):
         """
         Initializes the controller with a game model and view.
         
         Precondition:
             - model must be a valid GameModel instance
             - view must be a valid View instance
-            - test_board must be a valid 2D list when test_mode is True
+            - test_board must be a valid 2D list or a BoardTemplate when test_mode is True
+            - results must be None or a model.results_store.ResultsStore
         Postcondition:
             - Controller is initialized with valid model and view references
-            - Test mode is properly configured if enabled
+            - Test mode is properly configured if enabled, with the test board
+              compiled into a template once
+            - Model records moves for undo/redo
+            - Finished games are recorded in results if given, through a
+              GameOver subscription; test board games are never recorded
         Invariant:
             - Model and view references remain constant
         
@@ -27,6 +44,14 @@ class GameController:
         self.view = view
         self.test_mode = test_mode
         self.test_board = test_board
+        if test_mode and not isinstance(test_board, BoardTemplate):
+            test_board = BoardTemplate(test_board, model.topology_kind)
+        self.template = test_board if test_mode else None
+        self.results = results
+        self.model.history = MoveHistory()
+        self.cascade = None
+        if results is not None and not test_mode:
+            self.model.events.subscribe(self._record_result, GameOver)
 
     def reveal_cell(self, x, y):
         """
@@ -36,25 +61,158 @@ class GameController:
             - x and y must be valid board coordinates
             - Cell at (x,y) must not be revealed or flagged
         Postcondition:
-            - Cell is revealed and view is updated
+            - Cell is revealed; the model publishes the change
             - Game state is updated if win/loss condition met
-            - Adjacent empty cells are revealed if applicable
+            - Adjacent empty cells are revealed if applicable, in slices
+              scheduled by the view when it has a schedule() method
         Invariant:
             - Game state remains consistent
         
         Maps to: onClick() in original minesweeper.py
         """
         result = self.model.reveal_cell(x, y)
-        self.view.update_cell(x, y)
 
         cell = self.model.board[x][y]
-        if cell.adjacent_mines == 0:
-            self.model.reveal_empty_cells(x, y, self.view.update_cell)
+        if not result and cell.is_revealed and cell.adjacent_mines == 0:
+            self._start_cascade(self.model.iter_reveal_empty_cells(x, y))
+            return
+        self._end_move(result)
+
+    def _start_cascade(self, cells):
+        """
+        Runs a reveal cascade, joining any cascade already in progress.
+        
+        Precondition:
+            - cells must be an iterator revealing cells and yielding their coordinates
+        Postcondition:
+            - Views with a schedule() method get the cascade in steps of
+              CASCADE_SLICE cells; other views get it at once
+            - The move is committed and the win condition checked when the
+              cascade ends
+        Invariant:
+            - At most one cascade is in progress
+        """
+        if self.cascade is not None:
+            self.cascade = chain(self.cascade, cells)
+            return
+        self.cascade = cells
+        if hasattr(self.view, "schedule"):
+            self.view.schedule(self._step_cascade)
+        else:
+            self._step_cascade(None)
+
+    def _step_cascade(self, limit=CASCADE_SLICE):
+        """
+        Reveals the next slice of the cascade in progress.
+        
+        Precondition:
+            - limit must be None (the rest of the cascade) or a positive integer
+        Postcondition:
+            - Up to limit cells are revealed
+            - The next step is scheduled, or the move is committed and the win
+              condition handled once the cascade is exhausted
+            - Does nothing if the cascade was cancelled or finished
+        Invariant:
+            - Cells are revealed in the same order as by reveal_empty_cells
+        """
+        cascade = self.cascade
+        if cascade is None:
+            return
+        count = 0
+        for _ in islice(cascade, limit):
+            count += 1
+        if limit is not None and count == limit:
+            self.view.schedule(self._step_cascade)
+            return
+        self.cascade = None
+        self._end_move(self.model.check_win_condition())
+
+    def finish_cascade(self):
+        """
+        Completes the cascade in progress at once.
+        
+        Precondition:
+            - None
+        Postcondition:
+            - No cascade is in progress; its move is committed and handled
+        Invariant:
+            - Board state is the same as if every step had run
+        """
+        if self.cascade is not None:
+            self._step_cascade(None)
+
+    def cancel_cascade(self):
+        """
+        Stops the cascade in progress without revealing the rest.
+        
+        Precondition:
+            - None
+        Postcondition:
+            - No cascade is in progress; scheduled steps do nothing
+            - Cells revealed so far stay revealed and recorded in the open move
+        Invariant:
+            - Cells already revealed are unchanged
+        """
+        self.cascade = None
+
+    def chord_cell(self, x, y):
+        """
+        Handles chording on a revealed number.
+        
+        Precondition:
+            - x and y must be valid board coordinates
+        Postcondition:
+            - Unflagged neighbors are revealed if the number's flags are satisfied
+            - Game state is updated if win/loss condition met
+        Invariant:
+            - Game state remains consistent
+        """
+        result = self.model.chord_cell(x, y)
+        self._end_move(result)
 
-        if result == "LOSS":
-            self.view.display_game_over(False)
-        elif result == "WIN" or result == "WIN_TREASURE":
-            self.view.display_game_over(result)
+    def apply_moves(self, moves):
+        """
+        Applies a batch of moves with one win check.
+        
+        Precondition:
+            - moves must be an iterable of (x, y, action) tuples where action is
+              'r' (reveal), 'f' (flag) or 'c' (chord)
+        Postcondition:
+            - Moves are applied until the batch ends or the game ends, as one undo step
+            - Returns the final result ("LOSS", "WIN", "WIN_TREASURE" or False)
+        Invariant:
+            - Game state is the same as applying the moves one at a time
+        """
+        self.finish_cascade()
+        result = self.model.apply_moves(moves)
+        self._end_move(result)
+        return result
+
+    def _end_move(self, result):
+        """
+        Closes a move and handles its result.
+        
+        Precondition:
+            - result must be a value returned by a model move method
+        Postcondition:
+            - While a cascade is in progress, non-terminal moves stay open and
+              join the cascade's undo step
+            - Terminal results cancel the cascade in progress
+            - Otherwise the move is committed, and the model publishes GameOver
+              for a terminal result
+        Invariant:
+            - Each undo step ends after its last revealed cell
+        """
+        if self.cascade is not None:
+            if result not in ("LOSS", "WIN", "WIN_TREASURE"):
+                return
+            self.cancel_cascade()
+        self.model.history.commit()
+        if result in ("LOSS", "WIN", "WIN_TREASURE"):
+            self.model.end_game(result)
+
+    def _record_result(self, event):
+        self.results.record_game(self.model, event.result)
 
     def toggle_flag(self, x, y):
         """
@@ -64,48 +222,70 @@ class GameController:
             - x and y must be valid board coordinates
             - Cell at (x,y) must not be revealed
         Postcondition:
-            - Flag state is toggled
-            - View is updated to reflect new flag state
-            - Flag counter is updated
+            - Flag state is toggled and flag counter updated; the model
+              publishes both changes
         Invariant:
             - Flag count remains consistent with board state
         
         Maps to: onRightClick() in original minesweeper.py
         """
         self.model.toggle_flag(x, y)
-        self.view.update_cell(x, y)
-        self.view.update_flags_label()
+        if self.cascade is None:
+            self.model.history.commit()
+
+    def undo(self):
+        """
+        Reverts the last move, including a whole reveal cascade.
+        
+        Precondition:
+            - Model and view must be initialized
+        Postcondition:
+            - A cascade in progress is cancelled and its move reverted
+            - Board and counters are as before the last move
+            - Returns True if a move was undone
+        Invariant:
+            - Cost is proportional to the cells the move changed
+        """
+        self.cancel_cascade()
+        return bool(self.model.history.undo(self.model))
+
+    def redo(self):
+        """
+        Reapplies the last undone move.
+        
+        Precondition:
+            - Model and view must be initialized
+        Postcondition:
+            - Board and counters are as after the redone move
+            - Returns True if a move was redone
+        Invariant:
+            - Cost is proportional to the cells the move changed
+        """
+        return bool(self.model.history.redo(self.model))
 
     def restart_game(self):
         """
-        Restarts the game by resetting the model and refreshing the view.
+        Restarts the game by resetting the model.
         
         Precondition:
             - Model and view must be initialized
         Postcondition:
             - Game state is reset to initial conditions
-            - Board is reinitialized based on mode
-            - View is updated to reflect new game state
+            - Board is reinitialized based on mode; the model publishes GameReset
         Invariant:
             - Game configuration remains consistent with selected mode
+            - Test boards restart from their template without recomputing adjacency
         
         Maps to: restart() in original minesweeper.py
         """
-        self.model.reset_game()
+        self.cancel_cascade()
         if self.test_mode:
-            self.model.initialize_test_board(self.test_board)
+            self.model.reset_test_board(self.template)
         else:
+            self.model.reset_game()
             self.model.initialize_board()
         self.model.start_time = None
 
-        if hasattr(self.view, "setup_board"):
-            self.view.setup_board()
-            self.view.start_timer()
-            self.view.labels["mines"].config(text=f"Mines: {self.model.mines_count}")
-            self.view.update_flags_label()
-        elif hasattr(self.view, "reset_view"):
-            self.view.reset_view()
-
     def run(self):
         """
         Starts the main game loop.
@@ -0,0 +1,525 @@
+import argparse
+import importlib
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from math import sqrt
+from random import Random, getrandbits
+from time import perf_counter
+
+from controller.game_controller import GameController
+from model.bitboard_engine import BitboardGameModel
+from model.events import GameOver
+from model.game_model import GameModel, FLAG_BIT, REVEALED_BIT
+from model.solver import analyze
+from model.spectator import visible_state
+from model.topology import TOPOLOGIES
+
+# Boards per task handed to a worker; idle workers take the next chunk
+CHUNK_SIZE = 25
+# Moves after which a game a bot cannot finish counts as lost
+MAX_MOVES = 10000
+# Normal quantile of the 95% confidence intervals
+Z_95 = 1.959964
+
+
+class BotView:
+    """
+    What a bot may see of a game: visible cell states, counters and neighbors.
+    Hidden cells only show their flag, so a bot cannot peek at mines. The view
+    can be passed to model.solver.analyze in place of a board snapshot.
+
+    Invariants:
+        - Reads the live board; states are only valid until the next move
+    """
+    def __init__(self, model):
+        """
+        Initializes the view of a model.
+
+        Precondition:
+            - model must have an initialized board
+        Postcondition:
+            - View reflects the model as it changes
+        Invariant:
+            - model is only read
+        """
+        self._model = model
+        self.topology_kind = model.topology_kind
+
+    @property
+    def board_size(self):
+        return self._model.board_size
+
+    @property
+    def mines_count(self):
+        return self._model.mines_count
+
+    @property
+    def flags_count(self):
+        return self._model.flags_count
+
+    @property
+    def clicked_count(self):
+        return self._model.clicked_count
+
+    def state(self, x, y):
+        """
+        Returns the visible state of cell (x, y).
+
+        Precondition:
+            - x and y must be valid board coordinates
+        Postcondition:
+            - Returns an int in the Cell.pack_state layout; hidden cells only
+              carry FLAG_BIT
+        Invariant:
+            - Model is unchanged
+        """
+        return visible_state(self._model.board[x][y].pack_state())
+
+    def row(self, x):
+        """
+        Returns the visible states of row x as bytes.
+
+        Precondition:
+            - x must be a valid row index
+        Postcondition:
+            - Returns one visible state per cell
+        Invariant:
+            - Model is unchanged
+        """
+        return bytes(visible_state(cell.pack_state()) for cell in self._model.board[x])
+
+    def neighbors(self, x, y):
+        """
+        Returns the coordinates of the neighbors of cell (x, y).
+
+        Precondition:
+            - x and y must be valid board coordinates
+        Postcondition:
+            - Returns (x, y) tuples in row-major order
+        Invariant:
+            - Neighbors come from the board topology
+        """
+        topology = self._model.topology
+        cols = topology.cols
+        i = x * cols + y
+        return [divmod(j, cols) for j in topology.indices[topology.offsets[i]:topology.offsets[i + 1]]]
+
+
+class Bot:
+    """
+    Base class of tournament bots.
+    A bot is asked for moves until the game ends; each move is an (x, y,
+    action) tuple with action 'r' (reveal), 'f' (flag) or 'c' (chord), played
+    through the GameController like a user's click. Plugins subclass Bot and
+    are named on the command line as "module:Class".
+
+    Invariants:
+        - A bot instance plays one game at a time
+    """
+    name = "bot"
+
+    def start(self, view, rng):
+        """
+        Prepares for a new game.
+
+        Precondition:
+            - view must be the BotView of the new game
+            - rng must be a Random seeded from the board, for reproducible play
+        Postcondition:
+            - Bot is ready to return moves for the game
+        Invariant:
+            - None
+        """
+        self.rng = rng
+
+    def moves(self, view):
+        """
+        Returns the next moves.
+
+        Precondition:
+            - view must be the BotView passed to start()
+        Postcondition:
+            - Returns an iterable of (x, y, action) tuples; an empty one gives up
+        Invariant:
+            - Game state is only changed by the harness playing the moves
+        """
+        raise NotImplementedError
+
+
+class RandomBot(Bot):
+    """Reveals a random hidden, unflagged cell each turn."""
+    name = "random"
+
+    def moves(self, view):
+        rows, cols = view.board_size
+        hidden = [(x, y) for x in range(rows) for y, state in enumerate(view.row(x))
+                  if not state & (REVEALED_BIT | FLAG_BIT)]
+        if not hidden:
+            return []
+        x, y = self.rng.choice(hidden)
+        return [(x, y, "r")]
+
+
+class SolverBot(Bot):
+    """Plays every certain move of model.solver, or its safest guess."""
+    name = "solver"
+
+    def moves(self, view):
+        return analyze(view).moves()
+
+
+BOTS = {bot.name: bot for bot in (RandomBot, SolverBot)}
+
+
+def load_bot(spec):
+    """
+    Creates a bot from a built-in name or a "module:Class" plugin spec.
+
+    Precondition:
+        - spec must be a key of BOTS or name an importable class with the Bot interface
+    Postcondition:
+        - Returns a new bot instance
+        - Raises ValueError for an unknown spec
+    Invariant:
+        - Built-in names take precedence over plugin specs
+    """
+    if spec in BOTS:
+        return BOTS[spec]()
+    module_name, _, class_name = spec.partition(":")
+    if not class_name:
+        raise ValueError(f"Unknown bot: {spec} (use one of {', '.join(BOTS)} or module:Class)")
+    try:
+        bot_class = getattr(importlib.import_module(module_name), class_name)
+    except (ImportError, AttributeError) as error:
+        raise ValueError(f"Cannot load bot {spec}: {error}") from None
+    # Checked by interface, since Bot may be loaded twice when this module runs as a script
+    if not (isinstance(bot_class, type) and callable(getattr(bot_class, "moves", None))
+            and callable(getattr(bot_class, "start", None))):
+        raise ValueError(f"Bot {spec} does not provide start() and moves()")
+    return bot_class()
+
+
+def board_seeds(seed, count):
+    """
+    Returns the model seeds of a tournament's boards.
+
+    Precondition:
+        - seed must be None or an integer; count must be a positive integer
+    Postcondition:
+        - Returns count seeds; GameModel(difficulty, seed=s) builds the same
+          board for every bot
+    Invariant:
+        - The same seed always gives the same list
+    """
+    master = Random(getrandbits(32) if seed is None else seed)
+    return [master.getrandbits(32) for _ in range(count)]
+
+
+def play_game(bot, difficulty, seed, topology="square", max_moves=MAX_MOVES):
+    """
+    Plays one game of a bot through a GameController.
+
+    Precondition:
+        - bot must be a Bot; difficulty a difficulty name of GameModel
+        - seed must be an integer; topology one of TOPOLOGIES
+    Postcondition:
+        - Returns (result, clicks, moves) where result is "LOSS", "WIN",
+          "WIN_TREASURE" or None when the bot gave up or ran out of moves
+    Invariant:
+        - The board depends only on difficulty, seed and topology
+        - 8x8 square games use the bitboard engine, like minesweeper.py
+    """
+    if topology == "square" and GameModel.DIFFICULTY_TO_LEVEL[difficulty]['board_size'] == (8, 8):
+        model = BitboardGameModel(difficulty, seed=seed, topology=topology)
+    else:
+        model = GameModel(difficulty, seed=seed, topology=topology)
+    model.initialize_board()
+    controller = GameController(model, None, None)
+    outcome = []
+    model.events.subscribe(lambda event: outcome.append(event.result), GameOver)
+    actions = {"r": controller.reveal_cell, "f": controller.toggle_flag, "c": controller.chord_cell}
+
+    view = BotView(model)
+    bot.start(view, Random(seed))
+    moves = 0
+    while not outcome and moves < max_moves:
+        batch = list(bot.moves(view))
+        if not batch:
+            break
+        for x, y, action in batch:
+            if action not in actions:
+                raise ValueError(f"Bot {bot.name} made an unknown move: {action}")
+            actions[action](x, y)
+            moves += 1
+            if outcome or moves >= max_moves:
+                break
+    return (outcome[0] if outcome else None), model.clicked_count, moves
+
+
+def _play_chunk(task):
+    """Plays one chunk of boards in a worker, returning (key, totals)."""
+    bot_spec, difficulty, seeds, topology, max_moves = task
+    bot = load_bot(bot_spec)
+    totals = BotStats()
+    started = perf_counter()
+    for seed in seeds:
+        result, clicks, moves = play_game(bot, difficulty, seed, topology, max_moves)
+        totals.add_game(result, clicks, moves)
+    totals.finish_chunk(perf_counter() - started)
+    return (bot_spec, difficulty), totals
+
+
+def _proportion_interval(successes, n):
+    """Wilson score interval of a proportion."""
+    if n == 0:
+        return (0.0, 0.0)
+    p = successes / n
+    denominator = 1 + Z_95 ** 2 / n
+    center = (p + Z_95 ** 2 / (2 * n)) / denominator
+    margin = Z_95 * sqrt(p * (1 - p) / n + Z_95 ** 2 / (4 * n * n)) / denominator
+    return (max(0.0, center - margin), min(1.0, center + margin))
+
+
+def _mean_interval(total, squares, n):
+    """Normal approximation interval of a mean from its sums."""
+    if n == 0:
+        return (0.0, 0.0, 0.0)
+    mean = total / n
+    variance = max(0.0, squares / n - mean * mean) * n / (n - 1) if n > 1 else 0.0
+    margin = Z_95 * sqrt(variance / n)
+    return (mean, mean - margin, mean + margin)
+
+
+class BotStats:
+    """
+    Results of one bot on one difficulty, summed over games.
+    Throughput is sampled once per chunk, so its interval reflects how moves
+    per second vary between chunks.
+
+    Invariants:
+        - Every field is a sum, so chunk totals combine with merge()
+    """
+    def __init__(self):
+        """
+        Initializes empty totals.
+
+        Precondition:
+            - None
+        Postcondition:
+            - No game is counted
+        Invariant:
+            - None
+        """
+        self.games = 0
+        self.wins = 0
+        self.treasure_wins = 0
+        self.unfinished = 0
+        self.clicks = 0
+        self.clicks_squared = 0
+        self.moves = 0
+        self.seconds = 0.0
+        self.chunks = 0
+        self.rate_sum = 0.0
+        self.rate_squared = 0.0
+
+    def add_game(self, result, clicks, moves):
+        """
+        Counts one game.
+
+        Precondition:
+            - result must be "LOSS", "WIN", "WIN_TREASURE" or None
+        Postcondition:
+            - Totals include the game
+        Invariant:
+            - Wins include treasure wins
+        """
+        self.games += 1
+        if result in ("WIN", "WIN_TREASURE"):
+            self.wins += 1
+        if result == "WIN_TREASURE":
+            self.treasure_wins += 1
+        if result is None:
+            self.unfinished += 1
+        self.clicks += clicks
+        self.clicks_squared += clicks * clicks
+        self.moves += moves
+
+    def finish_chunk(self, seconds):
+        """
+        Records the wall time of the chunk these totals hold.
+
+        Precondition:
+            - Totals must hold exactly the games of one chunk, played in seconds
+        Postcondition:
+            - Throughput totals include the chunk's moves per second
+        Invariant:
+            - Game totals are unchanged
+        """
+        self.seconds += seconds
+        self.chunks += 1
+        rate = self.moves / seconds if seconds > 0 else 0.0
+        self.rate_sum += rate
+        self.rate_squared += rate * rate
+
+    def merge(self, other):
+        """
+        Adds the totals of another BotStats.
+
+        Precondition:
+            - other must be a BotStats of the same bot and difficulty
+        Postcondition:
+            - Totals include other's games and chunks
+        Invariant:
+            - other is unchanged
+        """
+        for field in ("games", "wins", "treasure_wins", "unfinished", "clicks", "clicks_squared",
+                      "moves", "seconds", "chunks", "rate_sum", "rate_squared"):
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+
+    def summary(self):
+        """
+        Returns the report of this bot and difficulty.
+
+        Precondition:
+            - None
+        Postcondition:
+            - Returns a dict of rates and means, each with a 95% interval
+        Invariant:
+            - Totals are unchanged
+        """
+        return {
+            "games": self.games,
+            "win_rate": (self.wins / self.games if self.games else 0.0,
+                         *_proportion_interval(self.wins, self.games)),
+            "treasure_win_rate": (self.treasure_wins / self.games if self.games else 0.0,
+                                  *_proportion_interval(self.treasure_wins, self.games)),
+            "average_clicks": _mean_interval(self.clicks, self.clicks_squared, self.games),
+            "moves_per_second": _mean_interval(self.rate_sum, self.rate_squared, self.chunks),
+            "unfinished": self.unfinished,
+        }
+
+
+def run_tournament(bots, difficulties, boards, seed=None, topology="square", workers=None,
+                   chunk_size=CHUNK_SIZE, max_moves=MAX_MOVES):
+    """
+    Plays every bot on the same seeded boards of every difficulty.
+
+    Precondition:
+        - bots must be specs accepted by load_bot
+        - difficulties must be difficulty names of GameModel
+        - boards and chunk_size must be positive integers
+        - workers must be None (one per CPU), 0 (play in this process) or positive
+    Postcondition:
+        - Returns {(bot, difficulty): BotStats} in the order of the arguments
+        - Raises ValueError for unknown bots or difficulties before any game is played
+    Invariant:
+        - Board i of a difficulty is the same for every bot
+        - Chunks are queued up front and idle workers take the next one, so
+          slow chunks never hold back the others
+    """
+    for spec in bots:
+        load_bot(spec)
+    for difficulty in difficulties:
+        if difficulty not in GameModel.DIFFICULTY_TO_LEVEL:
+            raise ValueError(f"Unknown difficulty level: {difficulty}")
+    seeds = board_seeds(seed, boards)
+    tasks = [(spec, difficulty, seeds[start:start + chunk_size], topology, max_moves)
+             for spec in bots for difficulty in difficulties
+             for start in range(0, boards, chunk_size)]
+    stats = {(spec, difficulty): BotStats() for spec in bots for difficulty in difficulties}
+    if workers == 0:
+        for key, totals in map(_play_chunk, tasks):
+            stats[key].merge(totals)
+        return stats
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for key, totals in pool.map(_play_chunk, tasks):
+            stats[key].merge(totals)
+    return stats
+
+
+def format_report(stats):
+    """
+    Formats tournament results as a text table.
+
+    Precondition:
+        - stats must be returned by run_tournament
+    Postcondition:
+        - Returns one line per bot and difficulty with 95% intervals in brackets
+    Invariant:
+        - stats is unchanged
+    """
+    columns = ("win rate", "treasure wins", "avg clicks", "moves/s")
+    lines = [f"{'bot':<16} {'difficulty':<13} {'games':>6}  "
+             + "  ".join(f"{column:<24}" for column in columns).rstrip()]
+    for (spec, difficulty), totals in stats.items():
+        summary = totals.summary()
+        cells = [f"{value:.1%} [{low:.1%}, {high:.1%}]"
+                 for value, low, high in (summary["win_rate"], summary["treasure_win_rate"])]
+        cells.append("{:.1f} [{:.1f}, {:.1f}]".format(*summary["average_clicks"]))
+        cells.append("{:.0f} [{:.0f}, {:.0f}]".format(*summary["moves_per_second"]))
+        lines.append(f"{spec:<16} {difficulty:<13} {summary['games']:>6}  "
+                     + "  ".join(f"{cell:<24}" for cell in cells).rstrip())
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    """
+    Parses command-line arguments of the tournament runner.
+
+    Precondition:
+        - argv must be None or a list of strings
+    Postcondition:
+        - Returns the parsed argument namespace
+    Invariant:
+        - Invalid counts are rejected by the parser
+    """
+    parser = argparse.ArgumentParser(
+        description="Play bots on identical seeded boards and report their results.")
+    parser.add_argument("bots", nargs="+", metavar="BOT",
+                        help=f"built-in bot ({', '.join(BOTS)}) or plugin module:Class")
+    parser.add_argument("--difficulty", dest="difficulties", action="append",
+                        choices=list(GameModel.DIFFICULTY_TO_LEVEL),
+                        help="difficulty to play, repeatable (default: all)")
+    parser.add_argument("--boards", type=int, default=1000, help="boards per difficulty")
+    parser.add_argument("--seed", type=int, help="seed of the board set")
+    parser.add_argument("--topology", choices=TOPOLOGIES, default="square")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU, 0: none)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="boards per worker task")
+    parser.add_argument("--max-moves", type=int, default=MAX_MOVES,
+                        help="moves after which an unfinished game counts as lost")
+    args = parser.parse_args(argv)
+    if args.boards < 1 or args.chunk_size < 1 or args.max_moves < 1:
+        parser.error("--boards, --chunk-size and --max-moves must be positive")
+    if args.workers is not None and args.workers < 0:
+        parser.error("--workers must not be negative")
+    if args.difficulties is None:
+        args.difficulties = list(GameModel.DIFFICULTY_TO_LEVEL)
+    return args
+
+
+def main(argv=None):
+    """
+    Runs a tournament from the command line and prints its report.
+
+    Precondition:
+        - argv must be None or a list of strings
+    Postcondition:
+        - Report is written to stdout; returns a process exit code
+    Invariant:
+        - Bots that cannot be loaded are reported before any game is played
+    """
+    args = parse_args(argv)
+    started = perf_counter()
+    try:
+        stats = run_tournament(args.bots, args.difficulties, args.boards, args.seed, args.topology,
+                               args.workers, args.chunk_size, args.max_moves)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 2
+    print(format_report(stats))
+    print(f"{args.boards} boards per bot and difficulty in {perf_counter() - started:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
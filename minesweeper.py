@@ -1,122 +1,307 @@
 import os
+import sys
+import argparse
+from contextlib import redirect_stdout
 from model.game_model import GameModel
+from model.topology import TOPOLOGIES
+from model.bitboard_engine import BitboardGameModel
+from model.board_template import BoardTemplate
 from controller.game_controller import GameController
-from view.gui_view import GUIView
-from view.text_view import TextView
-from tkinter import Tk
+from view.text_view import TextView, ScriptedTextView
 from test_validator import TestValidator
 
 os.environ['TK_SILENCE_DEPRECATION'] = '1'
 
-def main():
+MODES = ['gui', 'text']
+
+def ask_yes_no(question):
     """
-    Main function to initialize and start the Minesweeper game.
-    
+    Prompts until the user answers yes or no.
+
     Precondition:
-        - All required modules must be imported
-        - All required files must be in correct directories
+        - question must be a string
     Postcondition:
-        - Game is initialized with user-selected settings
-        - Appropriate view and controller are created
-        - Game starts in selected mode
+        - Returns True for 'yes' and False for 'no'
     Invariant:
-        - Game configuration remains consistent with user selections
-        - Test mode and difficulty settings are mutually exclusive
-    
-    Maps to: main() and __init__ setup in original minesweeper.py
+        - Invalid answers are rejected with a message
     """
-    # Ask if user wants to enter testing mode with test board validation
     while True:
-        print("Would you like to enter testing mode? (yes/no)")
+        print(question)
         user_input = input().strip().lower()
         if user_input in ['yes', 'no']:
-            testing_mode = (user_input == 'yes')
-            break
-        else:
-            print("Invalid input. Please enter 'yes' or 'no'.")
+            return user_input == 'yes'
+        print("Invalid input. Please enter 'yes' or 'no'.")
 
-    if not testing_mode:
+def ask_test_board():
+    """
+    Asks whether to enter testing mode and reads a test board file.
+
+    Precondition:
+        - Standard input must be interactive
+    Postcondition:
+        - Returns a validated test board, or None for normal mode
+    Invariant:
+        - Only boards that pass TestValidator are returned
+
+    Maps to: main() and __init__ setup in original minesweeper.py
+    """
+    # Ask if user wants to enter testing mode with test board validation
+    if not ask_yes_no("Would you like to enter testing mode? (yes/no)"):
         print("You have selected normal mode of the game.")
+        return None
 
-    test_board = None
-    if testing_mode:
-        while test_board is None:
-            print("Enter test board filename (CSV format):")
-            filename = input().strip()
-            test_board = TestValidator.read_test_board(filename)
-            if test_board is None:
-                while True:
-                    print("Would you like to try another file? (yes/no)")
-                    retry_input = input().strip().lower()
-                    if retry_input in ['yes', 'no']:
-                        retry = (retry_input == 'yes')
-                        break
-                    else:
-                        print("Invalid input. Please enter 'yes' or 'no'.")
-                if not retry:
-                    testing_mode = False
-                    print("Exiting testing mode. You are now in normal mode of the game.")
-                    break
-            else:
-                while True:
-                    print("Would you like to play with this board layout? (yes/no)")
-                    play_input = input().strip().lower()
-                    if play_input in ['yes', 'no']:
-                        play = (play_input == 'yes')
-                        break
-                    else:
-                        print("Invalid input. Please enter 'yes' or 'no'.")
-                if not play:
-                    print("Exiting testing mode. You are now in normal mode of the game.")
-                    testing_mode = False
-                    break
-
-    if testing_mode and test_board:
-        game_model = GameModel("beginner")
-        game_model.initialize_test_board(test_board)
-    else:
-        print("Select difficulty:")
-        print("1. Beginner\t\t2. Intermediate\t\t3. Expert")
-        difficulty_map = {
-            '1': 'beginner',
-            '2': 'intermediate',
-            '3': 'expert'
-        }
-        while True:
-            difficulty_level = input("Enter difficulty (1/2/3): ").strip()
-            if difficulty_level in difficulty_map:
-                difficulty = difficulty_map[difficulty_level]
-                break
-            else:
-                print("Invalid input. Please enter '1', '2', or '3'.")
-        game_model = GameModel(difficulty)
-        game_model.initialize_board()
+    while True:
+        print("Enter test board filename (CSV format):")
+        filename = input().strip()
+        test_board = TestValidator.read_test_board(filename)
+        if test_board is None:
+            if not ask_yes_no("Would you like to try another file? (yes/no)"):
+                print("Exiting testing mode. You are now in normal mode of the game.")
+                return None
+        elif ask_yes_no("Would you like to play with this board layout? (yes/no)"):
+            return test_board
+        else:
+            print("Exiting testing mode. You are now in normal mode of the game.")
+            return None
+
+def ask_difficulty():
+    """
+    Prompts for a difficulty level.
+
+    Precondition:
+        - Standard input must be interactive
+    Postcondition:
+        - Returns 'beginner', 'intermediate' or 'expert'
+    Invariant:
+        - Invalid answers are rejected with a message
+    """
+    print("Select difficulty:")
+    print("1. Beginner\t\t2. Intermediate\t\t3. Expert")
+    difficulty_map = {
+        '1': 'beginner',
+        '2': 'intermediate',
+        '3': 'expert'
+    }
+    while True:
+        difficulty_level = input("Enter difficulty (1/2/3): ").strip()
+        if difficulty_level in difficulty_map:
+            return difficulty_map[difficulty_level]
+        print("Invalid input. Please enter '1', '2', or '3'.")
+
+def ask_mode():
+    """
+    Prompts for the game mode.
 
+    Precondition:
+        - Standard input must be interactive
+    Postcondition:
+        - Returns 'gui' or 'text'
+    Invariant:
+        - Invalid answers are rejected with a message
+    """
     print("Select game mode:")
     print("1. GUI")
     print("2. Text")
     while True:
         mode = input("Enter mode (1/2): ").strip()
         if mode in ['1', '2']:
-            break
-        else:
-            print("Invalid input. Please enter '1' for GUI or '2' for Text mode.")
-
-    if mode == '1':
-        tk = Tk()
-        tk.title("Minesweeper")
-        controller = GameController(game_model, None, test_board, testing_mode)
-        gui_view = GUIView(tk, game_model, controller)
-        controller.view = gui_view
-        tk.mainloop()
-    elif mode == '2':
-        controller = GameController(game_model, None, test_board, testing_mode)
-        text_view = TextView(game_model, controller)
-        controller.view = text_view
-        text_view.run()
+            return MODES[int(mode) - 1]
+        print("Invalid input. Please enter '1' for GUI or '2' for Text mode.")
+
+def parse_args(argv=None):
+    """
+    Parses command-line arguments.
+
+    Precondition:
+        - argv must be None or a list of strings
+    Postcondition:
+        - Returns the parsed argument namespace
+    Invariant:
+        - Options left out are asked for interactively unless running headless
+    """
+    parser = argparse.ArgumentParser(
+        description="Minesweeper game. Options left out are asked for interactively.")
+    parser.add_argument("--mode", choices=MODES, help="front end to play with")
+    parser.add_argument("--difficulty", choices=list(GameModel.DIFFICULTY_TO_LEVEL),
+                        help="difficulty level (headless default: beginner)")
+    parser.add_argument("--test-board", metavar="FILE",
+                        help="play a validated test board layout (CSV or binary); "
+                             "--difficulty selects the rules, otherwise they follow the board size")
+    parser.add_argument("--seed", type=int, help="seed for reproducible board generation")
+    parser.add_argument("--safe-start", choices=['cell', 'neighbors'],
+                        help="place mines after the first reveal, keeping that cell (and its neighbors) clear")
+    parser.add_argument("--topology", choices=TOPOLOGIES, default="square",
+                        help="board neighborhood: square grid, wrap-around torus or hexagonal")
+    parser.add_argument("--sprite-sheet", metavar="IMAGE",
+                        help="load all GUI tiles from one sprite sheet image")
+    parser.add_argument("--reveal-delay", type=int, default=0, metavar="MS",
+                        help="animate GUI reveal cascades with MS milliseconds between slices")
+    parser.add_argument("--results", metavar="DB",
+                        help="record finished games in this SQLite results database")
+    parser.add_argument("--headless", action="store_true",
+                        help="never prompt or draw the board; play moves from --script or stdin")
+    parser.add_argument("--script", metavar="FILE",
+                        help="play moves from FILE ('-' for stdin); implies --headless")
+    parser.add_argument("--per-move", action="store_true",
+                        help="in headless play, print one JSON result line per move before the summary")
+    args = parser.parse_args(argv)
+    if args.script is not None:
+        args.headless = True
+    if args.headless and args.mode == 'gui':
+        parser.error("--headless cannot be combined with --mode gui")
+    if args.reveal_delay < 0:
+        parser.error("--reveal-delay must not be negative")
+    return args
+
+def build_model(args, test_board):
+    """
+    Creates and initializes the game model.
+
+    Precondition:
+        - args.difficulty must be set when test_board is None
+        - test_board must be None, a validated layout or a BoardTemplate
+    Postcondition:
+        - Returns a GameModel with an initialized board
+        - Test boards are compiled into model.template once
+    Invariant:
+        - Test boards are played at the level of their size, or beginner for custom sizes
+        - 8x8 square games use the bitboard engine
+    """
+    if test_board is not None:
+        if not isinstance(test_board, BoardTemplate):
+            test_board = BoardTemplate(test_board, args.topology)
+        board_size = test_board.board_size
+        level = TestValidator.level_for_size(*board_size) or "beginner"
+    else:
+        level = args.difficulty
+        board_size = GameModel.DIFFICULTY_TO_LEVEL[level]['board_size']
+    if args.topology == "square" and board_size == (8, 8):
+        model_class = BitboardGameModel
+    else:
+        model_class = GameModel
+    if test_board is not None:
+        game_model = model_class(level, seed=args.seed, topology=args.topology)
+        game_model.initialize_from_template(test_board)
+    else:
+        game_model = model_class(args.difficulty, seed=args.seed, safe_start=args.safe_start,
+                                 topology=args.topology)
+        game_model.initialize_board()
+    return game_model
+
+def open_results(args):
+    """
+    Opens the results store named on the command line.
+
+    Precondition:
+        - args must come from parse_args
+    Postcondition:
+        - Returns a ResultsStore, or None when --results is not given
+    Invariant:
+        - sqlite3 is only imported when results are recorded
+    """
+    if not args.results:
+        return None
+    from model.results_store import ResultsStore
+    return ResultsStore(args.results)
+
+def run_headless(args):
+    """
+    Plays a game from a move stream without prompts or board redraws.
+
+    Precondition:
+        - args.script must be None, '-' or a readable file name
+    Postcondition:
+        - Moves are played and JSON results written to stdout
+        - Returns a process exit code
+    Invariant:
+        - Tkinter is never imported
+    """
+    test_board = None
+    if args.test_board:
+        # Validation messages go to stderr so stdout stays machine-readable
+        with redirect_stdout(sys.stderr):
+            test_board = TestValidator.load_template(args.test_board, args.difficulty, args.topology)
+        if test_board is None:
+            return 2
+    if args.difficulty is None:
+        args.difficulty = 'beginner'
+    game_model = build_model(args, test_board)
+
+    results = open_results(args)
+    controller = GameController(game_model, None, game_model.template, test_board is not None, results)
+    if args.script in (None, "-"):
+        moves = sys.stdin
     else:
-        print("Invalid mode! Exiting game.")
-        exit()
+        moves = open(args.script)
+    try:
+        view = ScriptedTextView(game_model, controller, moves, per_move=args.per_move)
+        controller.view = view
+        view.run()
+    finally:
+        if moves is not sys.stdin:
+            moves.close()
+        if results is not None:
+            results.close()
+    return 0
+
+def main(argv=None):
+    """
+    Main function to initialize and start the Minesweeper game.
+
+    Precondition:
+        - All required modules must be imported
+        - All required files must be in correct directories
+    Postcondition:
+        - Game is initialized with command-line or user-selected settings
+        - Appropriate view and controller are created
+        - Game starts in selected mode
+    Invariant:
+        - Game configuration remains consistent with user selections
+        - Test mode and difficulty settings are mutually exclusive
+        - Tkinter is only imported when GUI mode is chosen
+
+    Maps to: main() and __init__ setup in original minesweeper.py
+    """
+    args = parse_args(argv)
+    if args.headless:
+        return run_headless(args)
+
+    test_board = None
+    if args.test_board:
+        test_board = TestValidator.load_template(args.test_board, args.difficulty, args.topology)
+        if test_board is None:
+            return 2
+    elif args.difficulty is None:
+        test_board = ask_test_board()
+    testing_mode = test_board is not None
+
+    if not testing_mode and args.difficulty is None:
+        args.difficulty = ask_difficulty()
+    game_model = build_model(args, test_board)
+
+    mode = args.mode or ask_mode()
+    results = open_results(args)
+    controller = GameController(game_model, None, game_model.template, testing_mode, results)
+    try:
+        if mode == 'gui':
+            from tkinter import Tk
+            from view.gui_view import GUIView
+            from view.sprites import sprite_cache
+            if args.sprite_sheet:
+                sprite_cache.set_sheet(args.sprite_sheet)
+            tk = Tk()
+            tk.title("Minesweeper")
+            gui_view = GUIView(tk, game_model, controller, cascade_delay=args.reveal_delay)
+            controller.view = gui_view
+            tk.mainloop()
+        else:
+            text_view = TextView(game_model, controller)
+            controller.view = text_view
+            text_view.run()
+    finally:
+        if results is not None:
+            results.close()
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
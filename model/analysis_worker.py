@@ -0,0 +1,143 @@
+import queue
+import threading
+
+from model.solver import analyze, AnalysisCancelled
+
+# Sentinel asking the worker thread to exit
+_STOP = object()
+
+
+class AnalysisWorker:
+    """
+    Runs board analyses on a background thread.
+    Requests carry a snapshot, so the game keeps running while the worker
+    reads it. A new request or cancel() makes the previous one stale: its
+    search stops at the next cancellation check and its result is dropped.
+    Results are collected by poll() on the thread that submitted them.
+
+    Invariants:
+        - At most one request is current; poll() only returns its result
+        - Only the worker thread runs analyses; a failing analysis does not
+          stop the thread
+    """
+    def __init__(self, analyze_board=analyze):
+        """
+        Starts the worker thread.
+
+        Precondition:
+            - analyze_board must take (snapshot, cancel) like model.solver.analyze
+        Postcondition:
+            - Worker thread is running with no request pending
+        Invariant:
+            - analyze_board remains constant
+        """
+        self.analyze_board = analyze_board
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        self.generation = 0
+        # Event of the current request; set when no request is pending
+        self._cancel = threading.Event()
+        self._cancel.set()
+        self.thread = threading.Thread(target=self._run, name="board-analysis", daemon=True)
+        self.thread.start()
+
+    def submit(self, snapshot, tag=None):
+        """
+        Queues the analysis of a snapshot, superseding any pending request.
+
+        Precondition:
+            - snapshot must be a model.board_snapshot.BoardSnapshot
+        Postcondition:
+            - Previous request is cancelled
+            - Returns the generation number of the new request
+        Invariant:
+            - Never waits on the worker thread
+        """
+        self._cancel.set()
+        self._cancel = threading.Event()
+        self.generation += 1
+        self.requests.put((self.generation, snapshot, tag, self._cancel))
+        return self.generation
+
+    def cancel(self):
+        """
+        Cancels the pending request, if any.
+
+        Precondition:
+            - None
+        Postcondition:
+            - The pending request stops early and poll() never returns its result
+        Invariant:
+            - Cost is a single event update
+        """
+        self._cancel.set()
+
+    @property
+    def busy(self):
+        """
+        Tells whether a request is waiting for poll().
+
+        Precondition:
+            - None
+        Postcondition:
+            - Returns True between submit() and the poll() returning its
+              result, unless it was cancelled
+        Invariant:
+            - Worker state is unchanged
+        """
+        return not self._cancel.is_set()
+
+    def poll(self):
+        """
+        Returns the result of the current request if it is ready.
+
+        Precondition:
+            - Must be called from the thread that calls submit()
+        Postcondition:
+            - Returns (tag, analysis) once for the current request, None otherwise;
+              analysis is the exception raised if the analysis failed
+            - Results of stale requests are discarded
+        Invariant:
+            - Never waits on the worker thread
+        """
+        while True:
+            try:
+                generation, tag, analysis = self.results.get_nowait()
+            except queue.Empty:
+                return None
+            if generation == self.generation and not self._cancel.is_set():
+                self._cancel.set()
+                return tag, analysis
+
+    def _run(self):
+        while True:
+            request = self.requests.get()
+            if request is _STOP:
+                break
+            generation, snapshot, tag, cancel = request
+            if cancel.is_set():
+                continue
+            try:
+                analysis = self.analyze_board(snapshot, cancel)
+            except AnalysisCancelled:
+                continue
+            except Exception as e:
+                # Reported to the caller, so it can stop waiting for this request
+                analysis = e
+            self.results.put((generation, tag, analysis))
+
+    def close(self):
+        """
+        Cancels the pending request and stops the worker thread.
+
+        Precondition:
+            - None
+        Postcondition:
+            - Worker thread has exited
+        Invariant:
+            - Worker cannot analyze after closing
+        """
+        self.cancel()
+        if self.thread.is_alive():
+            self.requests.put(_STOP)
+            self.thread.join()
@@ -0,0 +1,256 @@
+# _BIT_TABLES[k] maps a byte to its bit k (0 or 1), for bytes.translate
+_BIT_TABLES = [bytes((value >> k) & 1 for value in range(256)) for k in range(8)]
+
+
+def unpack_bits(data):
+    """
+    Expands packed bits into one byte per bit.
+
+    Precondition:
+        - data must be a bytes-like object, least significant bit first
+    Postcondition:
+        - Returns a bytearray of len(data) * 8 bytes, each 0 or 1
+    Invariant:
+        - Bits are expanded with bytes.translate and slice assignment, not per-bit loops
+    """
+    data = bytes(data)
+    expanded = bytearray(len(data) * 8)
+    for bit, table in enumerate(_BIT_TABLES):
+        expanded[bit::8] = data.translate(table)
+    return expanded
+
+
+def pack_bits(flags):
+    """
+    Packs a sequence of 0/1 bytes into bits; the inverse of unpack_bits.
+
+    Precondition:
+        - flags must be a bytes-like object holding only 0 and 1
+    Postcondition:
+        - Returns bytes of ceil(len(flags) / 8) bytes, least significant bit first
+    Invariant:
+        - Bits are gathered with strided slices and int operations, not per-bit loops
+    """
+    size = -(-len(flags) // 8)
+    flags = bytes(flags).ljust(size * 8, b"\x00")
+    packed = 0
+    for bit in range(8):
+        packed |= int.from_bytes(flags[bit::8], "little") << bit
+    return packed.to_bytes(size, "little")
+
+
+class BitLayout:
+    """
+    Bit-parallel layout of one or more stacked boards in a single Python int.
+    Bit (board b, row x, column y) is b * board_bits + x * stride + y. Every row
+    has a zero guard bit after its last column, and every board ends with at
+    least one zero guard row, so whole-board shifts never leak between rows or
+    boards. board_bits is a multiple of 8, so per-board slices are byte slices.
+
+    Invariants:
+        - rows, cols and count are positive
+        - valid has exactly one set bit per board cell
+    """
+    def __init__(self, rows, cols, count=1):
+        """
+        Initializes the layout.
+
+        Precondition:
+            - rows, cols and count must be positive integers
+        Postcondition:
+            - stride, board_bits, board_mask and valid describe the layout
+        Invariant:
+            - Layout is immutable after construction
+        """
+        if rows <= 0 or cols <= 0 or count <= 0:
+            raise ValueError(f"Invalid layout: {rows}x{cols} x {count}")
+        self.rows = rows
+        self.cols = cols
+        self.count = count
+        self.stride = cols + 1
+        self.board_bits = -(-(rows + 1) * self.stride // 8) * 8
+        self.board_bytes = self.board_bits // 8
+        row_mask = (1 << cols) - 1
+        self.board_mask = sum(row_mask << (x * self.stride) for x in range(rows))
+        self.valid = self.repeat(self.board_mask)
+
+    def repeat(self, board):
+        """
+        Copies a single-board mask into every board of the stack.
+
+        Precondition:
+            - board must be a mask inside board_mask
+        Postcondition:
+            - Returns the stacked mask
+        Invariant:
+            - Cost is linear in the size of the stack
+        """
+        if self.count == 1:
+            return board
+        return int.from_bytes(board.to_bytes(self.board_bytes, "little") * self.count, "little")
+
+    def bit(self, board, x, y):
+        """
+        Returns the bit index of a cell.
+
+        Precondition:
+            - board, x and y must be inside the layout
+        Postcondition:
+            - Returns an int usable as a shift amount
+        Invariant:
+            - Layout is unchanged
+        """
+        return board * self.board_bits + x * self.stride + y
+
+    def shifted_neighbors(self, mask):
+        """
+        Returns the eight masks of mask shifted onto each neighbor direction.
+
+        Precondition:
+            - mask must be inside valid
+        Postcondition:
+            - Each returned mask is inside valid
+        Invariant:
+            - Guard bits absorb shifts across row and board edges
+        """
+        stride = self.stride
+        valid = self.valid
+        return [(mask << 1) & valid, (mask >> 1) & valid,
+                (mask << stride) & valid, (mask >> stride) & valid,
+                (mask << (stride + 1)) & valid, (mask << (stride - 1)) & valid,
+                (mask >> (stride + 1)) & valid, (mask >> (stride - 1)) & valid]
+
+    def dilate(self, mask):
+        """
+        Returns mask together with all 8-neighbors of its cells.
+
+        Precondition:
+            - mask must be inside valid
+        Postcondition:
+            - Returned mask is inside valid and contains mask
+        Invariant:
+            - Cost is a few big-int operations, independent of the number of set bits
+        """
+        horizontal = mask | (mask << 1) | (mask >> 1)
+        return (horizontal | (horizontal << self.stride) | (horizontal >> self.stride)) & self.valid
+
+    def count_neighbors(self, mask):
+        """
+        Counts, for every cell at once, how many of its neighbors are in mask.
+
+        Precondition:
+            - mask must be inside valid
+        Postcondition:
+            - Returns four bit planes (1, 2, 4, 8) holding each cell's count
+        Invariant:
+            - Counts are built with bit-sliced adders, not per-cell loops
+        """
+        b0 = b1 = b2 = b3 = 0
+        for shifted in self.shifted_neighbors(mask):
+            carry0 = b0 & shifted
+            b0 ^= shifted
+            carry1 = b1 & carry0
+            b1 ^= carry0
+            carry2 = b2 & carry1
+            b2 ^= carry1
+            b3 |= carry2
+        return b0, b1, b2, b3
+
+    def split(self, mask):
+        """
+        Splits a stacked mask into one int per board.
+
+        Precondition:
+            - mask must be inside valid
+        Postcondition:
+            - Returns count ints in the single-board layout
+        Invariant:
+            - Cost is linear in the size of the stack
+        """
+        size = self.board_bytes
+        data = mask.to_bytes(size * self.count, "little")
+        return [int.from_bytes(data[i:i + size], "little") for i in range(0, len(data), size)]
+
+    def bit_counts(self, mask):
+        """
+        Returns the number of set bits of each board.
+
+        Precondition:
+            - mask must be inside valid
+        Postcondition:
+            - Returns a list of count ints
+        Invariant:
+            - Cost is linear in the size of the stack
+        """
+        return [board.bit_count() for board in self.split(mask)]
+
+    def stack(self, boards):
+        """
+        Stacks single-board masks into one mask.
+
+        Precondition:
+            - boards must hold count masks in the single-board layout
+        Postcondition:
+            - Returns the stacked mask
+        Invariant:
+            - Inverse of split()
+        """
+        size = self.board_bytes
+        return int.from_bytes(b"".join(board.to_bytes(size, "little") for board in boards), "little")
+
+    def unpack(self, planes):
+        """
+        Expands bit planes into one byte per bit position.
+
+        Precondition:
+            - planes must be a sequence of at most 8 masks inside valid, the
+              plane at index k holding bit k of each value
+        Postcondition:
+            - Returns bytes of length count * board_bits; the byte at bit(b, x, y)
+              holds the value of that cell and guard positions hold 0
+        Invariant:
+            - Bits are expanded with bytes.translate and slice assignment, not per-cell loops
+        """
+        size = self.board_bytes * self.count
+        total = 0
+        for k, plane in enumerate(planes):
+            total |= int.from_bytes(unpack_bits(plane.to_bytes(size, "little")), "little") << k
+        return total.to_bytes(size * 8, "little")
+
+    def single(self):
+        """
+        Returns the layout of one board of this stack.
+
+        Precondition:
+            - None
+        Postcondition:
+            - Returned layout has count 1 and the same board geometry
+        Invariant:
+            - Bit positions inside a board are identical
+        """
+        return self if self.count == 1 else BitLayout(self.rows, self.cols)
+
+
+def masks_from_model(model, layout=None):
+    """
+    Packs the mines and treasures of a model into single-board masks.
+
+    Precondition:
+        - model must have an initialized board
+        - layout must be None or a BitLayout of the model's board size
+    Postcondition:
+        - Returns (layout, mines, treasures)
+    Invariant:
+        - Model state is unchanged
+    """
+    rows, cols = model.board_size
+    if layout is None:
+        layout = BitLayout(rows, cols)
+    mines = treasures = 0
+    for x, row in enumerate(model.board):
+        for y, cell in enumerate(row):
+            if cell.is_mine:
+                mines |= 1 << (x * layout.stride + y)
+            elif cell.has_treasure:
+                treasures |= 1 << (x * layout.stride + y)
+    return layout, mines, treasures
@@ -0,0 +1,410 @@
+from model.game_model import GameModel, Cell, REVEALED_BIT
+from model.board_snapshot import BoardSnapshot
+from model.events import CellRevealed
+from model.bitboard import BitLayout
+
+# Cell (x, y) of an 8x8 board is bit x * STRIDE + y of LAYOUT; the guard bit
+# after each row keeps neighbor shifts from wrapping between rows
+SIZE = 8
+LAYOUT = BitLayout(SIZE, SIZE)
+STRIDE = LAYOUT.stride
+FULL = LAYOUT.valid
+
+
+class Bitboard:
+    """
+    8x8 game state held as LAYOUT masks: mines, treasures, revealed and flagged
+    cells, plus the adjacency counts as four bit planes. Reveal cascades and the
+    win check are shift/mask arithmetic on model.bitboard.BitLayout, so
+    simulations can play small boards without Cell objects.
+
+    Invariants:
+        - mines and treasures are disjoint
+        - No cell is both revealed and flagged
+    """
+    __slots__ = ("mines", "treasures", "revealed", "flagged", "planes", "empty", "mines_count")
+
+    def __init__(self, mines, treasures=0):
+        """
+        Initializes a board with nothing revealed or flagged.
+
+        Precondition:
+            - mines and treasures must be disjoint masks inside LAYOUT.valid
+        Postcondition:
+            - Adjacency planes are computed
+        Invariant:
+            - Mine and treasure placement never changes
+        """
+        self.mines = mines
+        self.treasures = treasures
+        self.revealed = 0
+        self.flagged = 0
+        self.planes = LAYOUT.count_neighbors(mines)
+        b0, b1, b2, b3 = self.planes
+        self.empty = ~(b0 | b1 | b2 | b3) & FULL
+        self.mines_count = mines.bit_count()
+
+    @classmethod
+    def from_test_board(cls, test_board):
+        """
+        Creates a board from a test board layout.
+
+        Precondition:
+            - test_board must be an 8x8 2D list of 0 (empty), 1 (mine) and 2 (treasure)
+        Postcondition:
+            - Returns a Bitboard with the same mines and treasures
+        Invariant:
+            - test_board is unchanged
+        """
+        mines = treasures = 0
+        for x, row in enumerate(test_board):
+            for y, value in enumerate(row):
+                if value == 1:
+                    mines |= 1 << (x * STRIDE + y)
+                elif value == 2:
+                    treasures |= 1 << (x * STRIDE + y)
+        return cls(mines, treasures)
+
+    def adjacent_mines(self, bit):
+        """
+        Returns the adjacent mine count of the cell at a bit index.
+
+        Precondition:
+            - bit must be the LAYOUT bit of a board cell
+        Postcondition:
+            - Returns an int in range 0-8
+        Invariant:
+            - Board state is unchanged
+        """
+        b0, b1, b2, b3 = self.planes
+        return ((b0 >> bit) & 1) | ((b1 >> bit) & 1) << 1 | ((b2 >> bit) & 1) << 2 | ((b3 >> bit) & 1) << 3
+
+    def reveal(self, x, y):
+        """
+        Reveals a cell like the reveal move of GameModel.apply_moves.
+
+        Precondition:
+            - x and y must be valid board coordinates
+        Postcondition:
+            - Returns (result, changed) where result is "LOSS", "WIN_TREASURE",
+              "WIN" or False and changed is the mask of newly revealed cells
+            - Non-terminal reveals of a cell with no adjacent mine cascade
+        Invariant:
+            - Flagged cells remain unchanged
+        """
+        cell = 1 << (x * STRIDE + y)
+        if (self.revealed | self.flagged) & cell:
+            return False, 0
+        self.revealed |= cell
+        if self.treasures & cell:
+            return "WIN_TREASURE", cell
+        if self.mines & cell:
+            return "LOSS", cell
+        changed = cell
+        if self.empty & cell:
+            changed |= self.flood(cell)
+        return self.check_win(), changed
+
+    def flood(self, start):
+        """
+        Reveals the cells a reveal cascade from start reaches.
+
+        Precondition:
+            - start must be a mask of revealed cells with no adjacent mine
+        Postcondition:
+            - Every hidden, unflagged, non-treasure neighbor of a cascading cell is
+              revealed; revealed cells with no adjacent mine cascade further
+            - Returns the mask of newly revealed cells
+        Invariant:
+            - Treasures remain hidden
+            - Flagged cells remain unchanged
+        """
+        blocked = self.flagged | self.treasures
+        changed = 0
+        front = start
+        while front:
+            grown = LAYOUT.dilate(front) & ~(self.revealed | blocked)
+            self.revealed |= grown
+            changed |= grown
+            front = grown & self.empty
+        return changed
+
+    def toggle_flag(self, x, y):
+        """
+        Toggles the flag of a hidden cell.
+
+        Precondition:
+            - x and y must be valid board coordinates
+        Postcondition:
+            - Flag is toggled unless the cell is revealed
+            - Returns True if the flag changed
+        Invariant:
+            - Revealed cells cannot be flagged
+        """
+        cell = 1 << (x * STRIDE + y)
+        if self.revealed & cell:
+            return False
+        self.flagged ^= cell
+        return True
+
+    def check_win(self):
+        """
+        Checks the win condition of GameModel.check_win_condition.
+
+        Precondition:
+            - None
+        Postcondition:
+            - Returns "WIN" if won, False otherwise
+        Invariant:
+            - Incorrect flags prevent the win
+        """
+        if self.flagged & ~self.mines:
+            return False
+        hidden = ~self.revealed & FULL
+        if hidden.bit_count() == self.mines_count or (self.flagged & self.mines).bit_count() == self.mines_count:
+            return "WIN"
+        if not hidden & ~self.mines:
+            return "WIN"
+        return False
+
+
+class BitCell(Cell):
+    """
+    Cell view onto one bit of a Bitboard.
+    Reads and writes go to the board ints, so code written against Cell
+    attributes works unchanged.
+
+    Invariants:
+        - Mine, treasure and adjacency are read-only
+    """
+    def __init__(self, bits, x, y):
+        """
+        Initializes the view of cell (x, y).
+
+        Precondition:
+            - bits must be a Bitboard; x and y must be valid board coordinates
+        Postcondition:
+            - Cell reflects the current state of bits
+        Invariant:
+            - bits and coordinates remain constant
+        """
+        self.bits = bits
+        self.x = x
+        self.y = y
+        self.mask = 1 << (x * STRIDE + y)
+
+    @property
+    def is_mine(self):
+        return bool(self.bits.mines & self.mask)
+
+    @property
+    def has_treasure(self):
+        return bool(self.bits.treasures & self.mask)
+
+    @property
+    def adjacent_mines(self):
+        return self.bits.adjacent_mines(self.x * STRIDE + self.y)
+
+    @property
+    def is_revealed(self):
+        return bool(self.bits.revealed & self.mask)
+
+    @is_revealed.setter
+    def is_revealed(self, value):
+        if value:
+            self.bits.revealed |= self.mask
+        else:
+            self.bits.revealed &= ~self.mask
+
+    @property
+    def is_flagged(self):
+        return bool(self.bits.flagged & self.mask)
+
+    @is_flagged.setter
+    def is_flagged(self, value):
+        if value:
+            self.bits.flagged |= self.mask
+        else:
+            self.bits.flagged &= ~self.mask
+
+
+class BitboardGameModel(GameModel):
+    """
+    GameModel for 8x8 boards backed by a Bitboard.
+    The board holds BitCell views, so views, history, hibernation and saves work
+    unchanged, while reveal cascades, neighbor lookups and the win check run on
+    LAYOUT masks.
+
+    Invariants:
+        - board_size is (8, 8) whenever a board is placed
+    """
+    def __init__(self, difficulty, seed=None, safe_start=None, topology="square"):
+        """Initializes the game as GameModel does; only the square topology is supported."""
+        if topology != "square":
+            raise ValueError(f"Bitboard engine only supports the square topology, got {topology}")
+        super().__init__(difficulty, seed, safe_start, topology)
+        self.bits = None
+
+    def _board_ready(self):
+        """Moves a newly built board into a Bitboard before announcing it."""
+        if self._pending_placement is None and not isinstance(self.board[0][0], BitCell):
+            self._adopt()
+        super()._board_ready()
+
+    def _clear_cells(self):
+        """Hides and unflags every cell with two assignments on the reused Bitboard."""
+        # reset_game dropped bits; the reused BitCells still point at it
+        self.bits = self.board[0][0].bits
+        self.bits.revealed = 0
+        self.bits.flagged = 0
+
+    def _place_mines(self, rng, excluded):
+        """Places mines as GameModel does, then moves the board into a Bitboard."""
+        super()._place_mines(rng, excluded)
+        self._adopt()
+
+    def resume(self):
+        """Restores a hibernated board as GameModel does, then moves it into a Bitboard."""
+        hibernated = self._hibernated is not None
+        super().resume()
+        if hibernated and self._pending_placement is None:
+            self._adopt()
+
+    def hibernate(self):
+        """Packs the board as GameModel does and drops the Bitboard; resume() rebuilds it."""
+        size = super().hibernate()
+        self.bits = None
+        return size
+
+    def reset_game(self):
+        """Resets the game as GameModel does and drops the Bitboard."""
+        super().reset_game()
+        self.bits = None
+
+    def snapshot(self):
+        """Copies all 64 cells into a snapshot at once, since the Bitboard changes without row hooks."""
+        if self._hibernated is not None:
+            self.resume()
+        if self.bits is None:
+            return super().snapshot()
+        rows = [bytes(cell.pack_state() for cell in row) for row in self.board]
+        return BoardSnapshot.from_rows(self.board_size, self.topology_kind, self.mines_count,
+                                       self.flags_count, self.clicked_count, rows)
+
+    def _adopt(self):
+        """
+        Moves the Cell board into a Bitboard and replaces it with BitCell views.
+
+        Precondition:
+            - board must hold an 8x8 grid of Cells with mines placed
+        Postcondition:
+            - bits holds the board state; board holds BitCells
+            - Attributes views attached to cells (such as button) are kept
+        Invariant:
+            - Cell states are unchanged
+        """
+        if self.board_size != (SIZE, SIZE):
+            raise ValueError(f"Bitboard engine needs an 8x8 board, got {self.board_size}")
+        mines = treasures = revealed = flagged = 0
+        for row in self.board:
+            for cell in row:
+                bit = 1 << (cell.x * STRIDE + cell.y)
+                if cell.is_mine:
+                    mines |= bit
+                if cell.has_treasure:
+                    treasures |= bit
+                if cell.is_revealed:
+                    revealed |= bit
+                if cell.is_flagged:
+                    flagged |= bit
+        bits = Bitboard(mines, treasures)
+        bits.revealed = revealed
+        bits.flagged = flagged
+        self.bits = bits
+        board = []
+        for x, row in enumerate(self.board):
+            new_row = []
+            for y, cell in enumerate(row):
+                bit_cell = BitCell(bits, x, y)
+                if "button" in vars(cell):
+                    bit_cell.button = cell.button
+                new_row.append(bit_cell)
+            board.append(new_row)
+        self.board = board
+
+    def _calculate_adjacent_mines(self, x, y):
+        if self.bits is None:
+            return super()._calculate_adjacent_mines(x, y)
+        return self.bits.adjacent_mines(x * STRIDE + y)
+
+    def get_neighbors(self, x, y):
+        """
+        Returns the neighboring cells of (x, y).
+
+        Precondition:
+            - x and y must be valid board coordinates
+        Postcondition:
+            - Returns the same cells as GameModel.get_neighbors
+        Invariant:
+            - Neighbors come from one dilation of the cell bit
+        """
+        if self.bits is None:
+            return super().get_neighbors(x, y)
+        mask = LAYOUT.dilate(1 << (x * STRIDE + y)) & ~(1 << (x * STRIDE + y))
+        neighbors = []
+        while mask:
+            low = mask & -mask
+            nx, ny = divmod(low.bit_length() - 1, STRIDE)
+            neighbors.append(self.board[nx][ny])
+            mask ^= low
+        return neighbors
+
+    def iter_reveal_empty_cells(self, x, y):
+        """
+        Reveals the reveal cascade from (x, y) and yields its cells one by one.
+
+        Precondition:
+            - x and y must be valid board coordinates
+        Postcondition:
+            - Same cells are revealed as by GameModel.iter_reveal_empty_cells
+            - The whole cascade is revealed and recorded in history on the
+              first step, so stopping early leaves history matching the board
+        Invariant:
+            - Treasures remain hidden
+            - Flagged cells remain unchanged
+        """
+        if self._hibernated is not None:
+            self.resume()
+        if self.bits is None:
+            yield from super().iter_reveal_empty_cells(x, y)
+            return
+        changed = self.bits.flood(1 << (x * STRIDE + y))
+        cells = []
+        while changed:
+            low = changed & -changed
+            cells.append(divmod(low.bit_length() - 1, STRIDE))
+            changed ^= low
+        if self.history is not None:
+            for nx, ny in cells:
+                self.history.record(nx, ny, REVEALED_BIT)
+        events = self.events
+        for nx, ny in cells:
+            events.emit(CellRevealed, nx, ny)
+            yield nx, ny
+
+    def check_win_condition(self):
+        """
+        Checks if the game has been won through regular means.
+
+        Precondition:
+            - Board must be initialized
+        Postcondition:
+            - Returns the same result as GameModel.check_win_condition
+        Invariant:
+            - Cost is a few mask operations, not a pass over the cells
+        """
+        if self._hibernated is not None:
+            self.resume()
+        if self.bits is None:
+            return super().check_win_condition()
+        return self.bits.check_win()
@@ -0,0 +1,161 @@
+from array import array
+from random import Random, getrandbits
+
+from model.bitboard import BitLayout
+from model.game_model import GameModel, Cell, MINE_BIT, TREASURE_BIT, ADJACENT_SHIFT
+
+
+class BoardBatch:
+    """
+    A stack of generated boards of one difficulty held as compact arrays.
+    mines and treasures are stacked BitLayout masks, adjacency holds one byte per
+    layout bit position (the adjacent mine count at layout.bit(b, x, y)), and
+    mines_counts and seeds hold one entry per board.
+
+    Invariants:
+        - All boards share the board size of the difficulty
+        - Board b equals the board GameModel.initialize_board() builds from seeds[b]
+    """
+    def __init__(self, level, layout, mines, treasures, adjacency, mines_counts, seeds):
+        """
+        Initializes the batch from its arrays.
+
+        Precondition:
+            - level must be a difficulty name of GameModel
+            - mines and treasures must be disjoint stacked masks of layout
+            - adjacency must be layout.unpack() of the adjacent mine counts
+            - mines_counts and seeds must hold layout.count entries
+        Postcondition:
+            - Batch holds layout.count boards
+        Invariant:
+            - Arrays are not copied
+        """
+        self.level = level
+        self.layout = layout
+        self.mines = mines
+        self.treasures = treasures
+        self.adjacency = adjacency
+        self.mines_counts = mines_counts
+        self.seeds = seeds
+
+    def __len__(self):
+        return self.layout.count
+
+    def __getitem__(self, index):
+        """
+        Returns a sub-batch for a slice.
+
+        Precondition:
+            - index must be a slice with step 1 selecting at least one board
+        Postcondition:
+            - Returns a BoardBatch holding the selected boards in order
+        Invariant:
+            - This batch is unchanged
+        """
+        if not isinstance(index, slice):
+            raise TypeError("BoardBatch indices must be slices; use to_model() for one board")
+        start, stop, step = index.indices(len(self))
+        if step != 1 or stop <= start:
+            raise ValueError(f"Unsupported board slice: {index}")
+        layout = self.layout
+        sliced = BitLayout(layout.rows, layout.cols, stop - start)
+        bits = layout.board_bits
+        return BoardBatch(self.level, sliced, self._take(self.mines, start, stop),
+                          self._take(self.treasures, start, stop),
+                          self.adjacency[start * bits:stop * bits],
+                          self.mines_counts[start:stop], self.seeds[start:stop])
+
+    def _take(self, mask, start, stop):
+        size = self.layout.board_bytes
+        data = mask.to_bytes(size * self.layout.count, "little")
+        return int.from_bytes(data[start * size:stop * size], "little")
+
+    def to_model(self, index):
+        """
+        Builds a game model holding one board of the batch.
+
+        Precondition:
+            - index must be a valid board index
+        Postcondition:
+            - Returns a GameModel with the board placed and no cell revealed or flagged
+            - seed of the model reproduces the board
+        Invariant:
+            - This batch is unchanged
+        """
+        index = range(len(self))[index]
+        layout = self.layout
+        single = layout.single()
+        mines = self._take(self.mines, index, index + 1)
+        treasures = self._take(self.treasures, index, index + 1)
+        base = index * layout.board_bits
+        model = GameModel(self.level)
+        model.board_size = (layout.rows, layout.cols)
+        model.mines_count = self.mines_counts[index]
+        model.seed = self.seeds[index]
+        board = []
+        for x in range(layout.rows):
+            row = []
+            for y in range(layout.cols):
+                bit = x * single.stride + y
+                state = ((MINE_BIT if mines >> bit & 1 else 0)
+                         | (TREASURE_BIT if treasures >> bit & 1 else 0)
+                         | (self.adjacency[base + bit] << ADJACENT_SHIFT))
+                row.append(Cell.from_state(state, x, y))
+            board.append(row)
+        model.board = board
+        return model
+
+
+def generate_boards(difficulty, count, seed=None):
+    """
+    Generates a batch of boards for a difficulty.
+
+    Precondition:
+        - difficulty must be a difficulty name of GameModel
+        - count must be a positive integer
+        - seed must be None or an integer
+    Postcondition:
+        - Returns a BoardBatch of count boards
+        - With a seed, board b equals the board built by the (b + 1)-th
+          initialize_board() call of GameModel(difficulty, seed=seed)
+    Invariant:
+        - No Cell objects are created; adjacency counts for the whole batch
+          come from bit-parallel adders over the stacked mine mask
+    """
+    settings = GameModel.DIFFICULTY_TO_LEVEL.get(difficulty)
+    if not settings:
+        raise ValueError(f"Unknown difficulty level: {difficulty}")
+    rows, cols = settings['board_size']
+    low, high = settings['mines_range']
+    layout = BitLayout(rows, cols, count)
+    stride = layout.stride
+    cells = rows * cols
+    positions = range(cells)
+    all_positions = frozenset(positions)
+    bit_values = [1 << (pos // cols * stride + pos % cols) for pos in positions]
+
+    master = Random(getrandbits(32) if seed is None else seed)
+    seeds = array('I')
+    mines_counts = array('i')
+    mine_masks = []
+    treasure_masks = []
+    for _ in range(count):
+        board_seed = master.getrandbits(32)
+        # Same draws, in the same order, as GameModel.initialize_board
+        rng = Random(board_seed)
+        num_mines = rng.randint(low, high)
+        mine_positions = rng.sample(positions, num_mines)
+        treasures_count = rng.randint(0, num_mines - 1) if num_mines > 1 else 0
+        treasure_mask = 0
+        if treasures_count > 0:
+            available = sorted(all_positions.difference(mine_positions))
+            treasure_positions = rng.sample(available, min(treasures_count, len(available)))
+            treasure_mask = sum(map(bit_values.__getitem__, treasure_positions))
+        seeds.append(board_seed)
+        mines_counts.append(num_mines)
+        mine_masks.append(sum(map(bit_values.__getitem__, mine_positions)))
+        treasure_masks.append(treasure_mask)
+
+    mines = layout.stack(mine_masks)
+    adjacency = layout.unpack(layout.count_neighbors(mines))
+    return BoardBatch(difficulty, layout, mines, layout.stack(treasure_masks), adjacency, mines_counts, seeds)
@@ -0,0 +1,103 @@
+from model.bitboard import BitLayout, masks_from_model
+
+
+def batch_metrics(layout, mines, treasures):
+    """
+    Computes difficulty metrics for a stack of boards.
+
+    Openings are 8-connected regions of zero cells (non-mine, non-treasure cells
+    with no adjacent mine); one click reveals an opening and its border. Isolated
+    cells are numbered cells not bordering any opening, each needing its own
+    click. 3BV, the minimum number of clicks to clear a board, is openings plus
+    isolated cells. Treasures are never revealed by a cascade; a treasure is
+    reachable when it borders an opening, so it is provably safe once that
+    opening is revealed.
+
+    Precondition:
+        - layout must be a BitLayout
+        - mines and treasures must be disjoint stacked masks inside layout.valid
+    Postcondition:
+        - Returns one dictionary per board with keys "3bv", "openings",
+          "opening_sizes", "isolated", "treasures" and "reachable_treasures"
+    Invariant:
+        - Adjacency, isolated cells and treasure reachability are computed for
+          the whole stack with bitwise operations; only the opening flood fill
+          runs per board, on that board's bits
+    """
+    b0, b1, b2, b3 = layout.count_neighbors(mines)
+    plain = layout.valid & ~mines & ~treasures
+    zeros = plain & ~(b0 | b1 | b2 | b3)
+    bordered = layout.dilate(zeros)
+    isolated = plain & ~bordered
+    reachable = treasures & bordered
+
+    single = layout.single()
+    results = []
+    for board_zeros, board_plain, isolated_count, treasure_count, reachable_count in zip(
+            layout.split(zeros), layout.split(plain), layout.bit_counts(isolated),
+            layout.bit_counts(treasures), layout.bit_counts(reachable)):
+        sizes = []
+        remaining = board_zeros
+        while remaining:
+            opening = remaining & -remaining
+            while True:
+                grown = single.dilate(opening) & board_zeros
+                if grown == opening:
+                    break
+                opening = grown
+            remaining &= ~opening
+            sizes.append((single.dilate(opening) & board_plain).bit_count())
+        results.append({
+            "3bv": len(sizes) + isolated_count,
+            "openings": len(sizes),
+            "opening_sizes": sizes,
+            "isolated": isolated_count,
+            "treasures": treasure_count,
+            "reachable_treasures": reachable_count,
+        })
+    return results
+
+
+def board_metrics(model):
+    """
+    Computes difficulty metrics for the board of a game model.
+
+    Precondition:
+        - model must have an initialized board with mines placed
+    Postcondition:
+        - Returns a dictionary as described in batch_metrics
+    Invariant:
+        - Model state is unchanged
+    """
+    layout, mines, treasures = masks_from_model(model)
+    return batch_metrics(layout, mines, treasures)[0]
+
+
+def boards_metrics(boards):
+    """
+    Computes difficulty metrics for test-board style layouts of equal size.
+
+    Precondition:
+        - boards must be a non-empty list of rectangular 2D lists of 0 (empty),
+          1 (mine) and 2 (treasure), all of the same size
+    Postcondition:
+        - Returns one dictionary per board as described in batch_metrics
+    Invariant:
+        - Input boards are unchanged
+    """
+    rows, cols = len(boards[0]), len(boards[0][0])
+    layout = BitLayout(rows, cols, len(boards))
+    single = layout.single()
+    mines = []
+    treasures = []
+    for board in boards:
+        board_mines = board_treasures = 0
+        for x, row in enumerate(board):
+            for y, value in enumerate(row):
+                if value == 1:
+                    board_mines |= 1 << (x * single.stride + y)
+                elif value == 2:
+                    board_treasures |= 1 << (x * single.stride + y)
+        mines.append(board_mines)
+        treasures.append(board_treasures)
+    return batch_metrics(layout, layout.stack(mines), layout.stack(treasures))
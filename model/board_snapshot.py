@@ -0,0 +1,123 @@
+def pack_row(board, x):
+    """
+    Returns the packed cell states of row x of a board.
+
+    Precondition:
+        - board must be a list of Cell rows or provide packed_row(x), like
+          model.save_file.LazyBoard
+        - x must be a valid row index
+    Postcondition:
+        - Returns bytes with one Cell.pack_state() value per cell
+    Invariant:
+        - Board is unchanged; rows of a lazy board are not materialized
+    """
+    if isinstance(board, list):
+        return bytes(cell.pack_state() for cell in board[x])
+    return board.packed_row(x)
+
+
+class BoardSnapshot:
+    """
+    Read-only view of a game board at one moment.
+    A snapshot starts out reading the live board, so taking one costs O(1).
+    Before the game changes a row, the model copies that row into every live
+    snapshot (see GameModel.snapshot), so rows read later still show the
+    board as it was. Only rows changed after the snapshot are ever copied.
+    Snapshots can be read from another thread while play continues.
+
+    Invariants:
+        - Rows and counters never change once the snapshot is taken
+        - Copied rows are stored at most once; the first stored copy wins
+    """
+    def __init__(self, board_size, topology_kind, mines_count, flags_count, clicked_count, board):
+        """
+        Initializes a snapshot over a live board.
+
+        Precondition:
+            - board must be the board of a GameModel that calls preserve()
+              before changing any of its rows
+            - topology_kind must be one of model.topology.TOPOLOGIES
+        Postcondition:
+            - No row is copied yet
+        Invariant:
+            - board is not copied
+        """
+        self.board_size = board_size
+        self.topology_kind = topology_kind
+        self.mines_count = mines_count
+        self.flags_count = flags_count
+        self.clicked_count = clicked_count
+        self._board = board
+        self._rows = {}
+
+    @classmethod
+    def from_rows(cls, board_size, topology_kind, mines_count, flags_count, clicked_count, rows):
+        """
+        Creates a snapshot holding copies of every row.
+
+        Precondition:
+            - rows must hold board_size[0] bytes objects of board_size[1] packed states
+        Postcondition:
+            - Returns a snapshot that never reads a live board
+        Invariant:
+            - rows are not copied
+        """
+        snapshot = cls(board_size, topology_kind, mines_count, flags_count, clicked_count, None)
+        snapshot._rows = dict(enumerate(rows))
+        return snapshot
+
+    def row(self, x):
+        """
+        Returns the packed states of row x.
+
+        Precondition:
+            - x must be a valid row index
+        Postcondition:
+            - Returns bytes with one packed state per cell, as at snapshot time
+        Invariant:
+            - Snapshot content is unchanged
+        """
+        row = self._rows.get(x)
+        if row is None:
+            board = self._board
+            if board is None:
+                return self._rows[x]
+            # A row being changed right now was copied before the change
+            # began, and setdefault returns that copy
+            row = self._rows.setdefault(x, pack_row(board, x))
+        return row
+
+    def state(self, x, y):
+        """
+        Returns the packed state of cell (x, y).
+
+        Precondition:
+            - x and y must be valid board coordinates
+        Postcondition:
+            - Returns an int as produced by Cell.pack_state
+        Invariant:
+            - Snapshot content is unchanged
+        """
+        return self.row(x)[y]
+
+    def preserve(self, x, board):
+        """
+        Copies row x before the model changes it.
+
+        Precondition:
+            - Called on the game thread, before row x of board changes
+        Postcondition:
+            - Row x is stored if the snapshot reads board
+            - Returns True once the snapshot no longer needs preserving:
+              every row is copied or board is not the one it reads
+        Invariant:
+            - Rows already stored are unchanged
+        """
+        if self._board is not board:
+            return True
+        if x not in self._rows:
+            self._rows.setdefault(x, pack_row(board, x))
+            if len(self._rows) == self.board_size[0]:
+                self._board = None
+                return True
+        return False
@@ -0,0 +1,86 @@
+from model.game_model import Cell, ADJACENT_SHIFT
+from model.topology import get_topology
+
+# Maps a packed initial state to its layout value (0, 1 or 2)
+_LAYOUT_VALUES = bytes(state & 0x03 for state in range(256))
+
+
+class BoardTemplate:
+    """
+    Immutable compiled test board layout.
+    Holds the packed initial state of every cell (mine and treasure bits plus
+    the adjacent mine count, see Cell.pack_state) and the flat indexes of mines
+    and treasures, so a board can be rebuilt or reset without recomputing
+    adjacency from the raw layout.
+
+    Invariants:
+        - states holds one byte per cell, row by row, with no flag or revealed bits
+        - Template is never modified after construction
+    """
+    def __init__(self, test_board, topology="square"):
+        """
+        Compiles a test board layout.
+
+        Precondition:
+            - test_board must be a rectangular list of rows of 0 (empty),
+              1 (mine) and 2 (treasure), as lists of ints or bytes
+            - topology must be one of model.topology.TOPOLOGIES
+        Postcondition:
+            - states, mine_indexes and treasure_indexes describe the board
+        Invariant:
+            - test_board is unchanged
+        """
+        rows, cols = len(test_board), len(test_board[0])
+        self.board_size = (rows, cols)
+        self.topology_kind = topology
+        # Cell values 0, 1 and 2 equal the empty, MINE_BIT and TREASURE_BIT states
+        values = b"".join(bytes(row) for row in test_board)
+        self.mine_indexes = tuple(i for i, value in enumerate(values) if value == 1)
+        self.treasure_indexes = tuple(i for i, value in enumerate(values) if value == 2)
+        self.mines_count = len(self.mine_indexes)
+
+        neighbors = get_topology(topology, rows, cols)
+        offsets, indices = neighbors.offsets, neighbors.indices
+        counts = bytearray(len(values))
+        for i in self.mine_indexes:
+            for j in indices[offsets[i]:offsets[i + 1]]:
+                counts[j] += 1
+        states = int.from_bytes(values, "little") | int.from_bytes(counts, "little") << ADJACENT_SHIFT
+        self.states = states.to_bytes(len(values), "little")
+
+    def __len__(self):
+        return self.board_size[0]
+
+    def __getitem__(self, x):
+        """
+        Returns row x of the layout as cell values, like a test board row.
+
+        Precondition:
+            - x must be a valid row index
+        Postcondition:
+            - Returns bytes of 0 (empty), 1 (mine) and 2 (treasure)
+        Invariant:
+            - Template is unchanged
+        """
+        rows, cols = self.board_size
+        x = range(rows)[x]
+        row = self.states[x * cols:(x + 1) * cols]
+        return row.translate(_LAYOUT_VALUES)
+
+    def build_cells(self):
+        """
+        Creates a fresh board of cells in the initial state.
+
+        Precondition:
+            - None
+        Postcondition:
+            - Returns a 2D list of new Cell objects with mines, treasures and
+              adjacent mine counts set and nothing revealed or flagged
+        Invariant:
+            - Template is unchanged
+        """
+        rows, cols = self.board_size
+        states = self.states
+        return [[Cell.from_state(states[x * cols + y], x, y) for y in range(cols)]
+                for x in range(rows)]
+
@@ -0,0 +1,230 @@
+class CellRevealed:
+    """A cell was revealed, or hidden again by undo (revealed is the new state)."""
+    __slots__ = ("x", "y", "revealed")
+
+    def __init__(self, x, y, revealed=True):
+        self.x = x
+        self.y = y
+        self.revealed = revealed
+
+
+class FlagToggled:
+    """The flag of a cell was toggled (flagged is the new state)."""
+    __slots__ = ("x", "y", "flagged")
+
+    def __init__(self, x, y, flagged):
+        self.x = x
+        self.y = y
+        self.flagged = flagged
+
+
+class CountersChanged:
+    """The flag or click counter changed."""
+    __slots__ = ("flags_count", "clicked_count")
+
+    def __init__(self, flags_count, clicked_count):
+        self.flags_count = flags_count
+        self.clicked_count = clicked_count
+
+
+class GameReset:
+    """A new board was set up; every cell may have changed."""
+    __slots__ = ("board_size", "mines_count")
+
+    def __init__(self, board_size, mines_count):
+        self.board_size = board_size
+        self.mines_count = mines_count
+
+
+class GameOver:
+    """The game ended with result "LOSS", "WIN" or "WIN_TREASURE"."""
+    __slots__ = ("result",)
+
+    def __init__(self, result):
+        self.result = result
+
+
+EVENT_TYPES = (CellRevealed, FlagToggled, CountersChanged, GameReset, GameOver)
+
+
+class EventBus:
+    """
+    Synchronous publish/subscribe hub for the change events of one game.
+    Handlers subscribe to some event types, or to all of them, and are called
+    in subscription order on the thread that publishes.
+
+    Invariants:
+        - subscribed holds exactly the event types with at least one handler
+        - A handler subscribed during a publish is not called for that event
+    """
+    def __init__(self):
+        """
+        Initializes a bus without subscribers.
+
+        Precondition:
+            - None
+        Postcondition:
+            - No handler is subscribed
+        Invariant:
+            - Event types are the classes of EVENT_TYPES
+        """
+        self._handlers = {event_type: () for event_type in EVENT_TYPES}
+        self.subscribed = frozenset()
+
+    def subscribe(self, handler, *event_types):
+        """
+        Registers a handler.
+
+        Precondition:
+            - handler must be callable with one event
+            - event_types must be classes of EVENT_TYPES; none means all of them
+        Postcondition:
+            - handler is called for every later event of the given types
+            - Returns handler, for unsubscribe()
+        Invariant:
+            - Other subscriptions are unchanged
+        """
+        for event_type in event_types or EVENT_TYPES:
+            if event_type not in self._handlers:
+                raise ValueError(f"Unknown event type: {event_type}")
+            self._handlers[event_type] += (handler,)
+        self._update_subscribed()
+        return handler
+
+    def unsubscribe(self, handler):
+        """
+        Removes a handler from every event type.
+
+        Precondition:
+            - None
+        Postcondition:
+            - handler is no longer called
+        Invariant:
+            - Other subscriptions are unchanged
+        """
+        for event_type, handlers in self._handlers.items():
+            self._handlers[event_type] = tuple(h for h in handlers if h != handler)
+        self._update_subscribed()
+
+    def _update_subscribed(self):
+        self.subscribed = frozenset(t for t, handlers in self._handlers.items() if handlers)
+
+    def publish(self, event):
+        """
+        Calls the handlers of an event's type.
+
+        Precondition:
+            - event must be an instance of a class of EVENT_TYPES
+        Postcondition:
+            - Every handler subscribed to the type was called once, in order
+        Invariant:
+            - Handlers may publish or (un)subscribe while being called
+        """
+        for handler in self._handlers[type(event)]:
+            handler(event)
+
+    def emit(self, event_type, *args):
+        """
+        Publishes an event built from args, only if someone listens for it.
+
+        Precondition:
+            - event_type must be a class of EVENT_TYPES; args its constructor arguments
+        Postcondition:
+            - Same as publish(event_type(*args))
+        Invariant:
+            - No event object is created without subscribers
+        """
+        handlers = self._handlers[event_type]
+        if handlers:
+            event = event_type(*args)
+            for handler in handlers:
+                handler(event)
+
+
+class DirtyRegion:
+    """
+    Coalesces change events until a consumer processes them, usually once per frame.
+    Collects the changed cells and their bounding rectangle, whether counters
+    changed, whether the game was reset and how it ended, so a consumer redraws
+    each changed cell once however many events touched it.
+
+    Invariants:
+        - rect is None exactly when cells is empty; otherwise it is the
+          (top, left, bottom, right) inclusive bounds of cells
+        - A reset drops the cells changed before it
+    """
+    def __init__(self, bus=None, on_dirty=None):
+        """
+        Initializes a clean region, subscribed to bus if given.
+
+        Precondition:
+            - bus must be None or an EventBus
+            - on_dirty must be None or a callable without arguments
+        Postcondition:
+            - Region is clean; on_dirty is called each time it stops being clean
+        Invariant:
+            - bus and on_dirty remain constant
+        """
+        self.on_dirty = on_dirty
+        self._clear()
+        if bus is not None:
+            bus.subscribe(self.handle)
+
+    def _clear(self):
+        self.cells = set()
+        self.rect = None
+        self.counters = False
+        self.reset = None
+        self.game_over = None
+
+    def __bool__(self):
+        return bool(self.cells) or self.counters or self.reset is not None or self.game_over is not None
+
+    def handle(self, event):
+        """
+        Adds an event to the region.
+
+        Precondition:
+            - event must be an instance of a class of EVENT_TYPES
+        Postcondition:
+            - Region includes the change; on_dirty is called if it was clean
+        Invariant:
+            - Cost is constant per event
+        """
+        was_clean = not self
+        if isinstance(event, (CellRevealed, FlagToggled)):
+            x, y = event.x, event.y
+            self.cells.add((x, y))
+            if self.rect is None:
+                self.rect = (x, y, x, y)
+            else:
+                top, left, bottom, right = self.rect
+                self.rect = (min(top, x), min(left, y), max(bottom, x), max(right, y))
+        elif isinstance(event, CountersChanged):
+            self.counters = True
+        elif isinstance(event, GameReset):
+            self._clear()
+            self.reset = event
+            self.counters = True
+        elif isinstance(event, GameOver):
+            self.game_over = event.result
+        if was_clean and self.on_dirty is not None:
+            self.on_dirty()
+
+    def take(self):
+        """
+        Returns the collected changes and starts a new frame.
+
+        Precondition:
+            - None
+        Postcondition:
+            - Returns an unsubscribed DirtyRegion holding the changes so far
+            - This region is clean
+        Invariant:
+            - Subscription and on_dirty are unchanged
+        """
+        taken = DirtyRegion()
+        taken.cells, taken.rect, taken.counters = self.cells, self.rect, self.counters
+        taken.reset, taken.game_over = self.reset, self.game_over
+        self._clear()
+        return taken
@@ -1,5 +1,23 @@
-from random import sample, randint
-from datetime import datetime
+from random import Random, getrandbits
+from datetime import datetime, timedelta
+from time import monotonic
+from weakref import WeakSet
+import struct
+import zlib
+
+from model.board_snapshot import BoardSnapshot
+from model.events import EventBus, CellRevealed, FlagToggled, CountersChanged, GameReset, GameOver
+from model.topology import TOPOLOGIES, get_topology
+
+# Bit layout of a packed cell state byte (see Cell.pack_state)
+MINE_BIT = 0x01
+TREASURE_BIT = 0x02
+FLAG_BIT = 0x04
+REVEALED_BIT = 0x08
+ADJACENT_SHIFT = 4
+
+# rows, cols, mines_count, flags_count, clicked_count, elapsed seconds (-1 if not started)
+_HIBERNATE_HEADER = struct.Struct("<IIIIId")
 
 
 class Cell:
@@ -80,6 +98,42 @@ class Cell:
         if not self.is_revealed:
             self.is_flagged = not self.is_flagged
 
+    def pack_state(self):
+        """
+        Packs the cell state into a single byte.
+        
+        Precondition:
+            - Cell must be initialized
+        Postcondition:
+            - Returns an int in range 0-255 holding mine, treasure, flag and
+              revealed bits plus the adjacent mine count in the high nibble
+        Invariant:
+            - Cell state is unchanged
+        """
+        return ((MINE_BIT if self.is_mine else 0)
+                | (TREASURE_BIT if self.has_treasure else 0)
+                | (FLAG_BIT if self.is_flagged else 0)
+                | (REVEALED_BIT if self.is_revealed else 0)
+                | (self.adjacent_mines << ADJACENT_SHIFT))
+
+    @classmethod
+    def from_state(cls, state, x, y):
+        """
+        Creates a cell from a byte produced by pack_state.
+        
+        Precondition:
+            - state must be an int in range 0-255
+        Postcondition:
+            - Returns a Cell with the packed state and given coordinates
+        Invariant:
+            - pack_state() of the result equals state
+        """
+        cell = cls(bool(state & MINE_BIT), bool(state & TREASURE_BIT), x, y)
+        cell.is_flagged = bool(state & FLAG_BIT)
+        cell.is_revealed = bool(state & REVEALED_BIT)
+        cell.adjacent_mines = state >> ADJACENT_SHIFT
+        return cell
+
 class GameModel:
     """
     Implements the core game logic for Minesweeper.
@@ -100,30 +154,96 @@ class GameModel:
         }
     }
 
-    def __init__(self, difficulty):
+    SAFE_START_MODES = (None, 'cell', 'neighbors')
+
+    def __init__(self, difficulty, seed=None, safe_start=None, topology="square"):
         """
         Initializes a new game with specified difficulty.
         
         Precondition:
             - difficulty must be one of: 'beginner', 'intermediate', 'expert'
+            - seed must be None or an integer
+            - safe_start must be None, 'cell' or 'neighbors'
+            - topology must be one of model.topology.TOPOLOGIES
         Postcondition:
             - Game board is empty
             - All counters are initialized to 0
             - Difficulty settings are applied
+            - Board generation is reproducible when seed is given
+            - With safe_start, initialize_board defers mine placement to the
+              first reveal, keeping that cell (and its neighbors) free of mines
         Invariant:
             - Board size matches difficulty specifications
         
         Maps to: __init__ and setup() in original minesweeper.py
         """
         self.board = []
+        self.level = difficulty
         self.difficulty = self.DIFFICULTY_TO_LEVEL.get(difficulty)
         if not self.difficulty:
             raise ValueError(f"Unknown difficulty level: {difficulty}")
+        if safe_start not in self.SAFE_START_MODES:
+            raise ValueError(f"Unknown safe start mode: {safe_start}")
+        self.safe_start = safe_start
+        if topology not in TOPOLOGIES:
+            raise ValueError(f"Unknown topology: {topology}")
+        self.topology_kind = topology
+        self._topology = None
+        self._pending_placement = None
+        # model.board_template.BoardTemplate the test board was built from
+        self.template = None
+        # Optional model.history.MoveHistory recording cell changes for undo/redo
+        self.history = None
+        # Change events for views, recorders and other observers (see model.events)
+        self.events = EventBus()
         self.mines_count = 0
         self.flags_count = 0
         self.board_size = (0, 0)
         self.start_time = None
         self.clicked_count = 0
+        self.random = Random(getrandbits(32) if seed is None else seed)
+        self.seed = None
+        self.last_active = monotonic()
+        self._hibernated = None
+        # Live snapshots still reading the board, and the rows every one of
+        # them already holds a copy of (see snapshot)
+        self._snapshots = WeakSet()
+        self._preserved = set()
+
+    @property
+    def board_size(self):
+        """
+        Board dimensions as a (rows, cols) tuple.
+        
+        Precondition:
+            - None
+        Postcondition:
+            - Setting it drops the neighbor table of the previous shape
+        Invariant:
+            - topology always matches board_size
+        """
+        return self._board_size
+
+    @board_size.setter
+    def board_size(self, size):
+        self._board_size = size
+        self._topology = None
+
+    @property
+    def topology(self):
+        """
+        Shared neighbor table (model.topology.Topology) of the board shape.
+        
+        Precondition:
+            - Board size must be set
+        Postcondition:
+            - Table is looked up on first use after the board size changes
+        Invariant:
+            - Tables are shared by every model with the same shape
+        """
+        if self._topology is None:
+            self._topology = get_topology(self.topology_kind, *self._board_size)
+        return self._topology
 
     def initialize_test_board(self, test_board):
         """
@@ -136,6 +256,7 @@ class GameModel:
             - Board is initialized with test configuration
             - Mine and treasure positions are set
             - Adjacent mine counts are calculated
+            - GameReset is published
         Invariant:
             - Board dimensions remain constant
         
@@ -144,6 +265,8 @@ class GameModel:
         rows = len(test_board)
         cols = len(test_board[0])
         self.board_size = (rows, cols)
+        self._pending_placement = None
+        self.template = None
         self.board = [[Cell(x=i, y=j) for j in range(cols)] for i in range(rows)]
         
         self.mines_count = 0
@@ -155,9 +278,75 @@ class GameModel:
                 elif test_board[i][j] == 2:
                     self.board[i][j].has_treasure = True
         
-        for x in range(rows):
-            for y in range(cols):
-                self.board[x][y].adjacent_mines = self._calculate_adjacent_mines(x, y)
+        self._calculate_all_adjacent_mines()
+        self._board_ready()
+
+    def initialize_from_template(self, template):
+        """
+        Initializes the game board from a compiled test board.
+        
+        Precondition:
+            - template must be a model.board_template.BoardTemplate compiled
+              for this model's topology
+        Postcondition:
+            - Board holds new cells in the template's initial state
+            - template is remembered for reset_test_board
+            - GameReset is published
+        Invariant:
+            - Adjacent mine counts come from the template, not recomputed
+        """
+        if template.topology_kind != self.topology_kind:
+            raise ValueError(f"Template was compiled for the {template.topology_kind} topology")
+        self.board_size = template.board_size
+        self._pending_placement = None
+        self.board = template.build_cells()
+        self.mines_count = template.mines_count
+        self.template = template
+        self._board_ready()
+
+    def reset_test_board(self, template):
+        """
+        Restarts a test game, resetting only the state a game can change.
+        
+        Precondition:
+            - template must be a model.board_template.BoardTemplate compiled
+              for this model's topology
+        Postcondition:
+            - Game state is as after reset_game and initialize_from_template
+        Invariant:
+            - When the board was built from template and is still resident,
+              its cells are reused and only flags and revealed states are cleared
+        """
+        board = self.board
+        reusable = (self.template is template and self._hibernated is None
+                    and self._pending_placement is None and len(board) == template.board_size[0])
+        self.reset_game()
+        if not reusable:
+            self.initialize_from_template(template)
+            return
+        self.board = board
+        self.board_size = template.board_size
+        self.mines_count = template.mines_count
+        self.template = template
+        self._clear_cells()
+        self._board_ready()
+
+    def _clear_cells(self):
+        """
+        Hides and unflags every cell.
+        
+        Precondition:
+            - Board must be initialized
+        Postcondition:
+            - No cell is revealed or flagged
+        Invariant:
+            - Mines, treasures and adjacent mine counts are unchanged
+        """
+        self._preserve_all()
+        for row in self.board:
+            for cell in row:
+                cell.is_revealed = False
+                cell.is_flagged = False
 
     def initialize_board(self):
         """
@@ -167,8 +356,11 @@ class GameModel:
             - Difficulty settings must be valid
             - Board must be empty
         Postcondition:
-            - Board is populated with mines and treasures
+            - Board is populated with mines and treasures, or with safe_start
+              the mines count is drawn and placement waits for the first reveal
             - Adjacent mine counts are calculated
+            - seed holds the value that reproduces this board
+            - GameReset is published
         Invariant:
             - Number of mines is within difficulty range
             - Number of treasures is less than number of mines
@@ -177,30 +369,120 @@ class GameModel:
         """
         row, col = self.difficulty['board_size']
         self.board_size = self.difficulty['board_size']
+        self.template = None
         self.board = [[Cell(x=i, y=j) for j in range(col)] for i in range(row)]
-        self.mines_count = randint(*self.difficulty['mines_range'])
+        self.seed = self.random.getrandbits(32)
+        rng = Random(self.seed)
+        self.mines_count = rng.randint(*self.difficulty['mines_range'])
+        if self.safe_start is None:
+            self._place_mines(rng, ())
+        else:
+            self._pending_placement = rng
+        self._board_ready()
+
+    def _board_ready(self):
+        """
+        Announces a newly set up board.
+        
+        Precondition:
+            - Board, board_size and mines_count must describe the new game
+        Postcondition:
+            - GameReset is published
+        Invariant:
+            - Board state is unchanged
+        """
+        self.events.emit(GameReset, self.board_size, self.mines_count)
+
+    def _place_mines(self, rng, excluded):
+        """
+        Places mines and treasures and calculates adjacent mine counts.
+        
+        Precondition:
+            - Board must hold blank cells and mines_count must be set
+            - excluded must be a collection of flat cell positions (x * cols + y)
+        Postcondition:
+            - mines_count mines and fewer treasures are placed outside excluded
+            - Adjacent mine counts are calculated
+        Invariant:
+            - Number of treasures is less than number of mines
+        """
+        self._preserve_all()
+        row, col = self.board_size
         num_mines = self.mines_count
 
-        mine_positions = sample(range(row * col), num_mines)
+        if excluded:
+            candidates = [pos for pos in range(row * col) if pos not in excluded]
+            mine_positions = rng.sample(candidates, num_mines)
+        else:
+            mine_positions = rng.sample(range(row * col), num_mines)
         for pos in mine_positions:
             x, y = divmod(pos, col)
             self.board[x][y].is_mine = True
 
         if num_mines > 1:
-            treasures_count = randint(0, num_mines - 1)
+            treasures_count = rng.randint(0, num_mines - 1)
         else:
             treasures_count = 0
 
-        available_positions = [pos for pos in range(row * col) if pos not in mine_positions]
+        occupied = set(mine_positions).union(excluded)
+        available_positions = [pos for pos in range(row * col) if pos not in occupied]
         if treasures_count > 0:
-            treasure_positions = sample(available_positions, treasures_count)
+            treasure_positions = rng.sample(available_positions, min(treasures_count, len(available_positions)))
             for pos in treasure_positions:
                 x, y = divmod(pos, col)
                 self.board[x][y].has_treasure = True
 
-        for x in range(row):
-            for y in range(col):
-                self.board[x][y].adjacent_mines = self._calculate_adjacent_mines(x, y)
+        self._calculate_all_adjacent_mines()
+
+    def _place_mines_around(self, x, y):
+        """
+        Performs the deferred mine placement for a first reveal at (x, y).
+        
+        Precondition:
+            - Mine placement must be pending
+        Postcondition:
+            - Cell (x, y), and its neighbors for safe_start 'neighbors', hold
+              no mine or treasure, unless the board is too small to leave them free
+            - No placement is pending
+        Invariant:
+            - mines_count is unchanged
+        """
+        rng = self._pending_placement
+        self._pending_placement = None
+        col = self.board_size[1]
+        excluded = {x * col + y}
+        if self.safe_start == 'neighbors':
+            excluded.update(n.x * col + n.y for n in self.get_neighbors(x, y))
+        if self.board_size[0] * col - len(excluded) < self.mines_count:
+            excluded = {x * col + y}
+        self._place_mines(rng, excluded)
+
+    def _calculate_all_adjacent_mines(self):
+        """
+        Sets the adjacent mine count of every cell.
+        
+        Precondition:
+            - Board must be initialized with mines placed
+        Postcondition:
+            - Every cell holds its adjacent mine count
+        Invariant:
+            - Work is proportional to mines times neighbors, using the shared
+              neighbor table instead of a neighbor list per cell
+        """
+        cols = self.board_size[1]
+        topology = self.topology
+        offsets, indices = topology.offsets, topology.indices
+        counts = bytearray(len(offsets) - 1)
+        for x, row in enumerate(self.board):
+            for y, cell in enumerate(row):
+                if cell.is_mine:
+                    i = x * cols + y
+                    for j in indices[offsets[i]:offsets[i + 1]]:
+                        counts[j] += 1
+        for x, row in enumerate(self.board):
+            base = x * cols
+            for y, cell in enumerate(row):
+                cell.adjacent_mines = counts[base + y]
 
     def _calculate_adjacent_mines(self, x, y):
         """
@@ -235,20 +517,18 @@ class GameModel:
         Invariant:
             - Number of neighbors ≤ 8
             - All returned cells are valid board positions
+            - Neighbors come from the shared table of the board topology
         
         Maps to: getNeighbors() in original minesweeper.py
         """
-        rows, cols = self.board_size
-        neighbors = []
-        for dx, dy in [(-1, -1), (-1, 0), (-1, 1), 
-                       (0, -1),          (0, 1), 
-                       (1, -1),  (1, 0), (1, 1)]:
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < rows and 0 <= ny < cols:
-                neighbors.append(self.board[nx][ny])
-        return neighbors
+        board = self.board
+        topology = self.topology
+        cols = topology.cols
+        i = x * cols + y
+        return [board[j // cols][j % cols]
+                for j in topology.indices[topology.offsets[i]:topology.offsets[i + 1]]]
 
-    def reveal_cell(self, x, y):
+    def reveal_cell(self, x, y, check_win=True):
         """
         Reveals a cell and handles game state changes.
         
@@ -257,22 +537,35 @@ class GameModel:
             - Board must be initialized
         Postcondition:
             - Cell is revealed if not flagged
+            - CellRevealed and CountersChanged are published for a reveal
             - Game state is updated based on reveal result
+            - Win condition is only checked when check_win is True
         Invariant:
             - Game state remains valid
             - Clicked count only increases for valid reveals
         
         Maps to: onClick() in original minesweeper.py
         """
+        if self._hibernated is not None:
+            self.resume()
+        self.last_active = monotonic()
         if self.start_time is None:
             self.start_time = datetime.now()
+        if self._pending_placement is not None:
+            self._place_mines_around(x, y)
 
         cell = self.board[x][y]
         if cell.is_revealed or cell.is_flagged:
             return False
 
+        if x not in self._preserved:
+            self._before_change(x)
         cell.reveal()
         self.clicked_count += 1
+        if self.history is not None:
+            self.history.record(x, y, REVEALED_BIT, clicks=1)
+        self.events.emit(CellRevealed, x, y)
+        self.events.emit(CountersChanged, self.flags_count, self.clicked_count)
 
         if cell.has_treasure:
             return "WIN_TREASURE"
@@ -280,33 +573,150 @@ class GameModel:
         if cell.is_mine:
             return "LOSS"
 
+        if not check_win:
+            return False
         return self.check_win_condition()
 
-    def reveal_empty_cells(self, x, y, update_view):
+    def chord_cell(self, x, y, update_view=None, check_win=True):
+        """
+        Reveals all unflagged neighbors of a revealed number whose flags are satisfied.
+        
+        Precondition:
+            - x and y must be valid board coordinates
+            - update_view must be None or a callback taking (x, y)
+        Postcondition:
+            - If the flagged neighbor count equals the adjacent mine count,
+              every unflagged hidden neighbor is revealed
+            - Empty neighbors cascade as in reveal_empty_cells
+            - Returns "LOSS" or "WIN_TREASURE" at the first terminal reveal,
+              otherwise the win check result (False when check_win is False)
+        Invariant:
+            - Flagged cells remain unchanged
+        """
+        if self._hibernated is not None:
+            self.resume()
+        cell = self.board[x][y]
+        if not cell.is_revealed or cell.adjacent_mines == 0:
+            return False
+        neighbors = self.get_neighbors(x, y)
+        if sum(1 for neighbor in neighbors if neighbor.is_flagged) != cell.adjacent_mines:
+            return False
+
+        for neighbor in neighbors:
+            if neighbor.is_revealed or neighbor.is_flagged:
+                continue
+            result = self.reveal_cell(neighbor.x, neighbor.y, check_win=False)
+            if update_view is not None:
+                update_view(neighbor.x, neighbor.y)
+            if result:
+                return result
+            if neighbor.adjacent_mines == 0:
+                self.reveal_empty_cells(neighbor.x, neighbor.y, update_view)
+
+        if not check_win:
+            return False
+        return self.check_win_condition()
+
+    def apply_moves(self, moves, update_view=None):
+        """
+        Applies a batch of moves and checks the win condition once.
+        
+        Precondition:
+            - moves must be an iterable of (x, y, action) tuples where action is
+              'r' (reveal), 'f' (flag) or 'c' (chord)
+            - update_view must be None or a callback taking (x, y)
+        Postcondition:
+            - Moves are applied in order until the first terminal event
+            - update_view, if given, is called for every changed cell
+            - Returns "LOSS" or "WIN_TREASURE" at the first terminal event,
+              otherwise the result of a single win check after the batch
+        Invariant:
+            - Game state is the same as applying the moves one at a time
+        """
+        if self._hibernated is not None:
+            self.resume()
+        for x, y, action in moves:
+            if action == "r":
+                cell = self.board[x][y]
+                if cell.is_revealed or cell.is_flagged:
+                    continue
+                result = self.reveal_cell(x, y, check_win=False)
+                if update_view is not None:
+                    update_view(x, y)
+                if result:
+                    return result
+                if cell.adjacent_mines == 0:
+                    self.reveal_empty_cells(x, y, update_view)
+            elif action == "f":
+                self.toggle_flag(x, y)
+                if update_view is not None:
+                    update_view(x, y)
+            elif action == "c":
+                result = self.chord_cell(x, y, update_view, check_win=False)
+                if result:
+                    return result
+            else:
+                raise ValueError(f"Unknown move action: {action}")
+        return self.check_win_condition()
+
+    def reveal_empty_cells(self, x, y, update_view=None):
         """
         Reveals empty cells recursively and updates the view.
         
         Precondition:
             - x and y must be valid board coordinates
-            - update_view must be a valid callback function
+            - update_view must be None or a callback taking (x, y)
         Postcondition:
             - All connected empty cells are revealed
-            - View is updated for each revealed cell
+            - update_view, if given, is called for each revealed cell
         Invariant:
             - Treasures remain hidden
             - Flagged cells remain unchanged
         
         Maps to: clearSurroundingTiles() in original minesweeper.py
         """
-        stack = [(x, y)]
+        for cell_x, cell_y in self.iter_reveal_empty_cells(x, y):
+            if update_view is not None:
+                update_view(cell_x, cell_y)
+
+    def iter_reveal_empty_cells(self, x, y):
+        """
+        Reveals empty cells lazily, one cell per step.
+        
+        Precondition:
+            - x and y must be valid board coordinates
+        Postcondition:
+            - Yields the (x, y) coordinates of each cell right after revealing it
+              and publishing CellRevealed
+            - Exhausting the generator reveals the same cells as reveal_empty_cells
+        Invariant:
+            - Treasures remain hidden
+            - Flagged cells remain unchanged
+            - Cell state is re-checked at every step, so moves made between
+              steps never reveal a cell twice
+        """
+        if self._hibernated is not None:
+            self.resume()
+        board = self.board
+        topology = self.topology
+        cols = topology.cols
+        offsets, indices = topology.offsets, topology.indices
+        events = self.events
+        stack = [x * cols + y]
         while stack:
-            cx, cy = stack.pop()
-            for neighbor in self.get_neighbors(cx, cy):
+            i = stack.pop()
+            for j in indices[offsets[i]:offsets[i + 1]]:
+                neighbor = board[j // cols][j % cols]
                 if not neighbor.is_revealed and not neighbor.is_flagged and not neighbor.has_treasure:
+                    if neighbor.x not in self._preserved:
+                        self._before_change(neighbor.x)
                     neighbor.reveal()
-                    update_view(neighbor.x, neighbor.y)
+                    if self.history is not None:
+                        self.history.record(neighbor.x, neighbor.y, REVEALED_BIT)
+                    events.emit(CellRevealed, neighbor.x, neighbor.y)
                     if neighbor.adjacent_mines == 0:
-                        stack.append((neighbor.x, neighbor.y))
+                        stack.append(j)
+                    yield neighbor.x, neighbor.y
 
     def toggle_flag(self, x, y):
         """
@@ -318,16 +728,26 @@ class GameModel:
         Postcondition:
             - Cell flag state is toggled if not revealed
             - Flag count is updated accordingly
+            - FlagToggled and CountersChanged are published for a toggle
         Invariant:
             - Flag count matches number of flagged cells
             - Revealed cells cannot be flagged
         
         Maps to: onRightClick() in original minesweeper.py
         """
+        if self._hibernated is not None:
+            self.resume()
+        self.last_active = monotonic()
         cell = self.board[x][y]
         if not cell.is_revealed:
+            if x not in self._preserved:
+                self._before_change(x)
             cell.toggle_flag()
             self.flags_count += 1 if cell.is_flagged else -1
+            if self.history is not None:
+                self.history.record(x, y, FLAG_BIT)
+            self.events.emit(FlagToggled, x, y, cell.is_flagged)
+            self.events.emit(CountersChanged, self.flags_count, self.clicked_count)
 
     def check_win_condition(self):
         """
@@ -337,17 +757,29 @@ class GameModel:
             - Board must be initialized
             - Game must be in progress
         Postcondition:
-            - Returns "WIN" if won, False otherwise
+            - Returns "WIN" if won, False otherwise; a hibernated board is resumed first
         Invariant:
             - Win condition remains consistent with game rules
             - Incorrect flags prevent win condition
         
         Maps to: gameOver() win condition check in original minesweeper.py
         """
+        if self._hibernated is not None:
+            self.resume()
+        board = self.board
+        if not isinstance(board, list):
+            # Lazily loaded saves count packed rows instead of building Cells
+            hidden, hidden_safe, flagged_mines, wrong_flags = board.win_counts()
+            if wrong_flags:
+                return False
+            if hidden == self.mines_count or flagged_mines == self.mines_count or hidden_safe == 0:
+                return "WIN"
+            return False
+
         unrevealed_count = 0
         flagged_mines = 0
 
-        for row in self.board:
+        for row in board:
             for cell in row:
                 if not cell.is_revealed:
                     unrevealed_count += 1
@@ -364,6 +796,21 @@ class GameModel:
 
         return False
 
+    def end_game(self, result):
+        """
+        Announces the end of the game.
+        
+        Precondition:
+            - result must be "LOSS", "WIN" or "WIN_TREASURE"
+        Postcondition:
+            - GameOver is published
+        Invariant:
+            - Board state is unchanged
+        """
+        if result not in ("LOSS", "WIN", "WIN_TREASURE"):
+            raise ValueError(f"Not a game over result: {result}")
+        self.events.emit(GameOver, result)
+
     def reset_game(self):
         """
         Resets the game state for a new game.
@@ -385,3 +832,152 @@ class GameModel:
         self.board_size = (0, 0)
         self.start_time = None
         self.clicked_count = 0
+        self.seed = None
+        self._pending_placement = None
+        if self.history is not None:
+            self.history.clear()
+        self.last_active = monotonic()
+        self._hibernated = None
+
+    @property
+    def is_hibernated(self):
+        """
+        Tells whether the board is currently held as packed bytes.
+        
+        Precondition:
+            - Game model must exist
+        Postcondition:
+            - Returns True if hibernate() was called and the game not resumed
+        Invariant:
+            - Game state is unchanged
+        """
+        return self._hibernated is not None
+
+    def has_pending_placement(self):
+        """
+        Tells whether mines are still waiting to be placed on the first reveal.
+        
+        Precondition:
+            - Game model must exist
+        Postcondition:
+            - Returns True between initialize_board and the first reveal in safe_start mode
+        Invariant:
+            - Game state is unchanged
+        """
+        return self._pending_placement is not None
+
+    def hibernate(self):
+        """
+        Packs the board into a compressed byte string and drops the Cell objects.
+        
+        Precondition:
+            - Board must be initialized
+            - No view may hold references to the board cells
+        Postcondition:
+            - Board state, counters and elapsed time are stored as bytes
+            - self.board is empty until resume() is called
+            - Returns the size of the packed state in bytes
+        Invariant:
+            - resume() restores an equivalent board
+        """
+        if self._hibernated is not None:
+            return len(self._hibernated)
+        rows, cols = self.board_size
+        if self.start_time is None:
+            elapsed = -1.0
+        else:
+            elapsed = (datetime.now() - self.start_time).total_seconds()
+        header = _HIBERNATE_HEADER.pack(rows, cols, self.mines_count, self.flags_count,
+                                        self.clicked_count, elapsed)
+        states = bytes(cell.pack_state() for row in self.board for cell in row)
+        self._hibernated = header + zlib.compress(states)
+        self.board = []
+        return len(self._hibernated)
+
+    def resume(self):
+        """
+        Restores a hibernated board.
+        
+        Precondition:
+            - hibernate() must have been called
+        Postcondition:
+            - Board, counters and start time are restored
+            - Time spent hibernated is not counted as elapsed game time
+        Invariant:
+            - Board state equals the state at hibernation
+        """
+        packed = self._hibernated
+        if packed is None:
+            return
+        rows, cols, self.mines_count, self.flags_count, self.clicked_count, elapsed = \
+            _HIBERNATE_HEADER.unpack_from(packed)
+        states = zlib.decompress(packed[_HIBERNATE_HEADER.size:])
+        self.board_size = (rows, cols)
+        self.board = [[Cell.from_state(states[i * cols + j], i, j) for j in range(cols)]
+                      for i in range(rows)]
+        self.start_time = None if elapsed < 0 else datetime.now() - timedelta(seconds=elapsed)
+        self.last_active = monotonic()
+        self._hibernated = None
+
+    def snapshot(self):
+        """
+        Takes a copy-on-write snapshot of the board for readers on other threads.
+        
+        Precondition:
+            - Board must be initialized
+        Postcondition:
+            - Returns a model.board_snapshot.BoardSnapshot of the current board
+              and counters in O(1); a hibernated board is resumed first
+            - Rows are copied into the snapshot only when they change afterwards
+        Invariant:
+            - Game state is unchanged; later moves do not affect the snapshot
+        """
+        if self._hibernated is not None:
+            self.resume()
+        snapshot = BoardSnapshot(self.board_size, self.topology_kind, self.mines_count,
+                                 self.flags_count, self.clicked_count, self.board)
+        self._snapshots.add(snapshot)
+        self._preserved = set()
+        return snapshot
+
+    def _before_change(self, x):
+        """
+        Copies row x into the live snapshots before it changes.
+        
+        Precondition:
+            - Called before any cell of row x changes
+        Postcondition:
+            - Every live snapshot of this board holds row x as it is now
+            - Snapshots that need no further copies stop being tracked
+            - A lazily loaded save board marks row x dirty for SaveFile.sync
+        Invariant:
+            - Board state is unchanged
+        """
+        if x in self._preserved:
+            return
+        self._preserved.add(x)
+        board = self.board
+        if not isinstance(board, list):
+            board.dirty.add(x)
+        for snapshot in list(self._snapshots):
+            if snapshot.preserve(x, board):
+                self._snapshots.discard(snapshot)
+
+    def rows_synced(self):
+        """
+        Restarts change tracking after a save file wrote the changed rows.
+        
+        Precondition:
+            - Called by SaveFile.sync after writing the rows of a LazyBoard
+        Postcondition:
+            - The next change of every row goes through _before_change again
+        Invariant:
+            - Live snapshots keep the rows already copied into them
+        """
+        self._preserved = set()
+
+    def _preserve_all(self):
+        """Copies every row not yet copied into the live snapshots, before a board-wide change."""
+        if self._snapshots:
+            for x in range(len(self.board)):
+                self._before_change(x)
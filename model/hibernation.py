@@ -0,0 +1,103 @@
+from time import monotonic
+
+
+class HibernationPolicy:
+    """
+    Hibernates game models that have been idle longer than a threshold.
+    Lets a long-running process keep many games while only the active
+    ones hold a full board of Cell objects.
+
+    Invariants:
+        - idle_seconds must be non-negative
+        - Every tracked model is a valid GameModel instance
+    """
+    def __init__(self, idle_seconds=300):
+        """
+        Initializes the policy.
+
+        Precondition:
+            - idle_seconds must be a non-negative number
+        Postcondition:
+            - Policy tracks no games
+        Invariant:
+            - Threshold remains constant
+        """
+        if idle_seconds < 0:
+            raise ValueError(f"idle_seconds must be non-negative: {idle_seconds}")
+        self.idle_seconds = idle_seconds
+        self.models = {}
+
+    def track(self, key, model):
+        """
+        Starts tracking a game model under the given key.
+
+        Precondition:
+            - model must be a valid GameModel instance
+        Postcondition:
+            - Model is considered by subsequent sweeps
+        Invariant:
+            - One model per key
+        """
+        self.models[key] = model
+
+    def untrack(self, key):
+        """
+        Stops tracking the game model under the given key.
+
+        Precondition:
+            - None
+        Postcondition:
+            - Returns the model, or None if the key was unknown
+        Invariant:
+            - Model state is unchanged
+        """
+        return self.models.pop(key, None)
+
+    def get(self, key):
+        """
+        Returns a tracked model, resumed and ready for a move.
+
+        Precondition:
+            - key must be tracked
+        Postcondition:
+            - Returned model has a resident board
+        Invariant:
+            - Board state is unchanged by hibernation
+        """
+        model = self.models[key]
+        model.resume()
+        return model
+
+    def sweep(self, now=None):
+        """
+        Hibernates every tracked model idle beyond the threshold.
+
+        Precondition:
+            - now must be None or a time.monotonic() value
+        Postcondition:
+            - Idle models are hibernated
+            - Returns the keys hibernated by this sweep
+        Invariant:
+            - Active models are left untouched
+        """
+        if now is None:
+            now = monotonic()
+        hibernated = []
+        for key, model in self.models.items():
+            if not model.is_hibernated and now - model.last_active > self.idle_seconds:
+                model.hibernate()
+                hibernated.append(key)
+        return hibernated
+
+    def resident_count(self):
+        """
+        Returns the number of tracked models with a resident board.
+
+        Precondition:
+            - None
+        Postcondition:
+            - Returns a count between 0 and the number of tracked models
+        Invariant:
+            - Model state is unchanged
+        """
+        return sum(1 for model in self.models.values() if not model.is_hibernated)
@@ -0,0 +1,173 @@
+from array import array
+from collections import deque
+
+from model.events import CellRevealed, FlagToggled, CountersChanged
+from model.game_model import FLAG_BIT, REVEALED_BIT
+
+
+class MoveHistory:
+    """
+    Undo/redo history of a game stored as per-move deltas.
+    Each move keeps only the cells it changed, as (x, y, mask) triples where mask
+    holds the flipped REVEALED_BIT and FLAG_BIT, plus the clicks it added.
+    Undo and redo flip the same bits, so a step costs time and memory
+    proportional to the cells it changed, whatever the board size.
+
+    Invariants:
+        - Every recorded delta flips state that was actually changed
+        - Redo moves are discarded when a new move is recorded
+    """
+    def __init__(self, limit=None):
+        """
+        Initializes an empty history.
+
+        Precondition:
+            - limit must be None or a positive integer
+        Postcondition:
+            - No moves are recorded; at most limit moves are kept
+        Invariant:
+            - limit remains constant
+        """
+        self.done = deque(maxlen=limit)
+        self.undone = []
+        self.pending = None
+
+    def record(self, x, y, mask, clicks=0):
+        """
+        Records a cell change of the move in progress.
+
+        Precondition:
+            - The bits in mask must just have been flipped on cell (x, y)
+        Postcondition:
+            - Change belongs to the move closed by the next commit()
+            - Redo history is discarded
+        Invariant:
+            - Recorded deltas match the board changes
+        """
+        if self.pending is None:
+            self.pending = [0, array('i')]
+            self.undone.clear()
+        self.pending[0] += clicks
+        self.pending[1].extend((x, y, mask))
+
+    def commit(self):
+        """
+        Closes the move in progress.
+
+        Precondition:
+            - None
+        Postcondition:
+            - Recorded changes form one undo step; empty moves are dropped
+        Invariant:
+            - Board state is unchanged
+        """
+        if self.pending is not None:
+            self.done.append(self.pending)
+            self.pending = None
+
+    def clear(self):
+        """
+        Forgets all moves.
+
+        Precondition:
+            - None
+        Postcondition:
+            - Nothing can be undone or redone
+        Invariant:
+            - Board state is unchanged
+        """
+        self.done.clear()
+        self.undone.clear()
+        self.pending = None
+
+    def can_undo(self):
+        """
+        Tells whether there is a move to undo.
+
+        Precondition:
+            - None
+        Postcondition:
+            - Returns True if a committed or pending move exists
+        Invariant:
+            - History is unchanged
+        """
+        return self.pending is not None or bool(self.done)
+
+    def can_redo(self):
+        """
+        Tells whether there is an undone move to redo.
+
+        Precondition:
+            - None
+        Postcondition:
+            - Returns True if undo() was called since the last recorded move
+        Invariant:
+            - History is unchanged
+        """
+        return bool(self.undone)
+
+    def undo(self, model):
+        """
+        Reverts the last move on a model.
+
+        Precondition:
+            - model must be the game this history was recorded on
+        Postcondition:
+            - Cells, flags_count and clicked_count are restored to before the move
+            - Change events are published on model.events for each flipped bit
+            - Returns the (x, y) coordinates of changed cells
+        Invariant:
+            - Mine and treasure placement is unchanged
+        """
+        self.commit()
+        if not self.done:
+            return []
+        move = self.done.pop()
+        self.undone.append(move)
+        return self._flip(model, move, -1)
+
+    def redo(self, model):
+        """
+        Reapplies the last undone move on a model.
+
+        Precondition:
+            - model must be the game this history was recorded on
+        Postcondition:
+            - Cells, flags_count and clicked_count are as after the move
+            - Change events are published on model.events for each flipped bit
+            - Returns the (x, y) coordinates of changed cells
+        Invariant:
+            - Mine and treasure placement is unchanged
+        """
+        if self.pending is not None or not self.undone:
+            return []
+        move = self.undone.pop()
+        self.done.append(move)
+        return self._flip(model, move, 1)
+
+    @staticmethod
+    def _flip(model, move, direction):
+        model.resume()
+        clicks, deltas = move
+        board = model.board
+        changed = []
+        indexes = range(0, len(deltas), 3)
+        if direction < 0:
+            indexes = reversed(indexes)
+        events = model.events
+        for i in indexes:
+            x, y, mask = deltas[i], deltas[i + 1], deltas[i + 2]
+            model._before_change(x)
+            cell = board[x][y]
+            if mask & REVEALED_BIT:
+                cell.is_revealed = not cell.is_revealed
+                events.emit(CellRevealed, x, y, cell.is_revealed)
+            if mask & FLAG_BIT:
+                cell.is_flagged = not cell.is_flagged
+                model.flags_count += 1 if cell.is_flagged else -1
+                events.emit(FlagToggled, x, y, cell.is_flagged)
+            changed.append((x, y))
+        model.clicked_count += direction * clicks
+        if changed:
+            events.emit(CountersChanged, model.flags_count, model.clicked_count)
+        return changed
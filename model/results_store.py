@@ -0,0 +1,243 @@
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+
+from model.game_model import GameModel
+
+OUTCOMES = ("WIN", "WIN_TREASURE", "LOSS")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    finished_at REAL NOT NULL,
+    difficulty TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    cols INTEGER NOT NULL,
+    mines INTEGER NOT NULL,
+    outcome TEXT NOT NULL,
+    elapsed REAL NOT NULL,
+    clicks INTEGER NOT NULL,
+    seed INTEGER
+);
+CREATE INDEX IF NOT EXISTS results_leaderboard ON results (difficulty, outcome, elapsed);
+"""
+
+_INSERT = ("INSERT INTO results (finished_at, difficulty, rows, cols, mines, outcome, elapsed, clicks, seed) "
+           "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)")
+
+# Sentinel asking the writer thread to exit
+_STOP = object()
+
+
+def _board_size(difficulty):
+    settings = GameModel.DIFFICULTY_TO_LEVEL.get(difficulty)
+    if settings is None:
+        raise ValueError(f"Unknown difficulty: {difficulty}")
+    return settings['board_size']
+
+
+class ResultsStore:
+    """
+    Local SQLite store of finished games.
+    Games are queued by record_game() and written in batches by a background
+    thread, so recording never blocks the UI thread. Leaderboard and percentile
+    queries use the (difficulty, outcome, elapsed) index and only count games
+    played on the board size of their difficulty.
+
+    Invariants:
+        - Only the writer thread writes to the database
+        - A failed write is reported and does not stop the writer thread
+        - Every queued result is written before close() returns
+    """
+    def __init__(self, path, batch_size=256, flush_interval=1.0):
+        """
+        Opens or creates the store and starts the writer thread.
+
+        Precondition:
+            - path must be a writable file path
+            - batch_size must be a positive integer
+            - flush_interval must be a positive number of seconds
+        Postcondition:
+            - Schema and index exist
+            - Writer thread is running
+        Invariant:
+            - path remains constant
+        """
+        self.path = path
+        self.closed = False
+        # Keeps record_game() from queueing behind the stop sentinel
+        self._lock = threading.Lock()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+        connection = self._connect()
+        connection.executescript(_SCHEMA)
+        connection.close()
+        self.writer = threading.Thread(target=self._write_loop, name="results-writer", daemon=True)
+        self.writer.start()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def record_game(self, model, outcome):
+        """
+        Queues the result of a finished game.
+
+        Precondition:
+            - model must be a GameModel whose game just ended
+            - outcome must be "WIN", "WIN_TREASURE" or "LOSS"
+        Postcondition:
+            - Result is queued for the writer thread, unless the board size
+              is not the one of model.level (a custom test board)
+            - Raises RuntimeError if the store is closed
+        Invariant:
+            - Never waits on the database
+        """
+        if outcome not in OUTCOMES:
+            raise ValueError(f"Unknown outcome: {outcome}")
+        if model.start_time is None:
+            elapsed = 0.0
+        else:
+            elapsed = (datetime.now() - model.start_time).total_seconds()
+        rows, cols = model.board_size
+        if _board_size(model.level) != (rows, cols):
+            return
+        with self._lock:
+            if self.closed:
+                raise RuntimeError("Results store is closed")
+            self.queue.put((time.time(), model.level, rows, cols, model.mines_count, outcome,
+                            elapsed, model.clicked_count, model.seed))
+
+    def _write_loop(self):
+        connection = self._connect()
+        stopping = False
+        while not stopping:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    with connection:
+                        connection.executemany(_INSERT, batch)
+                except Exception:
+                    # Retry one by one, so only the failing results are lost
+                    for result in batch:
+                        try:
+                            with connection:
+                                connection.execute(_INSERT, result)
+                        except Exception as e:
+                            print(f"Error writing game result {result}: {e}", file=sys.stderr)
+        connection.close()
+
+    def close(self):
+        """
+        Writes all queued results and stops the writer thread.
+
+        Precondition:
+            - None
+        Postcondition:
+            - All recorded results are in the database
+        Invariant:
+            - Store cannot record after closing; closing twice does nothing
+        """
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.queue.put(_STOP)
+        self.writer.join()
+
+    def leaderboard(self, difficulty, limit=10, treasure=False):
+        """
+        Returns the fastest wins for a difficulty.
+
+        Precondition:
+            - difficulty must be a difficulty name
+            - limit must be a positive integer
+        Postcondition:
+            - Returns up to limit (elapsed, clicks, finished_at, seed) tuples, fastest first
+            - treasure selects "WIN_TREASURE" instead of "WIN" results
+        Invariant:
+            - Query is answered from the leaderboard index
+        """
+        outcome = "WIN_TREASURE" if treasure else "WIN"
+        rows, cols = _board_size(difficulty)
+        connection = self._connect()
+        try:
+            return connection.execute(
+                "SELECT elapsed, clicks, finished_at, seed FROM results "
+                "WHERE difficulty = ? AND outcome = ? AND rows = ? AND cols = ? ORDER BY elapsed LIMIT ?",
+                (difficulty, outcome, rows, cols, limit)).fetchall()
+        finally:
+            connection.close()
+
+    def percentile(self, difficulty, elapsed, treasure=False):
+        """
+        Returns the percentage of wins for a difficulty that were slower than elapsed.
+
+        Precondition:
+            - difficulty must be a difficulty name
+            - elapsed must be a number of seconds
+        Postcondition:
+            - Returns a float between 0 and 100, or None if there are no wins
+        Invariant:
+            - Both counts are index range scans
+        """
+        outcome = "WIN_TREASURE" if treasure else "WIN"
+        rows, cols = _board_size(difficulty)
+        connection = self._connect()
+        try:
+            total, = connection.execute(
+                "SELECT COUNT(*) FROM results WHERE difficulty = ? AND outcome = ? AND rows = ? AND cols = ?",
+                (difficulty, outcome, rows, cols)).fetchone()
+            if not total:
+                return None
+            slower, = connection.execute(
+                "SELECT COUNT(*) FROM results WHERE difficulty = ? AND outcome = ? AND elapsed > ? "
+                "AND rows = ? AND cols = ?",
+                (difficulty, outcome, elapsed, rows, cols)).fetchone()
+            return 100.0 * slower / total
+        finally:
+            connection.close()
+
+    def summary(self, difficulty):
+        """
+        Returns the number of games per outcome for a difficulty.
+
+        Precondition:
+            - difficulty must be a difficulty name
+        Postcondition:
+            - Returns a dictionary mapping each outcome to its game count
+        Invariant:
+            - Query is answered from the leaderboard index
+        """
+        rows, cols = _board_size(difficulty)
+        connection = self._connect()
+        try:
+            counts = dict(connection.execute(
+                "SELECT outcome, COUNT(*) FROM results WHERE difficulty = ? AND rows = ? AND cols = ? "
+                "GROUP BY outcome",
+                (difficulty, rows, cols)).fetchall())
+        finally:
+            connection.close()
+        return {outcome: counts.get(outcome, 0) for outcome in OUTCOMES}
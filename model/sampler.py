@@ -0,0 +1,370 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_EXCEPTION
+from math import exp, sqrt
+from random import Random, getrandbits
+from time import monotonic
+
+from model.game_model import REVEALED_BIT
+from model.solver import Analysis, AnalysisCancelled, analyze, reduce_constraints
+
+# Seconds a sampling run may take, so hints stay within a latency target
+SAMPLING_BUDGET = 0.5
+# Time slices of each chain; the first is burn-in and the others give the error bars
+BATCHES = 10
+# Inverse temperature of the constraint penalty: the chain may pass through
+# configurations that break the numbers, but only valid ones are sampled
+BETA = 4.0
+# Seconds between checks of the cancel event while waiting for workers
+_CANCEL_POLL = 0.02
+# Seconds past the deadline that a run waits for chains still reporting
+RESULT_GRACE = 0.1
+# Most worker processes a sampler starts unless asked for more
+DEFAULT_WORKERS = 4
+
+
+class Estimate:
+    """
+    Sampled mine probabilities of the hidden cells of a board snapshot.
+    Values are means over configurations consistent with the revealed numbers
+    and the mine count; errors are standard errors from batch means, None when
+    too few batches held a valid sample.
+
+    Invariants:
+        - probabilities and errors have the same keys
+        - Estimate is never modified after construction
+    """
+    def __init__(self, probabilities, errors, interior_probability, interior_error, samples, chains):
+        """
+        Initializes the estimate.
+
+        Precondition:
+            - probabilities must map (x, y) of hidden cells to floats in [0, 1]
+        Postcondition:
+            - samples counts the valid configurations over chains chains
+        Invariant:
+            - None
+        """
+        self.probabilities = probabilities
+        self.errors = errors
+        self.interior_probability = interior_probability
+        self.interior_error = interior_error
+        self.samples = samples
+        self.chains = chains
+
+    def probability(self, x, y):
+        """
+        Returns (probability, standard error) of cell (x, y).
+
+        Precondition:
+            - (x, y) must be a hidden cell of the snapshot
+        Postcondition:
+            - Frontier cells have their own estimate; other hidden cells get
+              the interior one; None when nothing was sampled
+        Invariant:
+            - Estimate is unchanged
+        """
+        if (x, y) in self.probabilities:
+            return self.probabilities[(x, y)], self.errors[(x, y)]
+        if self.interior_probability is None:
+            return None
+        return self.interior_probability, self.interior_error
+
+
+def _sample_chain(task):
+    """
+    Runs one Metropolis chain over the frontier cells until deadline, a
+    time.monotonic() value (the clock is shared by every process).
+    Moves flip one cell, changing the frontier mine count, or swap a mine with
+    a non-mine sharing a constraint. Configurations are weighted by the ways to
+    place the other mines among free cells and penalized by exp(-BETA) per
+    missing or extra mine of each constraint, so valid configurations are
+    visited in proportion to their weight.
+    Returns per-batch (samples, per-cell mine counts, sum of interior densities).
+    """
+    count, constraints, free, remaining, deadline, seed = task
+    rng = Random(seed)
+    random = rng.random
+    cell_constraints = [[] for _ in range(count)]
+    partners = [set() for _ in range(count)]
+    need = []
+    for c, (cells, mines) in enumerate(constraints):
+        need.append(mines)
+        for k in cells:
+            cell_constraints[k].append(c)
+            partners[k].update(cells)
+    partners = [sorted(p - {k}) for k, p in enumerate(partners)]
+
+    def weight_ratio(mines, delta):
+        # comb(free, left - 1) / comb(free, left) or its inverse, left being the
+        # mines outside the frontier; moves leaving the valid range are refused
+        # and moves from outside it are left to the penalty
+        left = remaining - mines
+        if not 0 <= left <= free:
+            return 1.0
+        if delta > 0:
+            return left / (free - left + 1)
+        return (free - left) / (left + 1)
+
+    def interior_violation(mines):
+        left = remaining - mines
+        return -left if left < 0 else max(0, left - free)
+
+    value = [0] * count
+    sums = [0] * len(constraints)
+    mines = 0
+    energy = sum(abs(n) for n in need) + interior_violation(0)
+
+    batches = [[0, [0] * count, 0.0] for _ in range(BATCHES)]
+    started = monotonic()
+    if deadline <= started:
+        # Queued behind a slow start; the run has already timed out
+        return []
+    slice_length = (deadline - started) / BATCHES
+    batch = 0
+    while batch < BATCHES:
+        for _ in range(count):
+            k = int(random() * count)
+            v = value[k]
+            d = 1 - 2 * v
+            if partners[k] and random() < 0.5:
+                j = partners[k][int(random() * len(partners[k]))]
+                if value[j] == v:
+                    continue
+                # Swapping k and j keeps the mine count and every constraint
+                # holding both cells
+                changes = {}
+                for c in cell_constraints[k]:
+                    changes[c] = d
+                for c in cell_constraints[j]:
+                    changes[c] = changes.get(c, 0) - d
+                delta = 0
+                for c, change in changes.items():
+                    delta += abs(sums[c] + change - need[c]) - abs(sums[c] - need[c])
+                if delta <= 0 or random() < exp(-BETA * delta):
+                    for c, change in changes.items():
+                        sums[c] += change
+                    value[k], value[j] = 1 - v, v
+                    energy += delta
+                continue
+            delta = interior_violation(mines + d) - interior_violation(mines)
+            for c in cell_constraints[k]:
+                delta += abs(sums[c] + d - need[c]) - abs(sums[c] - need[c])
+            if random() < weight_ratio(mines, d) * exp(-BETA * delta):
+                for c in cell_constraints[k]:
+                    sums[c] += d
+                value[k] = 1 - v
+                mines += d
+                energy += delta
+        batch = int((monotonic() - started) / slice_length)
+        if energy == 0 and batch < BATCHES:
+            totals = batches[batch]
+            totals[0] += 1
+            cell_counts = totals[1]
+            for k in range(count):
+                cell_counts[k] += value[k]
+            if free:
+                totals[2] += (remaining - mines) / free
+    return batches[1:]
+
+
+def _batch_statistics(values):
+    """Mean and standard error of batch means, the error None for fewer than two batches."""
+    n = len(values)
+    if n == 0:
+        return None, None
+    mean = sum(values) / n
+    if n < 2:
+        return mean, None
+    variance = sum((value - mean) ** 2 for value in values) / (n - 1)
+    return mean, sqrt(variance / n)
+
+
+class MineSampler:
+    """
+    Estimates mine probabilities by sampling on a pool of worker processes.
+    Each worker runs an independent chain with its own seed. Only the frontier
+    constraints are sent to workers, so the cost of a task does not grow with
+    the board. No process is started until warm_up() or the first run; warm
+    workers are reused across runs.
+
+    Invariants:
+        - At most one pool is alive; close() shuts it down
+        - A run never takes much longer than budget plus RESULT_GRACE
+    """
+    def __init__(self, workers=None, budget=SAMPLING_BUDGET):
+        """
+        Initializes the sampler without starting worker processes.
+
+        Precondition:
+            - workers must be None (one per CPU, at most DEFAULT_WORKERS) or a
+              positive integer
+            - budget must be a positive number of seconds
+        Postcondition:
+            - No worker process is running
+        Invariant:
+            - workers and budget remain constant
+        """
+        if budget <= 0:
+            raise ValueError("Sampling budget must be positive")
+        self.workers = workers or min(DEFAULT_WORKERS, os.cpu_count() or 1)
+        self.budget = budget
+        self.executor = None
+        self._starting = []
+
+    def _pool(self):
+        if self.executor is None:
+            # Spawned workers are safe to start from any thread, e.g. next to Tk
+            self.executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self.executor
+
+    def warm_up(self):
+        """
+        Starts the worker processes in the background.
+
+        Precondition:
+            - None
+        Postcondition:
+            - Every worker process is starting; the call does not wait for them
+        Invariant:
+            - Calling again while the pool is alive does nothing
+        """
+        if not self._starting:
+            # One empty task per worker makes the pool start every process now
+            executor = self._pool()
+            self._starting = [executor.submit(int) for _ in range(self.workers)]
+
+    def wait_ready(self, timeout=None):
+        """
+        Starts the worker processes if needed and waits until they are up.
+
+        Precondition:
+            - timeout must be None or a number of seconds
+        Postcondition:
+            - Returns True if every worker is ready
+        Invariant:
+            - Runs are not needed to wait; a run started earlier only samples
+              for the part of its budget left once the workers are up
+        """
+        self.warm_up()
+        _, pending = wait(self._starting, timeout=timeout)
+        return not pending
+
+    def estimate(self, snapshot, seed=None, cancel=None):
+        """
+        Samples mine configurations consistent with a snapshot.
+
+        Precondition:
+            - snapshot must read like a model.board_snapshot.BoardSnapshot
+            - seed must be None or an integer; cancel None or a threading.Event
+        Postcondition:
+            - Returns an Estimate of every hidden cell within budget plus
+              RESULT_GRACE seconds, counted from the call; cells decided by a
+              single number get their exact value and error 0
+            - Chains that do not report in time are left out; without any
+              sample, frontier cells have no estimate
+            - Raises AnalysisCancelled soon after cancel is set
+        Invariant:
+            - With a seed, each chain's random moves are reproducible
+        """
+        deadline = monotonic() + self.budget
+        states, cols, known, reduced, remaining = reduce_constraints(snapshot)
+        variables = sorted({j for cells, _ in reduced for j in cells})
+        position = {j: k for k, j in enumerate(variables)}
+        constraints = [([position[j] for j in cells], mines) for cells, mines in reduced]
+        frontier = set(variables)
+        free = sum(1 for i, state in enumerate(states)
+                   if not state & REVEALED_BIT and i not in known and i not in frontier)
+
+        master = Random(getrandbits(32) if seed is None else seed)
+        tasks = [(len(variables), constraints, free, remaining, deadline, master.getrandbits(32))
+                 for _ in range(self.workers)]
+        futures = [self._pool().submit(_sample_chain, task) for task in tasks]
+        pending = futures
+        while pending:
+            if cancel is not None and cancel.is_set():
+                for future in pending:
+                    future.cancel()
+                raise AnalysisCancelled()
+            left = deadline + RESULT_GRACE - monotonic()
+            if left <= 0:
+                for future in pending:
+                    future.cancel()
+                break
+            _, pending = wait(pending, timeout=min(_CANCEL_POLL, left), return_when=FIRST_EXCEPTION)
+        done = [future for future in futures if future.done() and not future.cancelled()]
+        batches = [batch for future in done for batch in future.result() if batch[0]]
+
+        samples = sum(batch[0] for batch in batches)
+        probabilities = {divmod(i, cols): float(value) for i, value in known.items()}
+        errors = dict.fromkeys(probabilities, 0.0)
+        for k, j in enumerate(variables):
+            mean, error = _batch_statistics([batch[1][k] / batch[0] for batch in batches])
+            if mean is not None:
+                probabilities[divmod(j, cols)] = mean
+                errors[divmod(j, cols)] = error
+        interior_probability = interior_error = None
+        if free:
+            interior_probability, interior_error = _batch_statistics(
+                [batch[2] / batch[0] for batch in batches])
+        return Estimate(probabilities, errors, interior_probability, interior_error,
+                        samples, len(done))
+
+    def analyze(self, snapshot, cancel=None):
+        """
+        Analyzes a snapshot exactly, sampling the components too large to enumerate.
+
+        Precondition:
+            - Same as model.solver.analyze
+        Postcondition:
+            - Returns an Analysis; unresolved cells carry sampled estimates
+              when sampling found valid configurations
+            - Sampling only runs, and only takes its budget, when a component
+              is unresolved
+        Invariant:
+            - Exact results are never replaced by estimates
+        """
+        analysis = analyze(snapshot, cancel)
+        if not analysis.unresolved:
+            return analysis
+        estimate = self.estimate(snapshot, cancel=cancel)
+        estimates = {cell: (estimate.probabilities[cell], estimate.errors[cell])
+                     for cell in analysis.unresolved if cell in estimate.probabilities}
+        return Analysis(snapshot, analysis.probabilities, analysis.unresolved,
+                        analysis.interior_probability, analysis.interior_guess, estimates)
+
+    def close(self):
+        """
+        Shuts down the worker processes.
+
+        Precondition:
+            - None
+        Postcondition:
+            - No worker process is running; the next run or warm_up() starts
+              a new pool, whose start-up counts against that run's budget
+        Invariant:
+            - Closing twice does nothing
+        """
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+            self._starting = []
+
+
+def estimate(snapshot, budget=SAMPLING_BUDGET, workers=None, seed=None):
+    """
+    Samples mine probabilities of a snapshot on a temporary pool.
+
+    Precondition:
+        - Same as MineSampler and MineSampler.estimate
+    Postcondition:
+        - Returns an Estimate; worker processes have exited
+    Invariant:
+        - Use a MineSampler to keep workers between runs
+    """
+    sampler = MineSampler(workers, budget)
+    try:
+        sampler.wait_ready()
+        return sampler.estimate(snapshot, seed)
+    finally:
+        sampler.close()
@@ -0,0 +1,318 @@
+import mmap
+import struct
+from datetime import datetime, timedelta
+
+from model.game_model import GameModel, Cell, MINE_BIT, FLAG_BIT, REVEALED_BIT
+from model.topology import TOPOLOGIES
+
+SAVE_MAGIC = b"MSWP"
+SAVE_VERSION = 1
+LEVELS = list(GameModel.DIFFICULTY_TO_LEVEL)
+
+# magic, version, level index, topology index, rows, cols, mines_count,
+# flags_count, clicked_count, elapsed seconds (-1 if not started).
+# Files written before topologies existed hold 0 (square) in the topology byte.
+_SAVE_HEADER = struct.Struct("<4sBBBxIIIIId")
+
+# Translation tables mapping a packed state to 1 when it counts towards
+# hidden cells, hidden safe cells, flagged mines and wrong flags
+_WIN_TABLES = tuple(bytes(int(test(state)) for state in range(256)) for test in (
+    lambda state: not state & REVEALED_BIT,
+    lambda state: not state & (REVEALED_BIT | MINE_BIT),
+    lambda state: state & (FLAG_BIT | MINE_BIT) == FLAG_BIT | MINE_BIT,
+    lambda state: state & (FLAG_BIT | MINE_BIT) == FLAG_BIT,
+))
+
+
+def _win_counts(states):
+    return [states.translate(table).count(1) for table in _WIN_TABLES]
+
+
+class LazyBoard:
+    """
+    List-like board that builds rows of Cell objects from a buffer of packed
+    cell states on first access, so opening a save does not parse the whole file.
+
+    Invariants:
+        - buffer holds rows * cols packed cell states starting at offset
+        - A row is materialized at most once
+        - dirty holds the rows changed since the last SaveFile.sync, as
+          reported by GameModel._before_change
+    """
+    def __init__(self, buffer, offset, rows, cols):
+        """
+        Initializes the board over a buffer.
+
+        Precondition:
+            - buffer must support slicing and hold rows * cols bytes after offset
+        Postcondition:
+            - No row is materialized
+        Invariant:
+            - Board dimensions remain constant
+        """
+        self.buffer = buffer
+        self.offset = offset
+        self.rows = rows
+        self.cols = cols
+        self.loaded = {}
+        self.dirty = set()
+        # Win counts of rows never materialized, computed on the first win check
+        self._row_counts = None
+        self._unloaded_counts = None
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, x):
+        row = self.loaded.get(x)
+        if row is None:
+            if not 0 <= x < self.rows:
+                raise IndexError(f"Row {x} out of range")
+            start = self.offset + x * self.cols
+            states = self.buffer[start:start + self.cols]
+            row = [Cell.from_state(state, x, y) for y, state in enumerate(states)]
+            self.loaded[x] = row
+            if self._row_counts is not None:
+                self._unloaded_counts = [total - count for total, count
+                                         in zip(self._unloaded_counts, self._row_counts[x])]
+        return row
+
+    def __iter__(self):
+        for x in range(self.rows):
+            yield self[x]
+
+    def packed_row(self, x):
+        """
+        Returns the packed cell states of row x without materializing it.
+
+        Precondition:
+            - x must be a valid row index
+        Postcondition:
+            - Returns bytes with one packed state per cell, read from the
+              materialized cells or, for rows never accessed, from the buffer
+        Invariant:
+            - No row is materialized
+        """
+        row = self.loaded.get(x)
+        if row is not None:
+            return bytes(cell.pack_state() for cell in row)
+        if not 0 <= x < self.rows:
+            raise IndexError(f"Row {x} out of range")
+        start = self.offset + x * self.cols
+        return bytes(self.buffer[start:start + self.cols])
+
+
+    def win_counts(self):
+        """
+        Counts what the win check needs without materializing rows.
+
+        Precondition:
+            - None
+        Postcondition:
+            - Returns [hidden cells, hidden safe cells, flagged mines, wrong flags]
+        Invariant:
+            - No row is materialized; rows never accessed are counted from the
+              buffer once, so each call costs O(cells of materialized rows)
+        """
+        if self._row_counts is None:
+            self._row_counts = {}
+            self._unloaded_counts = [0, 0, 0, 0]
+            for x in range(self.rows):
+                if x not in self.loaded:
+                    start = self.offset + x * self.cols
+                    counts = _win_counts(bytes(self.buffer[start:start + self.cols]))
+                    self._row_counts[x] = counts
+                    self._unloaded_counts = [a + b for a, b in zip(self._unloaded_counts, counts)]
+        totals = list(self._unloaded_counts)
+        for row in self.loaded.values():
+            counts = _win_counts(bytes(cell.pack_state() for cell in row))
+            totals = [a + b for a, b in zip(totals, counts)]
+        return totals
+
+class SaveFile:
+    """
+    Fixed-layout binary save game opened through mmap.
+    The file is a header followed by one packed state byte per cell, row by row.
+
+    Invariants:
+        - File header is valid while the save is open
+        - Cell bytes are only written when their state changed
+    """
+    def __init__(self, path):
+        """
+        Opens an existing save file.
+
+        Precondition:
+            - path must name a file written by SaveFile.create
+        Postcondition:
+            - File is memory-mapped and its header is validated
+        Invariant:
+            - File contents are unchanged by opening
+        """
+        self.path = path
+        self.file = open(path, "r+b")
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0)
+        except ValueError:
+            self.file.close()
+            raise ValueError(f"Save file is empty: {path}")
+        if len(self.map) < _SAVE_HEADER.size:
+            self.close()
+            raise ValueError(f"Save file is truncated: {path}")
+        magic, version, level, topology, rows, cols = _SAVE_HEADER.unpack_from(self.map)[:6]
+        if (magic != SAVE_MAGIC or version != SAVE_VERSION or level >= len(LEVELS)
+                or topology >= len(TOPOLOGIES)):
+            self.close()
+            raise ValueError(f"Not a valid save file: {path}")
+        if len(self.map) != _SAVE_HEADER.size + rows * cols:
+            self.close()
+            raise ValueError(f"Save file size does not match its board: {path}")
+        self.board_size = (rows, cols)
+
+    @classmethod
+    def create(cls, path, model):
+        """
+        Writes a new save file for a game and opens it.
+
+        Precondition:
+            - model must be a GameModel with an initialized board
+            - Mine placement must not be pending (see GameModel safe_start)
+        Postcondition:
+            - File holds the complete board and counters
+            - Returns the opened SaveFile
+        Invariant:
+            - Model state is unchanged
+        """
+        if model.has_pending_placement():
+            raise ValueError("Cannot save a board whose mines are placed on the first reveal")
+        model.resume()
+        with open(path, "wb") as file:
+            file.write(cls._pack_header(model))
+            for row in model.board:
+                file.write(bytes(cell.pack_state() for cell in row))
+        return cls(path)
+
+    @staticmethod
+    def _pack_header(model):
+        rows, cols = model.board_size
+        if model.start_time is None:
+            elapsed = -1.0
+        else:
+            elapsed = (datetime.now() - model.start_time).total_seconds()
+        return _SAVE_HEADER.pack(SAVE_MAGIC, SAVE_VERSION, LEVELS.index(model.level),
+                                 TOPOLOGIES.index(model.topology_kind), rows, cols,
+                                 model.mines_count, model.flags_count, model.clicked_count, elapsed)
+
+    def load_model(self):
+        """
+        Builds a game model backed by this save.
+
+        Precondition:
+            - Save file must be open
+        Postcondition:
+            - Returns a GameModel whose board rows are read from the map on demand
+            - Counters and elapsed time are restored
+        Invariant:
+            - File contents are unchanged
+        """
+        (_, _, level, topology, rows, cols, mines_count, flags_count, clicked_count,
+         elapsed) = _SAVE_HEADER.unpack_from(self.map)
+        model = GameModel(LEVELS[level], topology=TOPOLOGIES[topology])
+        model.board = LazyBoard(self.map, _SAVE_HEADER.size, rows, cols)
+        model.board_size = (rows, cols)
+        model.mines_count = mines_count
+        model.flags_count = flags_count
+        model.clicked_count = clicked_count
+        if elapsed >= 0:
+            model.start_time = datetime.now() - timedelta(seconds=elapsed)
+        return model
+
+    def sync(self, model):
+        """
+        Writes the changes of a game back to the save.
+
+        Precondition:
+            - model board size must match the save
+        Postcondition:
+            - Header counters and elapsed time are updated
+            - Only rows whose cell states changed are written; for a LazyBoard
+              only the rows changed since load or the last sync are packed
+        Invariant:
+            - Rows never loaded from a LazyBoard are not touched
+        """
+        model.resume()
+        cols = self.board_size[1]
+        if model.board_size != self.board_size:
+            raise ValueError(f"Board size {model.board_size} does not match save {self.board_size}")
+        self.map[:_SAVE_HEADER.size] = self._pack_header(model)
+        board = model.board
+        if isinstance(board, LazyBoard):
+            changed = [(x, board.loaded[x]) for x in sorted(board.dirty) if x in board.loaded]
+            board.dirty.clear()
+            model.rows_synced()
+        else:
+            changed = enumerate(board)
+        for x, row in changed:
+            start = _SAVE_HEADER.size + x * cols
+            states = bytes(cell.pack_state() for cell in row)
+            if self.map[start:start + cols] != states:
+                self.map[start:start + cols] = states
+
+    def flush(self):
+        """
+        Flushes written pages to disk.
+
+        Precondition:
+            - Save file must be open
+        Postcondition:
+            - File on disk reflects all synced changes
+        Invariant:
+            - Map contents are unchanged
+        """
+        self.map.flush()
+
+    def close(self):
+        """
+        Flushes and closes the save file.
+
+        Precondition:
+            - None
+        Postcondition:
+            - Map and file handle are closed
+        Invariant:
+            - Models loaded from this save must not access unloaded rows afterwards
+        """
+        if getattr(self, "map", None) is not None and not self.map.closed:
+            self.map.flush()
+            self.map.close()
+        self.file.close()
+
+
+def save_game(model, path):
+    """
+    Saves a game to path, replacing any existing file.
+
+    Precondition:
+        - model must have an initialized board
+    Postcondition:
+        - path holds a complete save of the game
+    Invariant:
+        - Model state is unchanged
+    """
+    SaveFile.create(path, model).close()
+
+
+def load_game(path):
+    """
+    Opens a save and returns (model, save_file).
+
+    Precondition:
+        - path must name a valid save file
+    Postcondition:
+        - Returned model reads board rows lazily from the open save
+        - Caller must sync() changes and close() the save when done
+    Invariant:
+        - File contents are unchanged until sync() is called
+    """
+    save = SaveFile(path)
+    return save.load_model(), save
@@ -0,0 +1,277 @@
+import struct
+import weakref
+from multiprocessing import shared_memory
+
+from model.topology import TOPOLOGIES
+
+SHARED_MAGIC = b"MSHB"
+SHARED_VERSION = 1
+
+# magic, version, topology index, rows, cols, mines_count, flags_count, clicked_count
+_SHARED_HEADER = struct.Struct("<4sBBxxIIIII")
+# The counters at the end of the header, rewritten on every write()
+_COUNTERS = struct.Struct("<III")
+_COUNTERS_OFFSET = _SHARED_HEADER.size - _COUNTERS.size
+
+
+def _open_segment(name):
+    try:
+        # Python 3.13+: attaching processes must not unlink the segment at exit
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name)
+
+
+def _release(segment, unlink):
+    try:
+        segment.close()
+    except BufferError:
+        # A reader still holds a row view; the mapping goes away with the process
+        pass
+    if unlink:
+        try:
+            segment.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SharedBoard:
+    """
+    Board held in a multiprocessing.shared_memory segment.
+    The segment is a header followed by one packed cell state byte per cell,
+    row by row, like a save file. Pickling a SharedBoard only sends the
+    segment name; the receiving process attaches to the segment and reads
+    rows in place. A SharedBoard reads like a model.board_snapshot.BoardSnapshot,
+    so it can be passed to model.solver.analyze.
+
+    Invariants:
+        - Only the owner writes to or unlinks the segment
+        - An unreachable SharedBoard closes its mapping, and an owner also
+          unlinks its segment, at the latest when the interpreter exits
+    """
+    def __init__(self, segment, owner):
+        """
+        Wraps an opened segment; use create() or attach().
+
+        Precondition:
+            - segment must hold a valid header and board
+        Postcondition:
+            - Board is readable; the segment is released when this object is
+              collected or the interpreter exits
+        Invariant:
+            - Board dimensions remain constant
+        """
+        magic, version, topology, rows, cols = _SHARED_HEADER.unpack_from(segment.buf)[:5]
+        if magic != SHARED_MAGIC or version != SHARED_VERSION or topology >= len(TOPOLOGIES):
+            segment.close()
+            raise ValueError(f"Not a shared board segment: {segment.name}")
+        if segment.size < _SHARED_HEADER.size + rows * cols:
+            segment.close()
+            raise ValueError(f"Shared board segment is truncated: {segment.name}")
+        self.segment = segment
+        self.name = segment.name
+        self.owner = owner
+        self.board_size = (rows, cols)
+        self.topology_kind = TOPOLOGIES[topology]
+        self._finalizer = weakref.finalize(self, _release, segment, owner)
+
+    @classmethod
+    def create(cls, snapshot, name=None):
+        """
+        Creates a segment holding a board.
+
+        Precondition:
+            - snapshot must read like a BoardSnapshot, e.g. GameModel.snapshot()
+            - name must be None (a unique name) or an unused segment name
+        Postcondition:
+            - Returns the owning SharedBoard with the board and counters copied in
+        Invariant:
+            - snapshot is unchanged
+        """
+        rows, cols = snapshot.board_size
+        segment = shared_memory.SharedMemory(name, create=True, size=_SHARED_HEADER.size + rows * cols)
+        _SHARED_HEADER.pack_into(segment.buf, 0, SHARED_MAGIC, SHARED_VERSION,
+                                 TOPOLOGIES.index(snapshot.topology_kind), rows, cols, 0, 0, 0)
+        board = cls(segment, owner=True)
+        board.write(snapshot)
+        return board
+
+    @classmethod
+    def attach(cls, name):
+        """
+        Attaches to the segment of an existing shared board.
+
+        Precondition:
+            - name must be the name of a segment created by create(), in this
+              process or one of its ancestors (as in a process pool)
+        Postcondition:
+            - Returns a reading SharedBoard over the segment, without copying it
+            - Raises ValueError if the segment does not hold a shared board
+        Invariant:
+            - The segment is never unlinked through this object
+        """
+        return cls(_open_segment(name), owner=False)
+
+    @property
+    def states(self):
+        """Packed states of every cell, row by row, as a memoryview into the segment."""
+        rows, cols = self.board_size
+        return self.segment.buf[_SHARED_HEADER.size:_SHARED_HEADER.size + rows * cols]
+
+    def __reduce__(self):
+        return (SharedBoard.attach, (self.name,))
+
+    def write(self, snapshot, rows=None):
+        """
+        Copies rows and counters of a board into the segment.
+
+        Precondition:
+            - Must be called on the owner, while no reader is using the board
+            - snapshot must read like a BoardSnapshot of the same board size
+            - rows must be None (every row) or an iterable of row indexes
+        Postcondition:
+            - Segment holds the given rows and counters of snapshot
+        Invariant:
+            - Other rows are unchanged
+        """
+        if not self.owner:
+            raise ValueError("Only the owner of a shared board can write it")
+        if snapshot.board_size != self.board_size:
+            raise ValueError(f"Board size {snapshot.board_size} does not match {self.board_size}")
+        cols = self.board_size[1]
+        states = self.states
+        for x in range(self.board_size[0]) if rows is None else rows:
+            states[x * cols:(x + 1) * cols] = snapshot.row(x)
+        _COUNTERS.pack_into(self.segment.buf, _COUNTERS_OFFSET, snapshot.mines_count,
+                            snapshot.flags_count, snapshot.clicked_count)
+
+    def _counters(self):
+        return _COUNTERS.unpack_from(self.segment.buf, _COUNTERS_OFFSET)
+
+    @property
+    def mines_count(self):
+        return self._counters()[0]
+
+    @property
+    def flags_count(self):
+        return self._counters()[1]
+
+    @property
+    def clicked_count(self):
+        return self._counters()[2]
+
+    def row(self, x):
+        """
+        Returns the packed states of row x.
+
+        Precondition:
+            - x must be a valid row index
+        Postcondition:
+            - Returns a memoryview into the segment, valid until close()
+        Invariant:
+            - Nothing is copied
+        """
+        if not 0 <= x < self.board_size[0]:
+            raise IndexError(f"Row {x} out of range")
+        start = _SHARED_HEADER.size + x * self.board_size[1]
+        return self.segment.buf[start:start + self.board_size[1]]
+
+    def state(self, x, y):
+        """
+        Returns the packed state of cell (x, y).
+
+        Precondition:
+            - x and y must be valid board coordinates
+        Postcondition:
+            - Returns an int as produced by Cell.pack_state
+        Invariant:
+            - Board is unchanged
+        """
+        return self.segment.buf[_SHARED_HEADER.size + x * self.board_size[1] + y]
+
+    def close(self):
+        """
+        Releases the mapping, and the segment itself on the owner.
+
+        Precondition:
+            - Row views returned by row() must no longer be used
+        Postcondition:
+            - Board can no longer be read; the owner's segment is unlinked
+        Invariant:
+            - Closing twice does nothing
+        """
+        self._finalizer()
+
+
+class SharedBoardManager:
+    """
+    Owns the shared boards of one process and releases them together.
+    Use it as a context manager around the work that reads the boards, so
+    segments are unlinked even when that work fails.
+
+    Invariants:
+        - boards maps the name of every live owned segment to its SharedBoard
+    """
+    def __init__(self):
+        """
+        Initializes a manager without boards.
+
+        Precondition:
+            - None
+        Postcondition:
+            - No segment is owned
+        Invariant:
+            - None
+        """
+        self.boards = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def share(self, snapshot):
+        """
+        Copies a board into a new shared segment.
+
+        Precondition:
+            - snapshot must read like a BoardSnapshot, e.g. GameModel.snapshot()
+        Postcondition:
+            - Returns the owning SharedBoard; pass it to worker processes as is
+        Invariant:
+            - Segment is released by release() or close() at the latest
+        """
+        board = SharedBoard.create(snapshot)
+        self.boards[board.name] = board
+        return board
+
+    def release(self, board):
+        """
+        Closes and unlinks one shared board.
+
+        Precondition:
+            - board must have been returned by share()
+        Postcondition:
+            - Segment is unlinked; workers still attached keep their mapping
+              until they close it
+        Invariant:
+            - Other boards are unchanged
+        """
+        self.boards.pop(board.name, None)
+        board.close()
+
+    def close(self):
+        """
+        Releases every board.
+
+        Precondition:
+            - None
+        Postcondition:
+            - No segment of this manager remains
+        Invariant:
+            - Manager can share new boards afterwards
+        """
+        while self.boards:
+            _, board = self.boards.popitem()
+            board.close()
@@ -0,0 +1,398 @@
+from math import comb
+
+from model.game_model import MINE_BIT, FLAG_BIT, REVEALED_BIT, ADJACENT_SHIFT
+from model.topology import get_topology
+
+# Search nodes allowed per frontier component; larger components are left unresolved
+MAX_COMPONENT_NODES = 200000
+# Search nodes between two checks of the cancel event
+_CANCEL_CHECK_NODES = 4096
+
+
+class AnalysisCancelled(Exception):
+    """Raised by analyze() when its cancel event is set."""
+
+
+class Analysis:
+    """
+    Mine probabilities of the hidden cells of a board snapshot.
+    Only what the player can see is used: revealed numbers, revealed mines and
+    the total mine count. Flags are treated as hidden cells, so a wrong flag
+    never misleads the analysis.
+
+    Invariants:
+        - probabilities holds exact values for deduced and frontier cells
+        - Cells of unresolved frontier components have no exact probability;
+          estimates may hold sampled ones, which never make a cell certain
+        - Analysis is never modified after construction
+    """
+    def __init__(self, snapshot, probabilities, unresolved, interior_probability, interior_guess,
+                 estimates=None):
+        """
+        Initializes the analysis result.
+
+        Precondition:
+            - probabilities must map (x, y) of hidden cells to floats in [0, 1]
+            - unresolved must be an iterable of (x, y) of hidden cells
+            - interior_probability must be None when no hidden cell is left
+              outside probabilities and unresolved
+            - interior_guess must be None or the (x, y) of such a cell that is not flagged
+            - estimates must be None or map (x, y) of unresolved cells to
+              (probability, standard error), as from model.sampler
+        Postcondition:
+            - safe and mines list the certain cells in row-major order
+        Invariant:
+            - snapshot is unchanged
+        """
+        self.snapshot = snapshot
+        self.probabilities = probabilities
+        self.unresolved = frozenset(unresolved)
+        self.interior_probability = interior_probability
+        self.interior_guess = interior_guess
+        self.estimates = estimates or {}
+        self.safe = sorted(cell for cell, probability in probabilities.items() if probability == 0)
+        self.mines = sorted(cell for cell, probability in probabilities.items() if probability == 1)
+
+    def probability(self, x, y):
+        """
+        Returns the chance that cell (x, y) holds a mine.
+
+        Precondition:
+            - x and y must be valid board coordinates
+        Postcondition:
+            - Returns a float, or None for revealed cells and unresolved cells
+              without an estimate
+        Invariant:
+            - Analysis is unchanged
+        """
+        if self.snapshot.state(x, y) & REVEALED_BIT:
+            return None
+        if (x, y) in self.unresolved:
+            estimate = self.estimates.get((x, y))
+            return None if estimate is None else estimate[0]
+        return self.probabilities.get((x, y), self.interior_probability)
+
+    def _is_flagged(self, cell):
+        return bool(self.snapshot.state(*cell) & FLAG_BIT)
+
+    def hint(self):
+        """
+        Suggests the next move.
+
+        Precondition:
+            - None
+        Postcondition:
+            - Returns (x, y, action, probability) where action is "reveal" for a
+              certainly safe cell, "flag" for a certain mine not flagged yet, or
+              "guess" for the unflagged cell least likely to hold a mine
+            - Returns None if no hidden unflagged cell is left
+        Invariant:
+            - Analysis is unchanged
+        """
+        for x, y in self.safe:
+            if not self._is_flagged((x, y)):
+                return (x, y, "reveal", 0.0)
+        for x, y in self.mines:
+            if not self._is_flagged((x, y)):
+                return (x, y, "flag", 1.0)
+        best = None
+        for cell, probability in self.probabilities.items():
+            if not self._is_flagged(cell) and (best is None or probability < best[1]):
+                best = (cell, probability)
+        for cell, (probability, _) in self.estimates.items():
+            if not self._is_flagged(cell) and (best is None or probability < best[1]):
+                best = (cell, probability)
+        if self.interior_guess is not None and (best is None or self.interior_probability < best[1]):
+            best = (self.interior_guess, self.interior_probability)
+        if best is None:
+            for cell in sorted(self.unresolved):
+                if not self._is_flagged(cell):
+                    return (cell[0], cell[1], "guess", None)
+            return None
+        (x, y), probability = best
+        return (x, y, "guess", probability)
+
+    def moves(self):
+        """
+        Returns the moves of one auto-solve step.
+
+        Precondition:
+            - None
+        Postcondition:
+            - Returns (x, y, action) tuples for GameController.apply_moves: a
+              reveal of every certainly safe cell and a flag on every certain
+              mine, or the single best guess when nothing is certain
+        Invariant:
+            - Flagged cells are never revealed
+        """
+        moves = [(x, y, "r") for x, y in self.safe if not self._is_flagged((x, y))]
+        moves += [(x, y, "f") for x, y in self.mines if not self._is_flagged((x, y))]
+        if not moves:
+            hint = self.hint()
+            if hint is not None:
+                moves.append((hint[0], hint[1], "r"))
+        return moves
+
+
+def analyze(snapshot, cancel=None, max_nodes=MAX_COMPONENT_NODES):
+    """
+    Computes the mine probability of every hidden cell of a board snapshot.
+
+    Every revealed number constrains its hidden neighbors. Simple constraints
+    are resolved first; the remaining frontier is split into independent
+    components, each enumerated exactly by backtracking, and the components
+    are combined with the cells no number touches through the total mine count.
+
+    Precondition:
+        - snapshot must be a model.board_snapshot.BoardSnapshot
+        - cancel must be None or a threading.Event
+        - max_nodes must be a positive integer
+    Postcondition:
+        - Returns an Analysis
+        - Components needing more than max_nodes search nodes are left unresolved
+        - Raises AnalysisCancelled soon after cancel is set
+    Invariant:
+        - Neighbors come from the shared topology table of the snapshot's shape
+    """
+    states, cols, known, reduced, remaining = reduce_constraints(snapshot)
+    if cancel is not None and cancel.is_set():
+        raise AnalysisCancelled()
+
+    components = []
+    unresolved = []
+    for variables, component_constraints in _components(reduced):
+        counts = _enumerate(variables, component_constraints, max(0, remaining), max_nodes, cancel)
+        if counts is None:
+            unresolved.extend(variables)
+        else:
+            components.append((variables, counts))
+
+    frontier = set(unresolved)
+    for variables, _ in components:
+        frontier.update(variables)
+    interior = 0
+    interior_guess = None
+    for i, state in enumerate(states):
+        if not state & REVEALED_BIT and i not in known and i not in frontier:
+            interior += 1
+            if interior_guess is None and not state & FLAG_BIT:
+                interior_guess = divmod(i, cols)
+    # Unresolved cells are counted as unconstrained, which keeps the other
+    # probabilities close when a component is too large to enumerate
+    free = interior + len(unresolved)
+
+    probabilities = {divmod(i, cols): float(value) for i, value in known.items()}
+    interior_probability = _combine(components, free, remaining, probabilities, cols)
+    if interior == 0:
+        interior_probability = None
+    return Analysis(snapshot, probabilities, (divmod(i, cols) for i in unresolved),
+                    interior_probability, interior_guess)
+
+
+def reduce_constraints(snapshot):
+    """
+    Turns the revealed numbers of a snapshot into constraints on hidden cells.
+
+    Precondition:
+        - snapshot must read like a model.board_snapshot.BoardSnapshot
+    Postcondition:
+        - Returns (states, cols, known, reduced, remaining): the packed states
+          of every cell, the board width, {flat index: 0 or 1} of the cells
+          single constraints decide, the other constraints as (flat indexes,
+          mines still needed), and the mines not revealed or known
+    Invariant:
+        - Flags are ignored
+    """
+    rows, cols = snapshot.board_size
+    topology = get_topology(snapshot.topology_kind, rows, cols)
+    offsets, indices = topology.offsets, topology.indices
+    states = b"".join(snapshot.row(x) for x in range(rows))
+
+    revealed_mines = 0
+    constraints = []
+    for i, state in enumerate(states):
+        if not state & REVEALED_BIT:
+            continue
+        if state & MINE_BIT:
+            revealed_mines += 1
+            continue
+        neighbors = indices[offsets[i]:offsets[i + 1]]
+        cells = [j for j in neighbors if not states[j] & REVEALED_BIT]
+        if cells:
+            count = (state >> ADJACENT_SHIFT) - sum(
+                1 for j in neighbors if states[j] & REVEALED_BIT and states[j] & MINE_BIT)
+            constraints.append((cells, count))
+
+    known = _deduce(constraints)
+    # Constraints left after deduction, as (unknown cells, mines still needed)
+    reduced = []
+    for cells, count in constraints:
+        unknown = [j for j in cells if j not in known]
+        if unknown:
+            reduced.append((unknown, count - sum(known.get(j, 0) for j in cells)))
+    remaining = snapshot.mines_count - revealed_mines - sum(known.values())
+    return states, cols, known, reduced, remaining
+
+
+def _deduce(constraints):
+    """Resolves cells forced by a single constraint, returning {flat index: 0 or 1}."""
+    by_cell = {}
+    for c, (cells, _) in enumerate(constraints):
+        for j in cells:
+            by_cell.setdefault(j, []).append(c)
+    known = {}
+    pending = list(range(len(constraints)))
+    while pending:
+        cells, count = constraints[pending.pop()]
+        unknown = [j for j in cells if j not in known]
+        if not unknown:
+            continue
+        needed = count - sum(known.get(j, 0) for j in cells)
+        if needed == 0:
+            value = 0
+        elif needed == len(unknown):
+            value = 1
+        else:
+            continue
+        for j in unknown:
+            known[j] = value
+            pending.extend(by_cell[j])
+    return known
+
+
+def _components(constraints):
+    """Splits constraints into groups sharing no cell, yielding (cells, constraints)."""
+    by_cell = {}
+    for c, (cells, _) in enumerate(constraints):
+        for j in cells:
+            by_cell.setdefault(j, []).append(c)
+    seen = set()
+    for start in range(len(constraints)):
+        if start in seen:
+            continue
+        seen.add(start)
+        group = [start]
+        variables = []
+        placed = set()
+        # Breadth-first order keeps cells of one constraint close together,
+        # so the search detects violations early
+        for c in group:
+            for j in constraints[c][0]:
+                if j not in placed:
+                    placed.add(j)
+                    variables.append(j)
+                    for other in by_cell[j]:
+                        if other not in seen:
+                            seen.add(other)
+                            group.append(other)
+        yield variables, [constraints[c] for c in group]
+
+
+def _enumerate(variables, constraints, max_mines, max_nodes, cancel):
+    """
+    Counts the solutions of one component by its number of mines.
+    Returns {mines: (solutions, per-cell mine counts)}, or None when the
+    search needs more than max_nodes nodes.
+    """
+    n = len(variables)
+    position = {j: k for k, j in enumerate(variables)}
+    cell_constraints = [[] for _ in range(n)]
+    need = []
+    free = []
+    for c, (cells, count) in enumerate(constraints):
+        need.append(count)
+        free.append(len(cells))
+        for j in cells:
+            cell_constraints[position[j]].append(c)
+
+    counts = {}
+    value = [-1] * n
+    mines = 0
+    nodes = 0
+    k = 0
+    while k >= 0:
+        if k == n:
+            total, cell_counts = counts.get(mines) or (0, [0] * n)
+            for m in range(n):
+                cell_counts[m] += value[m]
+            counts[mines] = (total + 1, cell_counts)
+            k -= 1
+            continue
+        v = value[k]
+        if v >= 0:
+            for c in cell_constraints[k]:
+                need[c] += v
+                free[c] += 1
+            mines -= v
+        v += 1
+        if v > 1:
+            value[k] = -1
+            k -= 1
+            continue
+        value[k] = v
+        nodes += 1
+        if nodes > max_nodes:
+            return None
+        if cancel is not None and nodes % _CANCEL_CHECK_NODES == 0 and cancel.is_set():
+            raise AnalysisCancelled()
+        feasible = True
+        for c in cell_constraints[k]:
+            need[c] -= v
+            free[c] -= 1
+            if need[c] < 0 or need[c] > free[c]:
+                feasible = False
+        mines += v
+        if feasible and mines <= max_mines:
+            k += 1
+    return counts
+
+
+def _convolve(first, second):
+    result = {}
+    for a, x in first.items():
+        for b, y in second.items():
+            result[a + b] = result.get(a + b, 0) + x * y
+    return result
+
+
+def _combine(components, free, remaining, probabilities, cols):
+    """
+    Weights component solutions by the ways to place the other mines in the
+    free cells, storing frontier probabilities and returning the probability
+    of a free cell.
+    """
+    totals = [{mines: total for mines, (total, _) in counts.items()} for _, counts in components]
+    # prefix[i] and suffix[i] combine the components before and from i
+    prefix = [{0: 1}]
+    for distribution in totals:
+        prefix.append(_convolve(prefix[-1], distribution))
+    suffix = [{0: 1}]
+    for distribution in reversed(totals):
+        suffix.append(_convolve(suffix[-1], distribution))
+    suffix.reverse()
+
+    def ways(mines):
+        left = remaining - mines
+        return comb(free, left) if 0 <= left <= free else 0
+
+    weight = sum(total * ways(mines) for mines, total in prefix[-1].items())
+    if weight == 0:
+        # Revealed numbers disagree with the mine count; fall back to
+        # weighting every frontier solution equally
+        def ways(mines):
+            return 1
+        weight = sum(prefix[-1].values())
+
+    for i, (variables, counts) in enumerate(components):
+        others = _convolve(prefix[i], suffix[i + 1])
+        scale = {mines: sum(total * ways(mines + extra) for extra, total in others.items())
+                 for mines in counts}
+        for m, j in enumerate(variables):
+            numerator = sum(cell_counts[m] * scale[mines] for mines, (_, cell_counts) in counts.items())
+            probabilities[divmod(j, cols)] = numerator / weight
+
+    if free == 0 or weight == 0:
+        return None
+    expected = sum(total * ways(mines) * max(0, remaining - mines)
+                   for mines, total in prefix[-1].items())
+    return min(1.0, expected / (weight * free))
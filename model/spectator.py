@@ -0,0 +1,419 @@
+import asyncio
+import struct
+import zlib
+from collections import deque
+
+from model.events import DirtyRegion
+from model.game_model import FLAG_BIT, REVEALED_BIT
+
+KEYFRAME = 1
+DELTA = 2
+# Set in the frame kind byte when the payload is zlib-compressed
+COMPRESSED = 0x80
+# Delta payloads shorter than this are sent uncompressed
+COMPRESS_MIN_BYTES = 128
+
+STATUSES = (None, "LOSS", "WIN", "WIN_TREASURE")
+
+# kind, status index, sequence, flags_count, clicked_count
+_FRAME_HEADER = struct.Struct("<BBIII")
+# rows, cols, followed by one visible state byte per cell
+_KEYFRAME_SIZE = struct.Struct("<II")
+# Length prefix of frames written to stream clients
+_LENGTH = struct.Struct("<I")
+
+KEYFRAME_INTERVAL = 64
+QUEUE_LIMIT = 256
+
+
+def visible_state(state):
+    """
+    Reduces a packed cell state to what a spectator may see.
+
+    Precondition:
+        - state must be an int produced by Cell.pack_state
+    Postcondition:
+        - Revealed cells keep their full state; hidden cells keep only FLAG_BIT
+    Invariant:
+        - Mines and treasures of hidden cells are never exposed
+    """
+    return state if state & REVEALED_BIT else state & FLAG_BIT
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class DeltaEncoder:
+    """
+    Encodes the visible changes of one game as binary frames.
+    A keyframe holds the whole visible board; a delta holds the cells changed
+    since the previous frame as (index gap varint, visible state) pairs.
+    Cell states are read from the model only for changed cells; keyframes
+    are built from a mirror of the visible board, never from a board scan.
+
+    Invariants:
+        - visible mirrors the state spectators see after the last frame
+        - Frame sequence numbers increase by one per frame
+    """
+    def __init__(self, model, keyframe_interval=KEYFRAME_INTERVAL):
+        """
+        Subscribes to a model and encodes its current board.
+
+        Precondition:
+            - model must have an initialized board
+            - keyframe_interval must be a positive integer
+        Postcondition:
+            - keyframe holds a keyframe of the current board
+        Invariant:
+            - model is only read
+        """
+        self.model = model
+        self.keyframe_interval = keyframe_interval
+        self.dirty = DirtyRegion(model.events)
+        self.sequence = 0
+        self.status = None
+        self._reload()
+        self.keyframe = self._encode_keyframe()
+        self.deltas_since_keyframe = 0
+
+    def _reload(self):
+        rows, cols = self.model.board_size
+        self.board_size = (rows, cols)
+        self.visible = bytearray(visible_state(cell.pack_state())
+                                 for row in self.model.board for cell in row)
+
+    def _header(self, kind):
+        self.sequence += 1
+        return _FRAME_HEADER.pack(kind, STATUSES.index(self.status), self.sequence,
+                                  self.model.flags_count, self.model.clicked_count)
+
+    def _encode_keyframe(self):
+        rows, cols = self.board_size
+        return (self._header(KEYFRAME | COMPRESSED) + _KEYFRAME_SIZE.pack(rows, cols)
+                + zlib.compress(self.visible, 1))
+
+    def encode(self):
+        """
+        Encodes the changes collected since the last call.
+
+        Precondition:
+            - Must run on the thread that plays the game, between moves
+        Postcondition:
+            - Returns a list of frames (usually one, empty when nothing changed)
+            - A reset or game over is sent as a keyframe; the final keyframe
+              shows every cell, mines included
+            - Every keyframe_interval deltas a keyframe follows the delta
+        Invariant:
+            - Cost is proportional to the changed cells, plus the keyframe size
+              when one is due
+        """
+        if not self.dirty:
+            return []
+        region = self.dirty.take()
+        if region.reset is not None:
+            self.status = None
+            self._reload()
+            return [self._new_keyframe()]
+        if region.game_over is not None:
+            self.status = region.game_over
+            self.visible = bytearray(cell.pack_state() for row in self.model.board for cell in row)
+            return [self._new_keyframe()]
+
+        board = self.model.board
+        cols = self.board_size[1]
+        payload = bytearray()
+        previous = 0
+        for x, y in sorted(region.cells):
+            index = x * cols + y
+            state = visible_state(board[x][y].pack_state())
+            if self.visible[index] == state:
+                continue
+            self.visible[index] = state
+            _write_varint(payload, index - previous)
+            payload.append(state)
+            previous = index
+        if not payload and not region.counters:
+            return []
+        kind = DELTA
+        if len(payload) >= COMPRESS_MIN_BYTES:
+            compressed = zlib.compress(payload, 1)
+            if len(compressed) < len(payload):
+                kind |= COMPRESSED
+                payload = compressed
+        frames = [self._header(kind) + bytes(payload)]
+        self.deltas_since_keyframe += 1
+        if self.deltas_since_keyframe >= self.keyframe_interval:
+            frames.append(self._new_keyframe())
+        return frames
+
+    def _new_keyframe(self):
+        self.keyframe = self._encode_keyframe()
+        self.deltas_since_keyframe = 0
+        return self.keyframe
+
+
+class SpectatorBoard:
+    """
+    Board rebuilt by a spectator from a frame stream.
+
+    Invariants:
+        - states holds one visible state per cell, row by row
+        - Deltas are only applied in sequence after a keyframe
+    """
+    def __init__(self):
+        """
+        Initializes an empty board waiting for a keyframe.
+
+        Precondition:
+            - None
+        Postcondition:
+            - No frame is applied
+        Invariant:
+            - None
+        """
+        self.board_size = (0, 0)
+        self.states = bytearray()
+        self.sequence = None
+        self.status = None
+        self.flags_count = 0
+        self.clicked_count = 0
+
+    def apply(self, frame):
+        """
+        Applies one frame.
+
+        Precondition:
+            - frame must be produced by DeltaEncoder
+        Postcondition:
+            - Board, counters and status match the encoder after that frame
+            - Raises ValueError for a delta that does not follow the last frame
+        Invariant:
+            - A rejected frame leaves the board unchanged
+        """
+        kind, status, sequence, flags_count, clicked_count = _FRAME_HEADER.unpack_from(frame)
+        payload = frame[_FRAME_HEADER.size:]
+        if kind & ~COMPRESSED == KEYFRAME:
+            rows, cols = _KEYFRAME_SIZE.unpack_from(payload)
+            states = payload[_KEYFRAME_SIZE.size:]
+            self.states = bytearray(zlib.decompress(states) if kind & COMPRESSED else states)
+            self.board_size = (rows, cols)
+        elif kind & ~COMPRESSED == DELTA:
+            if self.sequence is None or sequence != self.sequence + 1:
+                raise ValueError(f"Delta frame {sequence} does not follow frame {self.sequence}")
+            if kind & COMPRESSED:
+                payload = zlib.decompress(payload)
+            index = pos = 0
+            while pos < len(payload):
+                gap, pos = _read_varint(payload, pos)
+                index += gap
+                self.states[index] = payload[pos]
+                pos += 1
+        else:
+            raise ValueError(f"Unknown frame kind: {kind}")
+        self.sequence = sequence
+        self.status = STATUSES[status]
+        self.flags_count = flags_count
+        self.clicked_count = clicked_count
+
+    def state(self, x, y):
+        """
+        Returns the visible state of cell (x, y).
+
+        Precondition:
+            - A keyframe must have been applied
+        Postcondition:
+            - Returns an int in the Cell.pack_state layout
+        Invariant:
+            - Board is unchanged
+        """
+        return self.states[x * self.board_size[1] + y]
+
+
+class Spectator:
+    """
+    One subscriber of a SpectatorHub, read with async for.
+    Frames are queued up to a limit; a subscriber that falls behind drops its
+    backlog and restarts from the latest keyframe and the deltas after it.
+
+    Invariants:
+        - Queued frames always start with a keyframe or follow the frames
+          already read
+    """
+    def __init__(self, hub, limit):
+        """
+        Initializes the subscriber with the latest keyframe queued.
+
+        Precondition:
+            - limit must exceed the hub's keyframe interval
+        Postcondition:
+            - Reading starts at the latest keyframe
+        Invariant:
+            - hub remains constant
+        """
+        self.hub = hub
+        self.limit = limit
+        self.frames = deque(hub.catch_up())
+        self.ready = asyncio.Event()
+        self.ready.set()
+        self.skipped = 0
+        self.closed = False
+
+    def _push(self, frame):
+        if len(self.frames) >= self.limit:
+            self.frames = deque(self.hub.catch_up())
+            self.skipped += 1
+        else:
+            self.frames.append(frame)
+        self.ready.set()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self.frames:
+            if self.closed:
+                raise StopAsyncIteration
+            self.ready.clear()
+            await self.ready.wait()
+        return self.frames.popleft()
+
+    def close(self):
+        """
+        Unsubscribes; iteration ends once queued frames are read.
+
+        Precondition:
+            - None
+        Postcondition:
+            - No more frames are queued
+        Invariant:
+            - Queued frames are kept
+        """
+        self.closed = True
+        self.hub.spectators.discard(self)
+        self.ready.set()
+
+
+class SpectatorHub:
+    """
+    Broadcasts the frames of one game to many spectators on an asyncio loop.
+    Each move is encoded once; broadcasting appends the same bytes object to
+    every subscriber's queue. Changes are encoded on the loop right after the
+    move that caused them, so the game must be played on the loop's thread.
+
+    Invariants:
+        - Frames after the latest keyframe are kept for catching up, at most
+          keyframe_interval of them
+    """
+    def __init__(self, model, loop=None, keyframe_interval=KEYFRAME_INTERVAL, queue_limit=QUEUE_LIMIT):
+        """
+        Starts broadcasting a game.
+
+        Precondition:
+            - model must have an initialized board
+            - loop must be None (the running loop) or an asyncio event loop
+            - queue_limit must exceed keyframe_interval
+        Postcondition:
+            - Hub has no spectators; the current board is its first keyframe
+        Invariant:
+            - model is only read
+        """
+        if queue_limit <= keyframe_interval:
+            raise ValueError("queue_limit must exceed keyframe_interval")
+        self.loop = loop if loop is not None else asyncio.get_running_loop()
+        self.encoder = DeltaEncoder(model, keyframe_interval)
+        self.queue_limit = queue_limit
+        self.spectators = set()
+        self.tail = []
+        self._scheduled = False
+        self.encoder.dirty.on_dirty = self._schedule
+
+    def _schedule(self):
+        if not self._scheduled:
+            self._scheduled = True
+            self.loop.call_soon(self.flush)
+
+    def catch_up(self):
+        """
+        Returns the frames a new or lagging spectator needs.
+
+        Precondition:
+            - None
+        Postcondition:
+            - Returns the latest keyframe followed by the deltas after it
+        Invariant:
+            - Hub state is unchanged
+        """
+        return [self.encoder.keyframe] + self.tail
+
+    def flush(self):
+        """
+        Encodes pending changes and queues the frames for every spectator.
+
+        Precondition:
+            - Called on the loop's thread between moves
+        Postcondition:
+            - Each new frame is queued once per spectator
+        Invariant:
+            - Encoding cost does not depend on the number of spectators
+        """
+        self._scheduled = False
+        for frame in self.encoder.encode():
+            if frame is self.encoder.keyframe:
+                self.tail = []
+            else:
+                self.tail.append(frame)
+            for spectator in self.spectators:
+                spectator._push(frame)
+
+    def subscribe(self):
+        """
+        Adds a spectator.
+
+        Precondition:
+            - Called on the loop's thread
+        Postcondition:
+            - Returns a Spectator whose first frame is the latest keyframe
+        Invariant:
+            - Other spectators are unaffected
+        """
+        spectator = Spectator(self, self.queue_limit)
+        self.spectators.add(spectator)
+        return spectator
+
+    async def handle_client(self, reader, writer):
+        """
+        Streams frames to a network client, for asyncio.start_server.
+
+        Precondition:
+            - reader and writer must be an asyncio stream pair
+        Postcondition:
+            - Frames are written with a 4-byte little-endian length prefix
+              until the client disconnects
+        Invariant:
+            - A slow client only delays its own stream
+        """
+        spectator = self.subscribe()
+        try:
+            async for frame in spectator:
+                writer.write(_LENGTH.pack(len(frame)) + frame)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            spectator.close()
+            writer.close()
@@ -0,0 +1,112 @@
+from array import array
+from functools import lru_cache
+
+# Neighbor offsets (dx, dy) per topology; hexagonal boards use the "odd-r"
+# layout, where odd rows are shifted half a cell to the right
+_SQUARE_OFFSETS = ((-1, -1), (-1, 0), (-1, 1),
+                   (0, -1),           (0, 1),
+                   (1, -1),  (1, 0),  (1, 1))
+_HEX_EVEN_OFFSETS = ((-1, -1), (-1, 0), (0, -1), (0, 1), (1, -1), (1, 0))
+_HEX_ODD_OFFSETS = ((-1, 0), (-1, 1), (0, -1), (0, 1), (1, 0), (1, 1))
+
+TOPOLOGIES = ("square", "torus", "hex")
+
+
+class Topology:
+    """
+    Precomputed neighbor table of one board shape in CSR form.
+    Cell (x, y) has flat index i = x * cols + y; its neighbors are the flat
+    indexes indices[offsets[i]:offsets[i + 1]]. Tables are built once per shape
+    by get_topology() and shared by every model, validator and solver using
+    that shape, so neighbor iteration is an array slice.
+
+    Invariants:
+        - Neighbors are listed in row-major order and never include the cell itself
+        - Tables are never modified after construction
+    """
+    def __init__(self, kind, rows, cols):
+        """
+        Builds the neighbor table.
+
+        Precondition:
+            - kind must be one of TOPOLOGIES
+            - rows and cols must be positive integers
+        Postcondition:
+            - offsets and indices describe every cell's neighbors
+        Invariant:
+            - kind, rows and cols remain constant
+        """
+        if kind not in TOPOLOGIES:
+            raise ValueError(f"Unknown topology: {kind}")
+        if rows <= 0 or cols <= 0:
+            raise ValueError(f"Invalid board size: {rows}x{cols}")
+        self.kind = kind
+        self.rows = rows
+        self.cols = cols
+        self.offsets = array('I', [0])
+        self.indices = array('I')
+        for x in range(rows):
+            for y in range(cols):
+                self.indices.extend(sorted(self._neighbor_indexes(x, y)))
+                self.offsets.append(len(self.indices))
+
+    def _neighbor_indexes(self, x, y):
+        rows, cols = self.rows, self.cols
+        if self.kind == "hex":
+            deltas = _HEX_ODD_OFFSETS if x % 2 else _HEX_EVEN_OFFSETS
+        else:
+            deltas = _SQUARE_OFFSETS
+        found = set()
+        for dx, dy in deltas:
+            nx, ny = x + dx, y + dy
+            if self.kind == "torus":
+                nx %= rows
+                ny %= cols
+            elif not (0 <= nx < rows and 0 <= ny < cols):
+                continue
+            if (nx, ny) != (x, y):
+                found.add(nx * cols + ny)
+        return found
+
+    def neighbors(self, index):
+        """
+        Returns the flat indexes of the neighbors of a cell.
+
+        Precondition:
+            - index must be a flat cell index
+        Postcondition:
+            - Returns an array slice of flat indexes
+        Invariant:
+            - Table is unchanged
+        """
+        return self.indices[self.offsets[index]:self.offsets[index + 1]]
+
+    def neighbor_coords(self, x, y):
+        """
+        Returns the coordinates of the neighbors of (x, y).
+
+        Precondition:
+            - x and y must be valid board coordinates
+        Postcondition:
+            - Returns a list of (x, y) tuples
+        Invariant:
+            - Table is unchanged
+        """
+        cols = self.cols
+        return [divmod(j, cols) for j in self.neighbors(x * cols + y)]
+
+
+@lru_cache(maxsize=32)
+def get_topology(kind, rows, cols):
+    """
+    Returns the shared neighbor table of a board shape.
+
+    Precondition:
+        - kind must be one of TOPOLOGIES
+        - rows and cols must be positive integers
+    Postcondition:
+        - Returns a Topology; equal arguments return the same object
+    Invariant:
+        - Tables are built once per shape
+    """
+    return Topology(kind, rows, cols)
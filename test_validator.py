@@ -1,13 +1,109 @@
-import csv
+import os
+import struct
+from functools import lru_cache
+
+from model.bitboard import pack_bits, unpack_bits
+from model.board_template import BoardTemplate
+from model.game_model import GameModel
+from model.topology import get_topology
+
+# Binary test boards: header, then a mine bit plane and a treasure bit plane of
+# ceil(rows * cols / 8) bytes each, cells row by row, least significant bit first
+BINARY_MAGIC = b"MSTB"
+BINARY_VERSION = 1
+# magic, version, rows, cols
+_BINARY_HEADER = struct.Struct("<4sBxxxII")
+
+# CSV digits to cell values
+_CSV_VALUES = bytes.maketrans(b"012", b"\x00\x01\x02")
+_CELL_VALUES = b"\x00\x01\x02"
 
 class TestValidator:
     """
     Handles validation of test board files for Minesweeper.
+    Rules depend on the board size: an 8x8 board follows the beginner test
+    rules (exactly 10 mines placed by the row, column and diagonal rules, at
+    most 9 treasures), while other sizes need a mine count in the range of the
+    difficulty of that size (or 1 to cells - 1 for custom sizes) and fewer
+    treasures than mines. Boards are held as one bytes object of cell values
+    per row, so they can be checked with bytes operations instead of per-cell loops.
     
     Invariants:
         - All validation methods must maintain consistent error reporting
-        - Board dimensions must remain 8x8 throughout validation
+        - Board dimensions must remain rows x cols throughout validation
     """
+    def __init__(self, rows=8, cols=8, mines_range=(10, 10), max_treasures=9, placement_rules=True):
+        """
+        Initializes the validation rules.
+        
+        Precondition:
+            - rows and cols must be positive integers
+            - mines_range must be a (min, max) tuple of mine counts
+            - max_treasures must be None (fewer treasures than mines) or an integer
+        Postcondition:
+            - Default arguments give the beginner 8x8 test rules
+        Invariant:
+            - Rules remain constant
+        """
+        self.rows = rows
+        self.cols = cols
+        self.mines_range = mines_range
+        self.max_treasures = max_treasures
+        self.placement_rules = placement_rules
+
+    @classmethod
+    def for_difficulty(cls, difficulty):
+        """
+        Returns the validator for test boards of a difficulty.
+        
+        Precondition:
+            - difficulty must be a difficulty name of GameModel
+        Postcondition:
+            - Beginner gets the 8x8 test rules; other levels check their board
+              size and mines range
+        Invariant:
+            - Difficulty settings are unchanged
+        """
+        if difficulty == 'beginner':
+            return cls()
+        settings = GameModel.DIFFICULTY_TO_LEVEL[difficulty]
+        rows, cols = settings['board_size']
+        return cls(rows, cols, settings['mines_range'], None, False)
+
+    @classmethod
+    def for_size(cls, rows, cols):
+        """
+        Returns the validator for test boards of a size.
+        
+        Precondition:
+            - rows and cols must be positive integers
+        Postcondition:
+            - Sizes of a difficulty get that difficulty's rules; other sizes
+              need 1 to rows * cols - 1 mines
+        Invariant:
+            - None
+        """
+        level = cls.level_for_size(rows, cols)
+        if level is not None:
+            return cls.for_difficulty(level)
+        return cls(rows, cols, (1, max(1, rows * cols - 1)), None, False)
+
+    @staticmethod
+    def level_for_size(rows, cols):
+        """
+        Returns the difficulty whose board size is rows x cols.
+        
+        Precondition:
+            - rows and cols must be positive integers
+        Postcondition:
+            - Returns a difficulty name, or None for custom sizes
+        Invariant:
+            - None
+        """
+        for level, settings in GameModel.DIFFICULTY_TO_LEVEL.items():
+            if settings['board_size'] == (rows, cols):
+                return level
+        return None
 
     def validate_test_board(self, board):
         """
@@ -42,7 +138,7 @@ class TestValidator:
         Validates the board data against the given rules.
         
         Precondition:
-            - board_data must be a 2D list
+            - board_data must be a 2D list, or a list of bytes rows
             - board_data must contain only integers (0, 1, or 2)
         Postcondition:
             - Returns (True, board_data) if valid
@@ -53,31 +149,129 @@ class TestValidator:
         
         Maps to: setup() board initialization in original minesweeper.py
         """
-        if len(board_data) != 8 or any(len(row) != 8 for row in board_data):
-            print("Invalid board dimensions. Board must be 8x8.")
+        if self.validate_rows(board_data) is None:
             return False, None
+        return True, board_data
 
-        mine_positions = []
-        treasure_count = 0
-
-        for x, row in enumerate(board_data):
-            for y, value in enumerate(row):
-                if value == 1:
-                    mine_positions.append((x, y))
-                elif value == 2:
-                    treasure_count += 1
-                elif value != 0:
-                    print(f"Invalid value {value} at ({x}, {y}). Must be 0, 1, or 2.")
-                    return False, None
-
-        if treasure_count > 9:
-            print("Invalid number of treasures. Must be no more than 9.")
-            return False, None
+    def validate_rows(self, rows):
+        """
+        Validates a board streamed row by row, stopping at the first error.
+        
+        Precondition:
+            - rows must be an iterable of rows, each a list of ints or a bytes object
+        Postcondition:
+            - Returns the board as a list of bytes rows if valid
+            - Returns None with an error message at the first invalid row or count;
+              a row whose width differs from the rows before it is named
+        Invariant:
+            - Each row is checked with bytes operations in a single pass
+        """
+        dimensions_error = f"Invalid board dimensions. Board must be {self.rows}x{self.cols}."
+        max_mines = self.mines_range[1]
+        board = []
+        mines = treasures = 0
+        for x, row in enumerate(rows):
+            if x >= self.rows:
+                print(dimensions_error)
+                return None
+            values = self._row_values(x, row)
+            if values is None:
+                return None
+            if len(values) != self.cols:
+                if board:
+                    # Earlier rows had the right width, so the board is ragged
+                    print(f"Invalid board dimensions: row {x} has {len(values)} cells, expected {self.cols}.")
+                else:
+                    print(dimensions_error)
+                return None
+            mines += values.count(1)
+            treasures += values.count(2)
+            if mines > max_mines:
+                print(f"Error: Board must have at most {max_mines} mines.")
+                return None
+            board.append(values)
+        if len(board) != self.rows:
+            print(dimensions_error)
+            return None
+        return self._validate_counts(board, mines, treasures)
 
-        if not self.validate_mine_positions(mine_positions):
-            return False, None
+    @staticmethod
+    def _read_rows(rows):
+        """
+        Reads a board of unknown size row by row, stopping at the first error.
+        
+        Precondition:
+            - rows must be an iterable of rows, each a list of ints or a bytes object
+        Postcondition:
+            - Returns (board, mines, treasures) with board a non-empty list of
+              bytes rows of the first row's width
+            - Returns None with an error message at the first invalid row
+            - Raises ValueError for an empty board
+        Invariant:
+            - Each row is checked as it is read
+        """
+        board = []
+        mines = treasures = 0
+        for x, row in enumerate(rows):
+            values = TestValidator._row_values(x, row)
+            if values is None:
+                return None
+            if board and len(values) != len(board[0]):
+                print(f"Invalid board dimensions: row {x} has {len(values)} cells, expected {len(board[0])}.")
+                return None
+            mines += values.count(1)
+            treasures += values.count(2)
+            board.append(values)
+        if not board or not board[0]:
+            raise ValueError("test board is empty")
+        return board, mines, treasures
 
-        return True, board_data
+    def _validate_counts(self, board, mines, treasures):
+        """
+        Checks the mine and treasure rules on a board of the right size.
+        
+        Precondition:
+            - board must be a list of self.rows bytes rows of self.cols cells
+            - mines and treasures must be the counts of 1 and 2 in board
+        Postcondition:
+            - Returns board if valid, None with an error message otherwise
+        Invariant:
+            - board is unchanged
+        """
+        if mines > self.mines_range[1]:
+            print(f"Error: Board must have at most {self.mines_range[1]} mines.")
+            return None
+        if self.max_treasures is not None:
+            if treasures > self.max_treasures:
+                print(f"Invalid number of treasures. Must be no more than {self.max_treasures}.")
+                return None
+        elif treasures and treasures >= mines:
+            print("Invalid number of treasures. Must be fewer than the number of mines.")
+            return None
+
+        if self.placement_rules:
+            mine_positions = [(x, y) for x, values in enumerate(board)
+                              for y, value in enumerate(values) if value == 1]
+            if not self.validate_mine_positions(mine_positions):
+                return None
+        elif not self.mines_range[0] <= mines:
+            print(f"Error: Board must have at least {self.mines_range[0]} mines. Found {mines} mines.")
+            return None
+        return board
+
+    @staticmethod
+    def _row_values(x, row):
+        try:
+            values = row if isinstance(row, bytes) else bytes(row)
+        except (TypeError, ValueError):
+            values = None
+        if values is not None and not values.translate(None, _CELL_VALUES):
+            return values
+        for y, value in enumerate(row):
+            if value not in (0, 1, 2):
+                print(f"Invalid value {value} at ({x}, {y}). Must be 0, 1, or 2.")
+                return None
+        return None
 
     def validate_mine_positions(self, mine_positions):
         """
@@ -138,6 +332,7 @@ class TestValidator:
                     return False
 
         remaining_mines = [mine for mine in mine_positions if mine not in first_eight_mines]
+        topology = get_topology("square", self.rows, self.cols)
 
         for ninth_mine in remaining_mines:
             x9, y9 = ninth_mine
@@ -155,8 +350,10 @@ class TestValidator:
                     continue
 
                 x10, y10 = tenth_mine
+                nearby = set(topology.neighbors(x10 * self.cols + y10))
+                nearby.add(x10 * self.cols + y10)
                 is_isolated = not any(
-                    (abs(x10 - x) <= 1 and abs(y10 - y) <= 1)
+                    x * self.cols + y in nearby
                     for x, y in first_eight_mines + [ninth_mine]
                 )
 
@@ -167,38 +364,153 @@ class TestValidator:
         return False
 
     @staticmethod
-    def read_test_board(filename):
+    def read_test_board(filename, difficulty=None):
         """
-        Reads and validates a test board from a CSV file.
+        Reads and validates a test board from a CSV or binary file.
         
         Precondition:
             - filename must be a string
             - File must exist and be readable
-            - File must contain valid CSV data
+            - File must contain CSV rows of 0, 1 and 2, or a binary test board
+              (see write_binary_board)
+            - difficulty must be None or a difficulty name of GameModel
         Postcondition:
-            - Returns valid 8x8 board as 2D list if successful
+            - Returns the valid board as a list of bytes rows if successful
             - Returns None with error message if invalid
+            - With a difficulty, its rules apply and invalid files are rejected
+              at the first bad row; otherwise rows are checked as they are read
+              and the count rules follow the board size
         Invariant:
             - File contents remain unchanged
-            - CSV parsing rules remain consistent
+            - CSV is streamed row by row, never parsed cell by cell
         
         Maps to: setup() board initialization in original minesweeper.py
         """
         try:
-            with open(filename, 'r') as file:
-                reader = csv.reader(file)
-                board = [[int(cell) for cell in row] for row in reader]
-
-            if len(board) != 8 or any(len(row) != 8 for row in board):
-                print("Invalid board dimensions. Must be 8x8.")
-                return None
+            validator = None if difficulty is None else TestValidator.for_difficulty(difficulty)
+            with open(filename, 'rb') as file:
+                is_binary = file.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+                file.seek(0)
+                if is_binary:
+                    rows = TestValidator._read_binary_rows(file, validator)
+                else:
+                    rows = TestValidator._csv_rows(file)
+                if rows is None:
+                    print("Board does not meet test criteria.")
+                    return None
+                if validator is not None:
+                    board = validator.validate_rows(rows)
+                else:
+                    # The size, and with it the rules, is known once every row is read
+                    read = TestValidator._read_rows(rows)
+                    if read is None:
+                        board = None
+                    else:
+                        board, mines, treasures = read
+                        validator = TestValidator.for_size(len(board), len(board[0]))
+                        board = validator._validate_counts(board, mines, treasures)
 
-            validator = TestValidator()
-            if not validator.validate_test_board(board):
+            if board is None:
                 print("Board does not meet test criteria.")
                 return None
-
+            print("Board validation successful!")
             return board
         except Exception as e:
             print(f"Error reading test board: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    @staticmethod
+    def load_template(filename, difficulty=None, topology="square"):
+        """
+        Reads, validates and compiles a test board file, reusing earlier results.
+        
+        Precondition:
+            - filename, difficulty as for read_test_board
+            - topology must be one of model.topology.TOPOLOGIES
+        Postcondition:
+            - Returns a BoardTemplate, or None with an error message if invalid
+            - Validation messages are printed when the file is compiled; an
+              invalid file is read again, and its errors printed, on every call
+        Invariant:
+            - Valid templates are cached in memory by path and modification
+              time, so an unchanged file is read and compiled once per process;
+              the cache does not outlive the process
+        """
+        try:
+            stat = os.stat(filename)
+        except OSError as e:
+            print(f"Error reading test board: {e}")
+            return None
+        try:
+            return _compile_template(os.path.abspath(filename), stat.st_mtime_ns, stat.st_size,
+                                     difficulty, topology)
+        except _InvalidBoard:
+            return None
+
+    @staticmethod
+    def _csv_rows(file):
+        x = 0
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            digits = line.replace(b",", b"").replace(b" ", b"")
+            if len(digits) != line.count(b",") + 1 or digits.translate(None, b"012"):
+                raise ValueError(f"invalid value in row {x}; cells must be 0, 1, or 2")
+            yield digits.translate(_CSV_VALUES)
+            x += 1
+
+    @staticmethod
+    def _read_binary_rows(file, validator):
+        magic, version, rows, cols = _BINARY_HEADER.unpack(file.read(_BINARY_HEADER.size))
+        if version != BINARY_VERSION:
+            raise ValueError(f"unsupported binary test board version {version}")
+        if validator is not None and (rows, cols) != (validator.rows, validator.cols):
+            print(f"Invalid board dimensions. Board must be {validator.rows}x{validator.cols}.")
+            return None
+        cells = rows * cols
+        plane = -(-cells // 8)
+        data = file.read(2 * plane + 1)
+        if len(data) != 2 * plane:
+            raise ValueError("binary test board size does not match its header")
+        mines = int.from_bytes(data[:plane], "little")
+        treasures = int.from_bytes(data[plane:], "little")
+        if mines & treasures:
+            raise ValueError("a cell holds both a mine and a treasure")
+        values = int.from_bytes(unpack_bits(data[:plane]), "little") | \
+            int.from_bytes(unpack_bits(data[plane:]), "little") << 1
+        values = values.to_bytes(plane * 8, "little")
+        return [values[x * cols:(x + 1) * cols] for x in range(rows)]
+
+    @staticmethod
+    def write_binary_board(filename, board):
+        """
+        Writes a board in the bit-packed binary test board format.
+        
+        Precondition:
+            - board must be a rectangular list of rows of 0, 1 and 2
+        Postcondition:
+            - File holds the header and the mine and treasure bit planes
+        Invariant:
+            - board is unchanged
+        """
+        rows, cols = len(board), len(board[0])
+        values = b"".join(bytes(row) for row in board)
+        mines = pack_bits(values.translate(bytes.maketrans(b"\x01\x02", b"\x01\x00")))
+        treasures = pack_bits(values.translate(bytes.maketrans(b"\x01\x02", b"\x00\x01")))
+        with open(filename, 'wb') as file:
+            file.write(_BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, rows, cols))
+            file.write(mines)
+            file.write(treasures)
+
+
+class _InvalidBoard(Exception):
+    """Raised by _compile_template, so lru_cache only keeps valid templates."""
+
+
+@lru_cache(maxsize=16)
+def _compile_template(path, mtime_ns, size, difficulty, topology):
+    test_board = TestValidator.read_test_board(path, difficulty)
+    if test_board is None:
+        raise _InvalidBoard(path)
+    return BoardTemplate(test_board, topology)
@@ -0,0 +1,149 @@
+import os
+import tempfile
+import unittest
+from random import Random
+
+from controller.game_controller import GameController
+from model.bitboard_engine import BitboardGameModel
+from model.game_model import GameModel, Cell
+from model.save_file import save_game, load_game
+from model.solver import analyze
+
+
+def board_states(model):
+    """Packed state of every cell, row by row."""
+    return [bytes(cell.pack_state() for cell in row) for row in model.board]
+
+
+def play(controller, rng, moves):
+    """Plays random reveal, flag and chord moves until the game ends; returns the states after each changing move."""
+    model = controller.model
+    rows, cols = model.board_size
+    states = [(board_states(model), model.flags_count, model.clicked_count)]
+    for _ in range(moves):
+        x, y = rng.randrange(rows), rng.randrange(cols)
+        action = rng.choice("rrrfc")
+        cell = model.board[x][y]
+        if action == "r" and (cell.is_mine or cell.has_treasure):
+            action = "f"
+        if action == "r":
+            controller.reveal_cell(x, y)
+        elif action == "f":
+            controller.toggle_flag(x, y)
+        else:
+            controller.chord_cell(x, y)
+        state = (board_states(model), model.flags_count, model.clicked_count)
+        # Moves that change nothing leave no history entry
+        if state != states[-1]:
+            states.append(state)
+        if model.check_win_condition():
+            break
+    return states[1:]
+
+
+class PackedStateTest(unittest.TestCase):
+    def test_pack_state_round_trip(self):
+        for state in range(256):
+            cell = Cell.from_state(state, 0, 0)
+            self.assertEqual(Cell.from_state(cell.pack_state(), 0, 0).pack_state(), cell.pack_state())
+
+
+class BitboardEquivalenceTest(unittest.TestCase):
+    def test_moves_match_game_model(self):
+        rng = Random(5)
+        for _ in range(100):
+            seed = rng.randrange(1000)
+            safe_start = rng.choice(GameModel.SAFE_START_MODES)
+            models = [GameModel("beginner", seed=seed, safe_start=safe_start),
+                      BitboardGameModel("beginner", seed=seed, safe_start=safe_start)]
+            for model in models:
+                model.initialize_board()
+            for _ in range(30):
+                move = (rng.randrange(8), rng.randrange(8), rng.choice("rrrfc"))
+                changed = [set(), set()]
+                results = [model.apply_moves([move], lambda x, y, c=c: c.add((x, y)))
+                           for model, c in zip(models, changed)]
+                self.assertEqual(results[0], results[1])
+                self.assertEqual(changed[0], changed[1])
+                self.assertEqual(board_states(models[0]), board_states(models[1]))
+                self.assertEqual(models[0].flags_count, models[1].flags_count)
+                if results[0]:
+                    break
+            self.assertEqual(models[0].check_win_condition(), models[1].check_win_condition())
+            for x in range(8):
+                for y in range(8):
+                    self.assertEqual([c.pack_state() for c in models[0].get_neighbors(x, y)],
+                                     [c.pack_state() for c in models[1].get_neighbors(x, y)])
+
+    def test_hibernated_snapshot(self):
+        for model_class in (GameModel, BitboardGameModel):
+            model = model_class("beginner", seed=3)
+            model.initialize_board()
+            model.apply_moves([(4, 4, "r")])
+            states = board_states(model)
+            model.hibernate()
+            snapshot = model.snapshot()
+            self.assertEqual([bytes(snapshot.row(x)) for x in range(8)], states)
+            self.assertIsNotNone(analyze(snapshot))
+            model.hibernate()
+            self.assertEqual(model.check_win_condition(), False)
+            self.assertEqual(board_states(model), states)
+
+
+class HistoryTest(unittest.TestCase):
+    def test_undo_redo_round_trip(self):
+        for level, model_class in (("beginner", BitboardGameModel), ("intermediate", GameModel)):
+            model = model_class(level, seed=11)
+            model.initialize_board()
+            controller = GameController(model, None, None)
+            start = (board_states(model), model.flags_count, model.clicked_count)
+            states = play(controller, Random(2), 80)
+            for expected in reversed([start] + states[:-1]):
+                self.assertTrue(controller.undo())
+                self.assertEqual((board_states(model), model.flags_count, model.clicked_count), expected)
+            self.assertFalse(controller.undo())
+            for expected in states:
+                self.assertTrue(controller.redo())
+                self.assertEqual((board_states(model), model.flags_count, model.clicked_count), expected)
+            self.assertFalse(controller.redo())
+
+
+class SaveFileTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "game.save")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_save_load_round_trip(self):
+        model = GameModel("expert", seed=4)
+        model.initialize_board()
+        controller = GameController(model, None, None)
+        play(controller, Random(3), 20)
+        save_game(model, self.path)
+
+        loaded, save = load_game(self.path)
+        try:
+            self.assertEqual(loaded.board_size, model.board_size)
+            self.assertEqual((loaded.mines_count, loaded.flags_count, loaded.clicked_count),
+                             (model.mines_count, model.flags_count, model.clicked_count))
+            self.assertEqual(board_states(loaded), board_states(model))
+            hidden = next((x, y) for x, row in enumerate(model.board) for y, cell in enumerate(row)
+                          if not cell.is_revealed and not cell.is_flagged)
+            loaded.toggle_flag(*hidden)
+            expected = board_states(loaded)
+            save.sync(loaded)
+        finally:
+            save.close()
+
+        reloaded, save = load_game(self.path)
+        try:
+            self.assertEqual(board_states(reloaded), expected)
+            self.assertEqual(reloaded.flags_count, model.flags_count + 1)
+        finally:
+            save.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,251 @@
+from tkinter import Canvas, Frame, Scrollbar, PhotoImage, HORIZONTAL, VERTICAL
+
+MINIMAP_SIZE = 160
+MINIMAP_COLORS = {
+    "hidden": "#9e9e9e",
+    "revealed": "#e6e6e6",
+    "flag": "#d32f2f",
+    "mine": "#000000",
+    "treasure": "#f9a825",
+}
+
+
+class BoardViewport:
+    """
+    Scrollable, virtualized board display for boards larger than the screen.
+    Only the cells inside the viewport have canvas items; the items are recycled
+    as the viewport pans over the board. A minimap shows the whole board at a
+    bounded size, so drawing cost depends on the window and not the board.
+    On hex boards odd rows sit half a cell to the right, as in the button grid.
+
+    Invariants:
+        - Canvas item pool size equals view_rows * view_cols
+        - origin keeps the viewport inside the board
+        - Minimap image never exceeds MINIMAP_SIZE pixels per side
+    """
+    def __init__(self, master, board_size, view_size, tile_size, image_for, color_for, handlers,
+                 hex_rows=False):
+        """
+        Initializes the viewport widgets.
+
+        Precondition:
+            - board_size and view_size must be (rows, cols) tuples of positive integers
+            - image_for(x, y) must return the PhotoImage for a board cell
+            - color_for(x, y) must return a MINIMAP_COLORS key for a board cell
+            - handlers must map "reveal", "flag" and "chord" to callbacks taking (x, y)
+            - hex_rows must be True for the hex topology
+        Postcondition:
+            - Canvas, scrollbars and minimap are created in self.frame
+            - Viewport shows the top-left corner of the board
+        Invariant:
+            - Board size remains constant for the lifetime of the viewport
+        """
+        self.board_size = board_size
+        rows, cols = board_size
+        self.view_rows = min(view_size[0], rows)
+        self.view_cols = min(view_size[1], cols)
+        self.tile_size = tile_size
+        self.image_for = image_for
+        self.color_for = color_for
+        self.handlers = handlers
+        self.hex_rows = hex_rows
+        self.origin = (0, 0)
+
+        self.frame = Frame(master)
+        # Hex rows need half a cell more, so shifted rows are not cut off
+        width = self.view_cols * tile_size + (tile_size // 2 if hex_rows else 0)
+        self.canvas = Canvas(self.frame, width=width,
+                             height=self.view_rows * tile_size, highlightthickness=0)
+        self.vbar = Scrollbar(self.frame, orient=VERTICAL, command=lambda *args: self._scroll(0, *args))
+        self.hbar = Scrollbar(self.frame, orient=HORIZONTAL, command=lambda *args: self._scroll(1, *args))
+        self.canvas.grid(row=0, column=0)
+        self.vbar.grid(row=0, column=1, sticky="ns")
+        self.hbar.grid(row=1, column=0, sticky="ew")
+
+        self.items = [[self.canvas.create_image(c * tile_size + self._row_shift(r), r * tile_size, anchor="nw")
+                       for c in range(self.view_cols)] for r in range(self.view_rows)]
+
+        self.mini_step = max(1, -(-max(rows, cols) // MINIMAP_SIZE))
+        mini_width = -(-cols // self.mini_step)
+        mini_height = -(-rows // self.mini_step)
+        self.minimap_image = PhotoImage(master=master, width=mini_width, height=mini_height)
+        self.minimap_image.put(MINIMAP_COLORS["hidden"], to=(0, 0, mini_width, mini_height))
+        self.minimap = Canvas(self.frame, width=mini_width, height=mini_height, highlightthickness=0)
+        self.minimap.create_image(0, 0, image=self.minimap_image, anchor="nw")
+        self.minimap_frame = self.minimap.create_rectangle(0, 0, 0, 0, outline="#1565c0")
+        self.minimap.grid(row=0, column=2, sticky="n", padx=4)
+
+        self._bind_events()
+        self.redraw()
+
+    def _bind_events(self):
+        canvas = self.canvas
+        canvas.bind("<Button-1>", lambda event: self._dispatch("reveal", event))
+        canvas.bind("<Button-2>", lambda event: self._dispatch("flag", event))
+        canvas.bind("<Button-3>", lambda event: self._dispatch("flag", event))
+        canvas.bind("<Control-Button-1>", lambda event: self._dispatch("flag", event))
+        canvas.bind("<Double-Button-1>", lambda event: self._dispatch("chord", event))
+        canvas.bind("<Enter>", lambda event: canvas.focus_set())
+        for key, (dx, dy) in {"<Up>": (-1, 0), "<Down>": (1, 0), "<Left>": (0, -1), "<Right>": (0, 1)}.items():
+            canvas.bind(key, lambda event, dx=dx, dy=dy: self.pan(dx, dy))
+        for key, (dx, dy) in {"<Prior>": (-1, 0), "<Next>": (1, 0)}.items():
+            canvas.bind(key, lambda event, dx=dx, dy=dy: self.pan(dx * self.view_rows, dy))
+        canvas.bind("<MouseWheel>", lambda event: self.pan(-3 if event.delta > 0 else 3, 0))
+        canvas.bind("<Shift-MouseWheel>", lambda event: self.pan(0, -3 if event.delta > 0 else 3))
+        canvas.bind("<Button-4>", lambda event: self.pan(-3, 0))
+        canvas.bind("<Button-5>", lambda event: self.pan(3, 0))
+        canvas.bind("<Shift-Button-4>", lambda event: self.pan(0, -3))
+        canvas.bind("<Shift-Button-5>", lambda event: self.pan(0, 3))
+        self.minimap.bind("<Button-1>", self._on_minimap)
+        self.minimap.bind("<B1-Motion>", self._on_minimap)
+
+    def _row_shift(self, r):
+        # Pixel offset of viewport row r; odd board rows of a hex board sit half a cell right
+        if self.hex_rows and (self.origin[0] + r) % 2:
+            return self.tile_size // 2
+        return 0
+
+    def _dispatch(self, action, event):
+        row = event.y // self.tile_size
+        if not 0 <= row < self.view_rows:
+            return
+        x = event.x - self._row_shift(row)
+        col = x // self.tile_size
+        if x >= 0 and 0 <= col < self.view_cols:
+            self.handlers[action](self.origin[0] + row, self.origin[1] + col)
+
+    def _scroll(self, axis, command, amount, unit=None):
+        rows, cols = self.board_size
+        size = (rows, cols)[axis]
+        span = (self.view_rows, self.view_cols)[axis]
+        if command == "moveto":
+            target = round(float(amount) * size)
+        else:
+            step = span if unit == "pages" else 1
+            target = self.origin[axis] + int(amount) * step
+        if axis == 0:
+            self.set_origin(target, self.origin[1])
+        else:
+            self.set_origin(self.origin[0], target)
+
+    def _on_minimap(self, event):
+        self.center_on(event.y * self.mini_step, event.x * self.mini_step)
+
+    def pan(self, d_rows, d_cols):
+        """
+        Moves the viewport by a number of cells.
+
+        Precondition:
+            - d_rows and d_cols must be integers
+        Postcondition:
+            - Viewport is moved and clamped to the board
+        Invariant:
+            - Item pool size is unchanged
+        """
+        self.set_origin(self.origin[0] + d_rows, self.origin[1] + d_cols)
+
+    def center_on(self, x, y):
+        """
+        Moves the viewport so that cell (x, y) is in its center.
+
+        Precondition:
+            - x and y must be integers
+        Postcondition:
+            - Viewport is moved and clamped to the board
+        Invariant:
+            - Item pool size is unchanged
+        """
+        self.set_origin(x - self.view_rows // 2, y - self.view_cols // 2)
+
+    def set_origin(self, row, col):
+        """
+        Moves the top-left corner of the viewport to cell (row, col).
+
+        Precondition:
+            - row and col must be integers
+        Postcondition:
+            - Origin is clamped to the board and the pool is redrawn if it moved
+        Invariant:
+            - Item pool size is unchanged
+        """
+        rows, cols = self.board_size
+        row = max(0, min(row, rows - self.view_rows))
+        col = max(0, min(col, cols - self.view_cols))
+        if (row, col) != self.origin:
+            self.origin = (row, col)
+            self.redraw()
+
+    def redraw(self):
+        """
+        Reassigns images to every pooled item and updates scrollbars and minimap frame.
+
+        Precondition:
+            - Widgets must exist
+        Postcondition:
+            - Canvas shows the cells under the current origin
+        Invariant:
+            - Cost is proportional to the viewport size
+        """
+        row0, col0 = self.origin
+        itemconfig = self.canvas.itemconfig
+        image_for = self.image_for
+        tile_size = self.tile_size
+        for r, row_items in enumerate(self.items):
+            if self.hex_rows:
+                # Panning by an odd number of rows swaps which rows are shifted
+                shift = self._row_shift(r)
+                for c, item in enumerate(row_items):
+                    self.canvas.coords(item, c * tile_size + shift, r * tile_size)
+            for c, item in enumerate(row_items):
+                itemconfig(item, image=image_for(row0 + r, col0 + c))
+
+        rows, cols = self.board_size
+        self.vbar.set(row0 / rows, (row0 + self.view_rows) / rows)
+        self.hbar.set(col0 / cols, (col0 + self.view_cols) / cols)
+        step = self.mini_step
+        self.minimap.coords(self.minimap_frame, col0 // step, row0 // step,
+                            (col0 + self.view_cols) // step, (row0 + self.view_rows) // step)
+
+    def update_cell(self, x, y, image):
+        """
+        Updates one cell if it is inside the viewport, and its minimap pixel.
+
+        Precondition:
+            - x and y must be valid board coordinates
+        Postcondition:
+            - Visible cell shows image; minimap pixel shows the cell state
+        Invariant:
+            - Cells outside the viewport create no canvas work
+        """
+        row0, col0 = self.origin
+        r, c = x - row0, y - col0
+        if 0 <= r < self.view_rows and 0 <= c < self.view_cols:
+            self.canvas.itemconfig(self.items[r][c], image=image)
+        self.paint_minimap(x, y)
+
+    def paint_minimap(self, x, y):
+        """
+        Paints the minimap pixel covering cell (x, y).
+
+        Precondition:
+            - x and y must be valid board coordinates
+        Postcondition:
+            - Pixel shows the color of the cell state
+        Invariant:
+            - Minimap size is unchanged
+        """
+        self.minimap_image.put(MINIMAP_COLORS[self.color_for(x, y)],
+                               to=(y // self.mini_step, x // self.mini_step))
+
+    def destroy(self):
+        """
+        Destroys the viewport widgets.
+
+        Precondition:
+            - None
+        Postcondition:
+            - All viewport widgets are destroyed
+        Invariant:
+            - Model state is unchanged
+        """
+        self.frame.destroy()
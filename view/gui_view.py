@@ -1,5 +1,17 @@
 from tkinter import *
 from tkinter import messagebox
+from view.sprites import sprite_cache, fit_scale
+from view.board_viewport import BoardViewport
+from model.analysis_worker import AnalysisWorker
+from model.sampler import MineSampler
+from model.events import DirtyRegion
+
+# Boards above this many cells, or too large to fit at half tile size, are
+# drawn in a scrollable viewport instead of one button per cell
+MAX_BUTTON_CELLS = 2500
+MAX_VIEWPORT_SIZE = (48, 64)
+# Milliseconds between checks for a finished hint or auto-solve analysis
+ANALYSIS_POLL_MS = 30
 
 class GUIView:
     """
@@ -12,7 +24,7 @@ class GUIView:
         - tk must be a valid Tkinter root instance
         - All image files must exist in the specified paths
     """
-    def __init__(self, tk, model, controller):
+    def __init__(self, tk, model, controller, scale=None, cascade_delay=0):
         """
         Initializes the GUI view.
         
@@ -20,11 +32,21 @@ class GUIView:
             - tk must be a valid Tkinter root instance
             - model must be initialized with valid board size
             - controller must be a valid GameController instance
+            - scale must be None or a (zoom, subsample) tuple of positive integers
+            - cascade_delay must be a non-negative number of milliseconds
             - All required image files must exist in images/ directory
         Postcondition:
             - GUI elements are initialized and displayed
+            - Tile images come from the shared sprite cache, scaled to fit
+              the screen unless scale is given
             - Timer is started
-            - Board is set up with proper buttons and bindings
+            - Board is set up with proper buttons and bindings, or as a
+              scrollable viewport for boards too large for one button per cell
+            - Reveal cascades run in slices cascade_delay milliseconds apart;
+              a positive delay animates them
+            - Hint and auto-solve analyses run on a background worker thread;
+              it and the sampler's worker processes stop with the window
+            - Model change events are coalesced and drawn once per idle cycle
         Invariant:
             - Frame and labels remain properly positioned
         
@@ -36,32 +58,100 @@ class GUIView:
             raise ValueError("GameModel board_size is not initialized. Did you call initialize_board?")
 
         self.controller = controller
+        self.cascade_delay = cascade_delay
+        self.tk.bind("<Control-z>", lambda event: self.controller.undo())
+        self.tk.bind("<Control-y>", lambda event: self.controller.redo())
+        self.tk.bind("<Key-h>", lambda event: self.request_hint())
+        self.tk.bind("<Key-s>", lambda event: self.request_step())
+        # Frontier components too large to enumerate are sampled within a time
+        # budget; its worker processes start with the first hint request
+        self.sampler = MineSampler()
+        self.analysis = AnalysisWorker(self.sampler.analyze)
+        self.tk.bind("<Destroy>", self._on_destroy, add="+")
+        self.hint_shown = False
 
-        self.frame = Frame(self.tk)
-        self.frame.pack()
         self.timer_running = False
         self.start_timer()
 
-        self.images = {
-            "plain": PhotoImage(file="images/tile_plain.gif"),
-            "clicked": PhotoImage(file="images/tile_clicked.gif"),
-            "mine": PhotoImage(file="images/tile_mine.gif"),
-            "flag": PhotoImage(file="images/tile_flag.gif"),
-            "wrong": PhotoImage(file="images/tile_wrong.gif"),
-            "treasure": PhotoImage(file="images/tile_treasure.gif"),
-            "numbers": [PhotoImage(file=f"images/tile_{i}.gif") for i in range(1, 9)]
-        }
+        rows, cols = self.model.board_size
+        fitted_scale = fit_scale(self.tk, self.model.board_size)
+        self.virtual = rows * cols > MAX_BUTTON_CELLS or fitted_scale[1] > 2
+        if scale is None:
+            scale = (1, 1) if self.virtual else fitted_scale
+        self.images = sprite_cache.tiles(self.tk, *scale)
+        self.viewport = None
+        self.game_over = False
+
+        self.build_frame()
+        self.setup_board()
+        self.dirty = DirtyRegion(self.model.events, self._schedule_flush)
+
+    def _schedule_flush(self):
+        self.tk.after_idle(self.flush_changes)
+
+    def flush_changes(self):
+        """
+        Draws the model changes collected since the last flush.
+        
+        Precondition:
+            - Called from the Tk event loop
+        Postcondition:
+            - A reset rebuilds the board and restarts the timer
+            - Each changed cell is redrawn once, and the counters if they changed
+            - Game over is displayed last, after the board is up to date
+        Invariant:
+            - Work is proportional to the changed cells, however many events
+              touched them
+        """
+        region = self.dirty.take()
+        if region.reset is not None:
+            self.setup_board()
+            if not self.timer_running:
+                self.start_timer()
+        for x, y in region.cells:
+            self.update_cell(x, y)
+        if region.counters:
+            self.update_flags_label()
+        if region.game_over is not None:
+            self.display_game_over(False if region.game_over == "LOSS" else region.game_over)
+
+    def build_frame(self):
+        """
+        Creates the frame holding the board, the time, mines and flags labels
+        and the hint controls.
+        
+        Precondition:
+            - Model board size must be initialized
+        Postcondition:
+            - self.frame is packed and labels are placed around the board area
+            - Hint and Step buttons and the hint label sit below the counters
+        Invariant:
+            - Board area starts at grid row 1
+        """
+        self.frame = Frame(self.tk)
+        self.frame.pack()
+        rows, cols = self.model.board_size
+        if self.virtual:
+            span, footer_row = 8, 2
+        else:
+            span, footer_row = cols, rows + 1
+            if self.model.topology_kind == "hex":
+                span = 2 * cols + 1
 
         self.labels = {
             "time": Label(self.frame, text="00:00:00"),
             "mines": Label(self.frame, text=f"Mines: {self.model.mines_count}"),
             "flags": Label(self.frame, text=f"Flags: {self.model.flags_count}")
         }
-        self.labels["time"].grid(row=0, column=0, columnspan=max(1, self.model.board_size[1]))
-        self.labels["mines"].grid(row=self.model.board_size[0] + 1, column=0, columnspan=4)
-        self.labels["flags"].grid(row=self.model.board_size[0] + 1, column=4, columnspan=4)
-
-        self.setup_board()
+        self.labels["time"].grid(row=0, column=0, columnspan=max(1, span))
+        self.labels["mines"].grid(row=footer_row, column=0, columnspan=4)
+        self.labels["flags"].grid(row=footer_row, column=4, columnspan=4)
+        Button(self.frame, text="Hint", command=self.request_hint).grid(
+            row=footer_row + 1, column=0, columnspan=4)
+        Button(self.frame, text="Step", command=self.request_step).grid(
+            row=footer_row + 1, column=4, columnspan=4)
+        self.labels["hint"] = Label(self.frame, text="")
+        self.labels["hint"].grid(row=footer_row + 2, column=0, columnspan=max(8, span))
 
     def setup_board(self):
         """
@@ -72,14 +162,24 @@ class GUIView:
             - Frame must exist
             - All images must be loaded
         Postcondition:
-            - All cells have corresponding buttons
+            - All cells have corresponding buttons, or a viewport shows the
+              visible part of the board
             - All buttons have proper event bindings
             - Mines label is updated
+            - Pending analyses are cancelled and the hint label cleared
         Invariant:
             - Button grid matches model board dimensions
         
         Maps to: setup() in original minesweeper.py
         """
+        self.game_over = False
+        self.cancel_analysis()
+        if self.virtual:
+            self.setup_viewport()
+            self.labels["mines"].config(text=f"Mines: {self.model.mines_count}")
+            return
+
+        hex_rows = self.model.topology_kind == "hex"
         for x, row in enumerate(self.model.board):
             for y, cell in enumerate(row):
                 button = Button(self.frame, image=self.images["plain"])
@@ -87,10 +187,102 @@ class GUIView:
                 button.bind("<Button-2>", lambda event, x=x, y=y: self.controller.toggle_flag(x, y))
                 button.bind("<Button-3>", lambda event, x=x, y=y: self.controller.toggle_flag(x, y))
                 button.bind("<Control-Button-1>", lambda event, x=x, y=y: self.controller.toggle_flag(x, y))
-                button.grid(row=x + 1, column=y)
+                button.bind("<Double-Button-1>", lambda event, x=x, y=y: self.controller.chord_cell(x, y))
+                if hex_rows:
+                    # Odd rows sit half a cell to the right, matching the hex neighbor table
+                    button.grid(row=x + 1, column=2 * y + x % 2, columnspan=2)
+                else:
+                    button.grid(row=x + 1, column=y)
                 cell.button = button
         self.labels["mines"].config(text=f"Mines: {self.model.mines_count}")
 
+    def setup_viewport(self):
+        """
+        Creates the scrollable viewport for a large board.
+        
+        Precondition:
+            - Model board must be initialized
+            - Frame must exist
+        Postcondition:
+            - Viewport replaces any previous one and shows the board's top-left corner
+            - Minimap shows cells already revealed or flagged
+        Invariant:
+            - Number of drawn cells depends on the screen size, not the board size
+        """
+        if self.viewport is not None:
+            self.viewport.destroy()
+        tile_size = self.images["plain"].width()
+        view_size = (min(MAX_VIEWPORT_SIZE[0], (self.tk.winfo_screenheight() - 200) // tile_size),
+                     min(MAX_VIEWPORT_SIZE[1], (self.tk.winfo_screenwidth() - 260) // tile_size))
+        handlers = {
+            "reveal": self.controller.reveal_cell,
+            "flag": self.controller.toggle_flag,
+            "chord": self.controller.chord_cell,
+        }
+        self.viewport = BoardViewport(self.frame, self.model.board_size, view_size, tile_size,
+                                      self.image_at, self.minimap_color_at, handlers,
+                                      self.model.topology_kind == "hex")
+        self.viewport.frame.grid(row=1, column=0, columnspan=8)
+        if self.model.clicked_count or self.model.flags_count:
+            for x, row in enumerate(self.model.board):
+                for y, cell in enumerate(row):
+                    if cell.is_revealed or cell.is_flagged:
+                        self.viewport.paint_minimap(x, y)
+
+    def image_at(self, x, y):
+        """
+        Returns the image for a cell, including the game over overlay.
+        
+        Precondition:
+            - x and y must be valid board coordinates
+            - All images must be loaded
+        Postcondition:
+            - Returns the PhotoImage matching the cell state
+        Invariant:
+            - Cell state is unchanged
+        """
+        cell = self.model.board[x][y]
+        if self.game_over:
+            if cell.is_mine and not cell.is_flagged:
+                return self.images["mine"]
+            elif not cell.is_mine and cell.is_flagged:
+                return self.images["wrong"]
+            elif cell.has_treasure:
+                return self.images["treasure"]
+        if cell.is_revealed:
+            if cell.is_mine:
+                return self.images["mine"]
+            elif cell.has_treasure:
+                return self.images["treasure"]
+            elif cell.adjacent_mines > 0:
+                return self.images["numbers"][cell.adjacent_mines - 1]
+            return self.images["clicked"]
+        elif cell.is_flagged:
+            return self.images["flag"]
+        return self.images["plain"]
+
+    def minimap_color_at(self, x, y):
+        """
+        Returns the minimap color key for a cell.
+        
+        Precondition:
+            - x and y must be valid board coordinates
+        Postcondition:
+            - Returns a key of view.board_viewport.MINIMAP_COLORS
+        Invariant:
+            - Cell state is unchanged
+        """
+        cell = self.model.board[x][y]
+        if cell.is_flagged:
+            return "flag"
+        if not cell.is_revealed:
+            return "hidden"
+        if cell.is_mine:
+            return "mine"
+        if cell.has_treasure:
+            return "treasure"
+        return "revealed"
+
     def update_cell(self, x, y):
         """
         Updates the GUI for a single cell.
@@ -101,25 +293,158 @@ class GUIView:
             - All images must be loaded
         Postcondition:
             - Cell button displays correct image based on state
+            - A pending analysis or shown hint is dropped as stale
         Invariant:
             - Button state matches cell state in model
         
         Maps to: onClick() and onRightClick() cell updates in original minesweeper.py
         """
-        cell = self.model.board[x][y]
-        if cell.is_revealed:
-            if cell.is_mine:
-                cell.button.config(image=self.images["mine"])
-            elif cell.has_treasure:
-                cell.button.config(image=self.images["treasure"])
-            elif cell.adjacent_mines > 0:
-                cell.button.config(image=self.images["numbers"][cell.adjacent_mines - 1])
-            else:
-                cell.button.config(image=self.images["clicked"])
-        elif cell.is_flagged:
-            cell.button.config(image=self.images["flag"])
+        if self.hint_shown or self.analysis.busy:
+            self.cancel_analysis()
+        image = self.image_at(x, y)
+        if self.viewport is not None:
+            self.viewport.update_cell(x, y, image)
+        else:
+            self.model.board[x][y].button.config(image=image)
+
+    def schedule(self, callback):
+        """
+        Runs a callback later from the Tk event loop.
+        
+        Precondition:
+            - callback must be callable without arguments
+        Postcondition:
+            - callback runs once, after pending redraws and input events and
+              at least cascade_delay milliseconds from now
+        Invariant:
+            - The event loop is never blocked while waiting
+        """
+        # after_idle first lets the cells updated by the last slice be drawn
+        self.tk.after_idle(self.tk.after, self.cascade_delay, callback)
+
+    def request_hint(self):
+        """
+        Starts computing a hint for the current board.
+        
+        Precondition:
+            - Model board must be initialized
+        Postcondition:
+            - A snapshot of the board is analyzed on the worker thread and the
+              hint is shown in the hint label when ready
+        Invariant:
+            - The Tk thread never waits for the analysis
+        """
+        self._request_analysis("hint")
+
+    def request_step(self):
+        """
+        Starts computing one auto-solve step for the current board.
+        
+        Precondition:
+            - Model board must be initialized
+        Postcondition:
+            - When the analysis is ready, every certainly safe cell is revealed
+              and every certain mine flagged, or the best guess is revealed
+        Invariant:
+            - The Tk thread never waits for the analysis
+        """
+        self._request_analysis("step")
+
+    def _request_analysis(self, kind):
+        if self.game_over:
+            return
+        self.sampler.warm_up()
+        polling = self.analysis.busy
+        self.analysis.submit(self.model.snapshot(), kind)
+        self.labels["hint"].config(text="Thinking...")
+        self.hint_shown = True
+        if not polling:
+            self.tk.after(ANALYSIS_POLL_MS, self._poll_analysis)
+
+    def _poll_analysis(self):
+        """
+        Applies a finished analysis, or polls again while one is pending.
+        
+        Precondition:
+            - Called from the Tk event loop
+        Postcondition:
+            - A ready hint is shown, or a ready step is applied through the controller
+            - A failed analysis is reported in the hint label
+            - Stale results are dropped
+        Invariant:
+            - Results are only applied on the Tk thread
+        """
+        if not self.analysis.busy:
+            return
+        ready = self.analysis.poll()
+        if ready is None:
+            self.tk.after(ANALYSIS_POLL_MS, self._poll_analysis)
+            return
+        kind, analysis = ready
+        if isinstance(analysis, Exception):
+            self.labels["hint"].config(text=f"Analysis failed: {analysis}")
+            return
+        if kind == "step":
+            self.labels["hint"].config(text="")
+            self.hint_shown = False
+            moves = analysis.moves()
+            if moves:
+                self.controller.apply_moves(moves)
+            return
+        hint = analysis.hint()
+        if hint is None:
+            text = "No hint available"
         else:
-            cell.button.config(image=self.images["plain"])
+            x, y, action, probability = hint
+            if action == "reveal":
+                text = f"Hint: row {x}, col {y} is safe"
+            elif action == "flag":
+                text = f"Hint: row {x}, col {y} is a mine"
+            elif probability is None:
+                text = f"Hint: guess row {x}, col {y}"
+            else:
+                text = f"Hint: guess row {x}, col {y} ({probability:.0%} mine)"
+            if self.viewport is not None:
+                self.viewport.center_on(x, y)
+        self.labels["hint"].config(text=text)
+
+    def _on_destroy(self, event):
+        # <Destroy> also fires for every child widget; only the window counts
+        if event.widget is self.tk:
+            self.close()
+
+    def close(self):
+        """
+        Stops the analysis thread and the sampling worker processes and
+        releases the cached tiles of the window.
+        
+        Precondition:
+            - None
+        Postcondition:
+            - No analysis thread or worker process of this view is running
+            - sprite_cache holds no tiles of this window's interpreter
+        Invariant:
+            - Closing twice does nothing
+        """
+        self.analysis.close()
+        self.sampler.close()
+        sprite_cache.release(self.tk)
+
+    def cancel_analysis(self):
+        """
+        Drops the pending analysis and the shown hint.
+        
+        Precondition:
+            - None
+        Postcondition:
+            - No analysis result will be applied; the hint label is cleared
+        Invariant:
+            - Board state is unchanged
+        """
+        self.analysis.cancel()
+        if self.hint_shown:
+            self.labels["hint"].config(text="")
+            self.hint_shown = False
 
     def display_game_over(self, won):
         """
@@ -138,15 +463,20 @@ class GUIView:
         Maps to: gameOver() in original minesweeper.py
         """
         self.stop_timer()
+        self.game_over = True
+        self.cancel_analysis()
 
-        for row in self.model.board:
-            for cell in row:
-                if cell.is_mine and not cell.is_flagged:
-                    cell.button.config(image=self.images["mine"])
-                elif not cell.is_mine and cell.is_flagged:
-                    cell.button.config(image=self.images["wrong"])
-                elif cell.has_treasure:
-                    cell.button.config(image=self.images["treasure"])
+        if self.viewport is not None:
+            self.viewport.redraw()
+        else:
+            for row in self.model.board:
+                for cell in row:
+                    if cell.is_mine and not cell.is_flagged:
+                        cell.button.config(image=self.images["mine"])
+                    elif not cell.is_mine and cell.is_flagged:
+                        cell.button.config(image=self.images["wrong"])
+                    elif cell.has_treasure:
+                        cell.button.config(image=self.images["treasure"])
 
         message = "You found a treasure! 💰 You have won the Game!" if won == "WIN_TREASURE" else "You Win!" if won else "You Lose! 💣"
 
@@ -157,21 +487,11 @@ class GUIView:
                         cell.button.destroy()
             
             self.frame.destroy()
-            self.frame = Frame(self.tk)
-            self.frame.pack()
-            
-            self.labels = {
-                "time": Label(self.frame, text="00:00:00"),
-                "mines": Label(self.frame, text=f"Mines: {self.model.mines_count}"),
-                "flags": Label(self.frame, text=f"Flags: {self.model.flags_count}")
-            }
-            self.labels["time"].grid(row=0, column=0, columnspan=max(1, self.model.board_size[1]))
-            self.labels["mines"].grid(row=self.model.board_size[0] + 1, column=0, columnspan=4)
-            self.labels["flags"].grid(row=self.model.board_size[0] + 1, column=4, columnspan=4)
-            
+            self.viewport = None
+            self.build_frame()
+
+            # The model's GameReset makes flush_changes set up the board and restart the timer
             self.controller.restart_game()
-            self.setup_board()
-            self.start_timer()
         else:
             self.tk.quit()
 
@@ -0,0 +1,139 @@
+import os
+from tkinter import PhotoImage
+
+IMAGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "images")
+TILE_SIZE = 16
+# Order of the tiles in a sprite sheet, left to right
+TILE_NAMES = ["plain", "clicked", "mine", "flag", "wrong", "treasure"] + [str(i) for i in range(1, 9)]
+
+
+class SpriteCache:
+    """
+    Process-wide cache of decoded tile images.
+    Tiles are decoded once per Tk interpreter; scaled variants are derived from
+    the decoded tiles and cached as well, so views built for restarts or extra
+    windows reuse the same PhotoImage objects. release() drops the tiles of an
+    interpreter whose root window is destroyed.
+
+    Invariants:
+        - Each (interpreter, zoom, subsample) combination is decoded at most
+          once until release()
+        - Tile sets are dictionaries in the GUIView images format
+    """
+    def __init__(self, sheet=None):
+        """
+        Initializes an empty cache.
+
+        Precondition:
+            - sheet must be None or the path of a sprite sheet image holding
+              TILE_NAMES tiles of TILE_SIZE pixels in one row
+        Postcondition:
+            - No images are decoded until first use
+        Invariant:
+            - Image source remains constant until set_sheet() is called
+        """
+        self.sheet = sheet
+        self.tile_sets = {}
+
+    def set_sheet(self, sheet):
+        """
+        Switches the image source and drops all cached tiles.
+
+        Precondition:
+            - sheet must be None or a sprite sheet path
+        Postcondition:
+            - Later lookups decode tiles from the new source
+        Invariant:
+            - Views keep the images they already hold
+        """
+        self.sheet = sheet
+        self.tile_sets.clear()
+
+    def tiles(self, master, zoom=1, subsample=1):
+        """
+        Returns the tile set for an interpreter at a scale of zoom / subsample.
+
+        Precondition:
+            - master must be a Tk widget
+            - zoom and subsample must be positive integers
+        Postcondition:
+            - Returns a dictionary with "plain", "clicked", "mine", "flag",
+              "wrong", "treasure" and a "numbers" list for 1 to 8
+        Invariant:
+            - Repeated calls return the same PhotoImage objects
+        """
+        key = (master.tk, zoom, subsample)
+        tile_set = self.tile_sets.get(key)
+        if tile_set is None:
+            if zoom == 1 and subsample == 1:
+                tile_set = self._decode(master)
+            else:
+                base = self.tiles(master)
+                tile_set = {name: self._scale(base[name], zoom, subsample)
+                            for name in TILE_NAMES[:6]}
+                tile_set["numbers"] = [self._scale(image, zoom, subsample)
+                                       for image in base["numbers"]]
+            self.tile_sets[key] = tile_set
+        return tile_set
+
+    def release(self, master):
+        """
+        Drops every tile set of an interpreter.
+
+        Precondition:
+            - master must be a Tk widget, usually a root being destroyed
+        Postcondition:
+            - No cached tile belongs to master's interpreter
+        Invariant:
+            - Tile sets of other interpreters are unchanged
+        """
+        interpreter = master.tk
+        for key in [key for key in self.tile_sets if key[0] is interpreter]:
+            del self.tile_sets[key]
+
+    def _decode(self, master):
+        if self.sheet is None:
+            images = {name: PhotoImage(master=master, file=os.path.join(IMAGE_DIR, f"tile_{name}.gif"))
+                      for name in TILE_NAMES}
+        else:
+            sheet = PhotoImage(master=master, file=self.sheet)
+            images = {}
+            for index, name in enumerate(TILE_NAMES):
+                tile = PhotoImage(master=master, width=TILE_SIZE, height=TILE_SIZE)
+                left = index * TILE_SIZE
+                tile.tk.call(tile, "copy", sheet, "-from", left, 0, left + TILE_SIZE, TILE_SIZE)
+                images[name] = tile
+        tile_set = {name: images[name] for name in TILE_NAMES[:6]}
+        tile_set["numbers"] = [images[str(i)] for i in range(1, 9)]
+        return tile_set
+
+    @staticmethod
+    def _scale(image, zoom, subsample):
+        if zoom > 1:
+            image = image.zoom(zoom)
+        if subsample > 1:
+            image = image.subsample(subsample)
+        return image
+
+
+sprite_cache = SpriteCache()
+
+
+def fit_scale(master, board_size, reserved_height=120):
+    """
+    Chooses the largest tile scale at which a board fits on the screen.
+
+    Precondition:
+        - master must be a Tk widget
+        - board_size must be a (rows, cols) tuple of positive integers
+    Postcondition:
+        - Returns (zoom, subsample) with zoom == 1 and subsample >= 1
+    Invariant:
+        - Boards that fit at full size are never shrunk
+    """
+    rows, cols = board_size
+    available = min(master.winfo_screenwidth() // max(1, cols),
+                    (master.winfo_screenheight() - reserved_height) // max(1, rows))
+    if available >= TILE_SIZE:
+        return 1, 1
+    return 1, min(TILE_SIZE, -(-TILE_SIZE // max(1, available)))
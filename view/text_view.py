@@ -1,3 +1,14 @@
+import json
+import shutil
+import sys
+
+from model.events import CellRevealed, FlagToggled, GameReset, GameOver
+
+# Terminal lines used by the text around the board (title, counters, prompt)
+RESERVED_LINES = 9
+PAN_KEYS = {'w': (-1, 0), 's': (1, 0), 'a': (0, -1), 'd': (0, 1)}
+
+
 class TextView:
     """
     Text-based view implementation for Minesweeper game.
@@ -6,15 +17,18 @@ class TextView:
         - model must be a valid GameModel instance
         - controller must be a valid GameController instance
     """
-    def __init__(self, model, controller):
+    def __init__(self, model, controller, window=None):
         """
         Initializes the text-based view.
         
         Precondition:
             - model must be a valid GameModel instance
             - controller must be a valid GameController instance
+            - window must be None or a (rows, cols) tuple of positive integers
         Postcondition:
             - View is initialized with valid model and controller references
+            - Board display is limited to window, or to the terminal when None
+            - View is subscribed to the model's change events
         Invariant:
             - Model and controller references remain constant
         
@@ -22,6 +36,178 @@ class TextView:
         """
         self.model = model
         self.controller = controller
+        self.window = window
+        self.origin = (0, 0)
+        model.events.subscribe(self.on_model_event, CellRevealed, FlagToggled, GameReset, GameOver)
+
+    def on_model_event(self, event):
+        """
+        Reacts to a change published by the model.
+        
+        Precondition:
+            - event must come from the model's event bus
+        Postcondition:
+            - Changed cells and the flag count are reported, a new game is
+              announced and game over is displayed
+        Invariant:
+            - Model state is unchanged by the view itself
+        """
+        if isinstance(event, CellRevealed):
+            self.update_cell(event.x, event.y)
+        elif isinstance(event, FlagToggled):
+            self.update_cell(event.x, event.y)
+            self.update_flags_label()
+        elif isinstance(event, GameReset):
+            self.reset_view()
+        elif isinstance(event, GameOver):
+            self.display_game_over(event.result != "LOSS", event.result == "WIN_TREASURE")
+
+    def window_size(self):
+        """
+        Returns the number of board rows and columns that are displayed.
+        
+        Precondition:
+            - Model board size must be initialized
+        Postcondition:
+            - Returns (rows, cols) no larger than the board
+            - When window is None and stdout is a terminal, each frame fits the
+              terminal: rows and columns are only limited when the board has
+              more than fit; otherwise the whole board is shown
+        Invariant:
+            - Model state is unchanged
+        """
+        rows, cols = self.model.board_size
+        if self.window is not None:
+            return min(rows, self.window[0]), min(cols, self.window[1])
+        if not sys.stdout.isatty():
+            return rows, cols
+        columns, lines = shutil.get_terminal_size((80, 24))
+        cell_width = max(2, len(str(cols - 1))) + 1
+        label_width = max(2, len(str(rows - 1))) + 3
+        return (min(rows, max(1, lines - RESERVED_LINES)),
+                min(cols, max(1, (columns - label_width) // cell_width)))
+
+    def is_windowed(self):
+        """
+        Tells whether only part of the board fits in the display.
+        
+        Precondition:
+            - Model board size must be initialized
+        Postcondition:
+            - Returns True if the window is smaller than the board
+        Invariant:
+            - Model state is unchanged
+        """
+        return self.window_size() != tuple(self.model.board_size)
+
+    def pan(self, d_rows, d_cols):
+        """
+        Moves the displayed window by a number of cells.
+        
+        Precondition:
+            - d_rows and d_cols must be integers
+        Postcondition:
+            - Window origin is moved and clamped to the board
+        Invariant:
+            - Window size is unchanged
+        """
+        view_rows, view_cols = self.window_size()
+        rows, cols = self.model.board_size
+        self.origin = (max(0, min(self.origin[0] + d_rows, rows - view_rows)),
+                       max(0, min(self.origin[1] + d_cols, cols - view_cols)))
+
+    def follow(self, x, y):
+        """
+        Centers the window on cell (x, y) if the cell is outside it.
+        
+        Precondition:
+            - x and y must be valid board coordinates
+        Postcondition:
+            - Cell (x, y) is inside the displayed window
+        Invariant:
+            - Window size is unchanged
+        """
+        view_rows, view_cols = self.window_size()
+        row0, col0 = self.origin
+        if not (row0 <= x < row0 + view_rows and col0 <= y < col0 + view_cols):
+            self.origin = (x - view_rows // 2, y - view_cols // 2)
+            self.pan(0, 0)
+
+    def board_lines(self, symbol_for):
+        """
+        Formats the displayed window of the board.
+        
+        Precondition:
+            - symbol_for must map a Cell to a one-character string
+        Postcondition:
+            - Returns the header line followed by one line per displayed row
+        Invariant:
+            - Line count and length are bounded by the window size
+        """
+        self.pan(0, 0)
+        view_rows, view_cols = self.window_size()
+        row0, col0 = self.origin
+        rows, cols = self.model.board_size
+        width = max(2, len(str(cols - 1)))
+        label_width = max(2, len(str(rows - 1)))
+        columns = range(col0, col0 + view_cols)
+        lines = [" " * (label_width + 2) + " ".join(f"{y:{width}}" for y in columns)]
+        hex_rows = self.model.topology_kind == "hex"
+        for x in range(row0, row0 + view_rows):
+            row = self.model.board[x]
+            # Odd rows of a hex board sit half a cell to the right
+            indent = " " * ((width + 1) // 2) if hex_rows and x % 2 else ""
+            lines.append(f"{x:{label_width}}   " + indent +
+                         " ".join(f"{symbol_for(row[y]):{width}}" for y in columns))
+        return lines
+
+    @staticmethod
+    def play_symbol(cell):
+        """
+        Returns the symbol of a cell during play.
+        
+        Precondition:
+            - cell must be a valid Cell instance
+        Postcondition:
+            - Returns '.', 'F', '*', 'T', a digit or a space
+        Invariant:
+            - Cell state is unchanged
+        """
+        if not cell.is_revealed and not cell.is_flagged:
+            return "."
+        elif cell.is_flagged:
+            return "F"
+        elif cell.is_mine:
+            return "*"
+        elif cell.has_treasure:
+            return "T"
+        elif cell.adjacent_mines > 0:
+            return str(cell.adjacent_mines)
+        return " "
+
+    @staticmethod
+    def final_symbol(cell):
+        """
+        Returns the symbol of a cell on the final board.
+        
+        Precondition:
+            - cell must be a valid Cell instance
+        Postcondition:
+            - Returns 'F' (correct flag), '*', 'X' (wrong flag), 'T', a digit or a space
+        Invariant:
+            - Cell state is unchanged
+        """
+        if cell.is_mine and cell.is_flagged:
+            return "F" # correclty flagged
+        elif cell.is_mine:
+            return "*" # revealed mine
+        elif not cell.is_mine and cell.is_flagged:
+            return "X" # Wrong flag
+        elif cell.has_treasure:
+            return "T" # Treasure
+        elif cell.adjacent_mines > 0:
+            return str(cell.adjacent_mines)
+        return " " # Empty cell
 
     def display_board(self):
         """
@@ -40,27 +226,19 @@ class TextView:
         print("\nMinesweeper - Text View")
         print(f"Number of Mines: {self.model.mines_count}")
         print(f"Number of flags used: {self.model.flags_count}")
+        if self.is_windowed():
+            self._print_window_position()
         
-        print("    " + " ".join(f"{y:2}" for y in range(self.model.board_size[1])))
-        
-        for x, row in enumerate(self.model.board):
-            row_display = [f"{x:2}  "]
-            for cell in row:
-                if not cell.is_revealed and not cell.is_flagged:
-                    row_display.append(".")
-                elif cell.is_flagged:
-                    row_display.append("F")
-                elif cell.is_mine:
-                    row_display.append("*")
-                elif cell.has_treasure:
-                    row_display.append("T")
-                elif cell.adjacent_mines > 0:
-                    row_display.append(str(cell.adjacent_mines))
-                else:
-                    row_display.append(" ")
-            print(" ".join(f"{item:2}" for item in row_display))
+        print("\n".join(self.board_lines(self.play_symbol)))
         print()
 
+    def _print_window_position(self):
+        view_rows, view_cols = self.window_size()
+        row0, col0 = self.origin
+        rows, cols = self.model.board_size
+        print(f"Rows {row0}-{row0 + view_rows - 1} of {rows}, "
+              f"columns {col0}-{col0 + view_cols - 1} of {cols}")
+
     def run(self):
         """
         Starts the text-based game loop.
@@ -78,12 +256,26 @@ class TextView:
         while True:
             self.display_board()
             print("\nEnter your move (row col action):")
-            print("Actions: r(reveal), f(flag), q(quit)")
+            print("Actions: r(reveal), f(flag), c(chord), u(undo), y(redo), q(quit)")
+            if self.is_windowed():
+                print("Pan: w(up), s(down), a(left), d(right)")
             move = input("Move: ").strip().lower().split()
             
             if len(move) == 1 and move[0] == 'q':
                 print("Thank you for playing!")
                 return
+
+            if len(move) == 1 and move[0] in ('u', 'y'):
+                done = self.controller.undo() if move[0] == 'u' else self.controller.redo()
+                if not done:
+                    print(" ❌ Nothing to undo." if move[0] == 'u' else " ❌ Nothing to redo.")
+                continue
+
+            if len(move) == 1 and move[0] in PAN_KEYS:
+                view_rows, view_cols = self.window_size()
+                d_rows, d_cols = PAN_KEYS[move[0]]
+                self.pan(d_rows * max(1, view_rows // 2), d_cols * max(1, view_cols // 2))
+                continue
                 
             if len(move) != 3:
                 print("Invalid input. Please enter row, column, and action (reveal/flag).")
@@ -97,19 +289,16 @@ class TextView:
                     0 <= y < self.model.board_size[1]):
                     print(" ❌ Invalid coordinates. Please try again.")
                     continue
-                    
+
+                self.follow(x, y)
                 if action == "r":
-                    result = self.controller.reveal_cell(x, y)
-                    if result == "LOSS":
-                        self.display_game_over(False)
-                        return
-                    elif result in ["WIN", "WIN_TREASURE"]:
-                        self.display_game_over(True, result == "WIN_TREASURE")
-                        return
+                    self.controller.reveal_cell(x, y)
                 elif action == "f":
                     self.controller.toggle_flag(x, y)
+                elif action == "c":
+                    self.controller.chord_cell(x, y)
                 else:
-                    print(" ❌ Invalid action. Use 'r' or 'f'.")
+                    print(" ❌ Invalid action. Use 'r', 'f' or 'c'.")
                     
             except ValueError:
                 print(" ❌ Invalid input. Row and column must be integers.")
@@ -199,28 +388,10 @@ class TextView:
             print("You hit a mine! 💥💣")
 
         print("\nRevealing final board:")
-        
-        print("    ", end="")
-        for i in range(self.model.board_size[1]):
-            print(f"{i:2}", end=" ")
-        print()
+        if self.is_windowed():
+            self._print_window_position()
 
-        for x, row in enumerate(self.model.board):
-            row_display = [f"{x:2}  "]
-            for cell in row:
-                if cell.is_mine and cell.is_flagged:
-                    row_display.append("F ") # correclty flagged
-                elif cell.is_mine:
-                    row_display.append("* ") # revealed mine
-                elif not cell.is_mine and cell.is_flagged:
-                    row_display.append("X ") # Wrong flag
-                elif cell.has_treasure:
-                    row_display.append("T ") # Treasure
-                elif cell.adjacent_mines > 0:
-                    row_display.append(f"{cell.adjacent_mines} ")
-                else:
-                    row_display.append("  ") # Empty cell
-            print(" ".join(row_display))
+        print("\n".join(self.board_lines(self.final_symbol)))
         print()
 
         play_again = input("\nDo you want to play again? (yes/no): ").strip().lower()
@@ -245,4 +416,116 @@ class TextView:
         
         Maps to: restart() view reset in original minesweeper.py
         """
-        print("\nStarting a new game!")
\ No newline at end of file
+        print("\nStarting a new game!")
+
+
+class ScriptedTextView:
+    """
+    Non-interactive text view that plays a stream of moves.
+    Prints no board; reports a final JSON summary and optionally one JSON line per move.
+    
+    Invariants:
+        - model must be a valid GameModel instance
+        - controller must be a valid GameController instance
+        - moves must be an iterable of text lines
+    """
+    def __init__(self, model, controller, moves, output=None, per_move=False):
+        """
+        Initializes the scripted view.
+        
+        Precondition:
+            - moves must yield lines in the "row col action" format of TextView,
+              or 'u' (undo), 'y' (redo) or 'q' (quit)
+            - output must be None or a writable text stream
+        Postcondition:
+            - View is ready to play the move stream
+            - Game over results are taken from the model's GameOver events, and
+              changed cells from its CellRevealed and FlagToggled events
+        Invariant:
+            - Model and controller references remain constant
+        """
+        self.model = model
+        self.controller = controller
+        self.moves = moves
+        self.output = output if output is not None else sys.stdout
+        self.per_move = per_move
+        self.result = None
+        self.changed = False
+        model.events.subscribe(self.display_game_over, GameOver)
+        model.events.subscribe(self._cell_changed, CellRevealed, FlagToggled)
+
+    def _cell_changed(self, event):
+        self.changed = True
+
+    def run(self):
+        """
+        Plays moves from the stream until it ends, a 'q' line, or game over.
+        
+        Precondition:
+            - Model board must be initialized
+        Postcondition:
+            - Moves are applied through the controller
+            - Summary (and per-move results if enabled) is written to output;
+              a valid move that changes no cell is reported as "NOOP"
+            - Returns the final result ("LOSS", "WIN", "WIN_TREASURE" or None)
+        Invariant:
+            - Invalid lines are reported and skipped, never fatal
+        """
+        rows, cols = self.model.board_size
+        write = self.output.write
+        played = 0
+        invalid = 0
+        for line in self.moves:
+            move = line.strip().lower().split()
+            if not move or move[0].startswith("#"):
+                continue
+            if len(move) == 1 and move[0] == "q":
+                break
+            played += 1
+            status = "INVALID"
+            if len(move) == 1 and move[0] in ("u", "y"):
+                done = self.controller.undo() if move[0] == "u" else self.controller.redo()
+                status = "OK" if done else "NOOP"
+            elif len(move) == 3 and move[2] in ("r", "f", "c"):
+                try:
+                    x, y = int(move[0]), int(move[1])
+                except ValueError:
+                    x = y = -1
+                if 0 <= x < rows and 0 <= y < cols:
+                    self.changed = False
+                    if move[2] == "r":
+                        self.controller.reveal_cell(x, y)
+                    elif move[2] == "f":
+                        self.controller.toggle_flag(x, y)
+                    else:
+                        self.controller.chord_cell(x, y)
+                    status = self.result or ("OK" if self.changed else "NOOP")
+            if status == "INVALID":
+                invalid += 1
+            if self.per_move:
+                write(json.dumps({"move": played, "input": line.strip(), "result": status}) + "\n")
+            if self.result:
+                break
+
+        write(json.dumps({
+            "result": self.result,
+            "moves": played,
+            "invalid": invalid,
+            "clicks": self.model.clicked_count,
+            "flags": self.model.flags_count,
+            "mines": self.model.mines_count,
+        }) + "\n")
+        return self.result
+
+    def display_game_over(self, event):
+        """
+        Records the game result.
+        
+        Precondition:
+            - event must be a GameOver event of the model
+        Postcondition:
+            - result is "LOSS", "WIN" or "WIN_TREASURE"
+        Invariant:
+            - Model state is unchanged
+        """
+        self.result = event.result